@@ -0,0 +1,160 @@
+"""
+Fixtures sinteticos para los benchmarks: series generadas de forma determinista (semilla fija)
+con las mismas estructuras que devuelven las fuentes reales (yfinance, CNN Fear & Greed,
+archivo ie_data de Shiller), para medir sin red y con resultados comparables entre versiones.
+"""
+import json
+import os
+import zlib
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+from utils.lazy_import import lazy_module
+import numpy as np
+import pandas as pd
+
+RANGE_END = date(2025, 12, 31)
+RANGE_YEARS = 10
+RANGE_START = date(RANGE_END.year - RANGE_YEARS + 1, 1, 1)
+# El SMA-200 de SPX necesita ~300 dias previos al inicio del rango
+HISTORY_START = date(RANGE_START.year - 2, 1, 1)
+SHILLER_START_YEAR = 1871
+SEED = 20251231
+
+FEARGREED_RATINGS = ((25, "extreme fear"), (45, "fear"), (55, "neutral"), (75, "greed"), (101, "extreme greed"))
+
+def _rng(name: str) -> np.random.Generator:
+    """ Generador reproducible por nombre de serie """
+    return np.random.default_rng(SEED + zlib.crc32(name.encode()))
+
+def price_history(symbol: str, start: date = HISTORY_START, end: date = RANGE_END) -> pd.DataFrame:
+    """
+    Historico diario con el formato de Ticker.history() de yfinance:
+    columnas Open/High/Low/Close/Volume e indice con zona horaria de Nueva York.
+    """
+    index = pd.bdate_range(start, end, tz="America/New_York")
+    rng = _rng(symbol)
+    if symbol == "^VIX":
+        # Proceso con reversion a la media alrededor de 18
+        close = np.empty(len(index))
+        close[0] = 18.0
+        shocks = rng.normal(0, 1.2, len(index))
+        for i in range(1, len(index)):
+            close[i] = max(9.5, close[i - 1] + 0.05 * (18.0 - close[i - 1]) + shocks[i])
+    else:
+        close = 2000.0 * np.exp(np.cumsum(rng.normal(0.0003, 0.011, len(index))))
+    return pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.002, len(index))),
+        "High": close * 1.005,
+        "Low": close * 0.995,
+        "Close": close,
+        "Volume": rng.integers(1_000_000, 5_000_000, len(index)),
+    }, index=index)
+
+class FixtureTicker:
+    """ Sustituto de yf.Ticker que responde history() desde un DataFrame generado """
+    def __init__(self, frame: pd.DataFrame):
+        self._frame = frame
+
+    def history(self, start=None, end=None, **kwargs) -> pd.DataFrame:
+        frame = self._frame
+        tz = frame.index.tz
+        if start is not None:
+            frame = frame[frame.index >= pd.Timestamp(start).tz_localize(tz)]
+        if end is not None:
+            frame = frame[frame.index < pd.Timestamp(end).tz_localize(tz)]
+        return frame.copy()
+
+class FixtureYFClient:
+    """ Cliente yf_client inyectable en los indicadores (misma interfaz: Ticker(symbol).history) """
+    def __init__(self, frames: dict):
+        self.frames = frames
+
+    def Ticker(self, symbol: str) -> FixtureTicker:
+        return FixtureTicker(self.frames[symbol])
+
+def feargreed_payload(start: date = RANGE_START, end: date = RANGE_END) -> dict:
+    """ JSON transformado por cnn_feargreed_loader.load_data (un registro por dia habil) """
+    rng = _rng("feargreed")
+    dias = pd.bdate_range(start, end)
+    valores = np.clip(50 + np.cumsum(rng.normal(0, 4, len(dias))) * 0.3, 1, 99)
+    registros = []
+    for dia, valor in zip(dias, valores):
+        descripcion = next(texto for limite, texto in FEARGREED_RATINGS if valor < limite)
+        registros.append({
+            "timestamp_ms": int(datetime.combine(dia.date(), time(), timezone.utc).timestamp() * 1000),
+            "value": round(float(valor), 2),
+            "description": descripcion,
+            "date": dia.strftime("%Y-%m-%d"),
+        })
+    return {"fear_and_greed_historical": {"data": registros}}
+
+def shiller_frame(start_year: int = SHILLER_START_YEAR, end: date = RANGE_END) -> pd.DataFrame:
+    """
+    Hoja 'Data' del archivo ie_data: fecha 'YYYY.MM' en la columna 0,
+    E10 en la columna 10 y CAPE en la columna 12 (las que lee ShillerPEIndicator).
+    """
+    meses = pd.period_range(f"{start_year}-01", end.strftime("%Y-%m"), freq="M")
+    rng = _rng("shiller")
+    e10 = 10.0 * np.exp(np.cumsum(rng.normal(0.0025, 0.004, len(meses))))
+    cape = np.clip(17 + np.cumsum(rng.normal(0, 0.6, len(meses))) * 0.15, 5, 45)
+    columnas = {f"col{i}": np.nan for i in range(13)}
+    df = pd.DataFrame(columnas, index=range(len(meses)))
+    df["col0"] = [round(p.year + p.month / 100, 2) for p in meses]
+    df["col10"] = e10.round(2)
+    df["col12"] = cape.round(2)
+    df.columns = ["Date", "P", "D", "E", "CPI", "Fraction", "Rate GS10", "Real Price",
+                  "Real Dividend", "Real TR Price", "E10", "Real Earnings", "CAPE"]
+    return df
+
+class Fixtures:
+    """
+    Conjunto de fixtures escrito en un directorio de trabajo:
+    - data/feargreed.json: cache de CNN (fecha de modificacion = hoy, no se re-descarga)
+    - data/inputs/latest.xlsx: archivo Shiller
+    - yf_client: cliente con el historico de ^SPX y ^VIX
+    """
+    def __init__(self, workdir):
+        self.workdir = Path(workdir)
+        self.yf_client = FixtureYFClient({symbol: price_history(symbol) for symbol in ("^SPX", "^VIX")})
+        self.feargreed_file = self.workdir / "data" / "feargreed.json"
+        self.shiller_file = self.workdir / "data" / "inputs" / "latest.xlsx"
+        self.report_file = self.workdir / "data" / "market_report.json"
+
+    def write(self):
+        self.feargreed_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.feargreed_file, "w") as f:
+            json.dump(feargreed_payload(), f)
+        self.shiller_file.parent.mkdir(parents=True, exist_ok=True)
+        shiller_frame().to_excel(self.shiller_file, sheet_name="Data", index=False)
+        return self
+
+    @contextmanager
+    def offline(self):
+        """
+        Redirige las fuentes externas a los fixtures y bloquea la red:
+        - El directorio de trabajo pasa a ser workdir (rutas relativas de cache y reporte)
+        - ShillerPEIndicator usa el archivo generado en workdir
+        - El ultimo cierre es la ultima sesion del rango (sin consultar calendario ni yfinance)
+        - El PriceStore compartido (calendario, indicadores del registro) es el cliente de fixtures
+        - Cualquier requests.get o yfinance.Ticker falla
+        """
+        def sin_red(*args, **kwargs):
+            raise RuntimeError("Red deshabilitada durante los benchmarks")
+
+        ventana = (RANGE_END.isoformat(), (RANGE_END + timedelta(days=1)).isoformat())
+        ultimo_cierre = lambda *args, **kwargs: ventana
+        with patch("indicators.shillerPEIndicator.download_latest_file", lambda **kwargs: str(self.shiller_file)), \
+             patch("data.market_dates.last_close_window", ultimo_cierre), \
+             patch("data.market_dates.closed_sessions_end", lambda *args, **kwargs: RANGE_END + timedelta(days=1)), \
+             patch("data.price_store.get_price_store", lambda: self.yf_client), \
+             patch("indicators.registry.get_price_store", lambda: self.yf_client), \
+             patch.object(lazy_module("yfinance"), "Ticker", sin_red), \
+             patch("requests.get", sin_red):
+            anterior = os.getcwd()
+            os.chdir(self.workdir)
+            try:
+                yield self
+            finally:
+                os.chdir(anterior)
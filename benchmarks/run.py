@@ -0,0 +1,301 @@
+"""
+Benchmarks de las rutas criticas del scoring, sin red (ver benchmarks/fixtures.py).
+
+Uso:
+    python3 -m benchmarks.run                               # JSON por stdout
+    python3 -m benchmarks.run --output bench.json           # JSON a archivo
+    python3 -m benchmarks.run --scale single --repeat 5
+    python3 -m benchmarks.run --compare bench_v1.json       # falla si alguna mediana empeora
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.fixtures import Fixtures, RANGE_START, RANGE_END
+from core.scoreCalculator import ScoreCalculator
+from data.market_calendar import get_trading_sessions
+from data.price_store import PriceStore
+from indicators.spxIndicator import SPXIndicator
+from indicators.vixIndicator import VixIndicator
+from indicators.FearGreedIndicator import FearGreedIndicator
+from indicators.shillerPEIndicator import ShillerPEIndicator
+from utils.cnn_feargreed_loader import clear_cache, get_index, get_value_by_date, get_values_by_dates
+from utils.MarketReport import MarketReport
+from utils.validatedDates import get_a_validated_date
+
+SCHEMA_VERSION = 1
+SCALES = ("single", "range")
+DEFAULT_REPEAT = 3
+DEFAULT_SAMPLE = 20
+DEFAULT_TOLERANCE = 0.25
+ROOT = Path(__file__).resolve().parents[1]
+# Puntos de entrada de los comandos programados (.github/workflows): se mide su importacion en frio
+IMPORT_MODULES = ("core.scoreCalculator", "data.scorer_backup", "notifications.telegramNotifier")
+
+WEIGHTS = {"SPXIndicator": 0.20, "FearGreedIndicator": 0.30, "VixIndicator": 0.20, "ShillerPEIndicator": 0.30}
+
+class Benchmark:
+    """
+    Un benchmark: setup(fixtures, fechas) prepara el estado (no se mide) y devuelve la funcion a medir.
+    - per_date: en escala 'range' recibe una muestra de fechas del rango de 10 años
+    - batch: en escala 'range' recibe todas las sesiones del rango de 10 años
+    - self_timed: la funcion medida devuelve su propia duracion en segundos (p.ej. -X importtime)
+    - scales: escalas en las que tiene sentido correrlo
+    """
+    def __init__(self, name: str, setup: Callable, batch: bool = False, self_timed: bool = False, scales=SCALES):
+        self.name = name
+        self.setup = setup
+        self.batch = batch
+        self.self_timed = self_timed
+        self.scales = scales
+
+def _cada_fecha(fn):
+    """ Funcion a medir que aplica fn a cada fecha """
+    def setup(fx, fechas):
+        estado = fn(fx)
+        return lambda: [estado(d) for d in fechas]
+    return setup
+
+def _indicadores(fx):
+    return {
+        "spx": lambda: SPXIndicator(yf_client=fx.yf_client),
+        "vix": lambda: VixIndicator(yf_client=fx.yf_client),
+        "feargreed": lambda: FearGreedIndicator(),
+        "shiller": lambda: ShillerPEIndicator(yf_client=fx.yf_client),
+    }
+
+def _fetch_data(clave):
+    """ fetch_data en frio: instancia nueva por fecha para no medir el cache del indicador """
+    def setup(fx, fechas):
+        crear = _indicadores(fx)[clave]
+        return lambda: [crear().fetch_data(d) for d in fechas]
+    return setup
+
+def _normalize(clave):
+    """ normalize con los datos ya descargados (fetch_data no se mide) """
+    def setup(fx, fechas):
+        crear = _indicadores(fx)[clave]
+        preparados = []
+        for d in fechas:
+            indicador = crear()
+            indicador.fetch_data(d)
+            preparados.append((indicador, d))
+        return lambda: [indicador.normalize(d) for indicador, d in preparados]
+    return setup
+
+def _get_scores(clave):
+    def setup(fx, fechas):
+        indicador = _indicadores(fx)[clave]()
+        return lambda: indicador.get_scores(fechas)
+    return setup
+
+def _calculadora(fx):
+    return ScoreCalculator([crear() for crear in _indicadores(fx).values()], dict(WEIGHTS))
+
+def _calculate_score(fx, fechas):
+    calc = _calculadora(fx)
+    return lambda: [calc.calculate_score(d) for d in fechas]
+
+def _calculate_scores(fx, fechas):
+    calc = _calculadora(fx)
+    return lambda: calc.calculate_scores(fechas[0], fechas[-1])
+
+def _get_value_by_date(fx):
+    return get_value_by_date
+
+def _get_index(fx):
+    """ Carga en frio del indice (como un proceso nuevo): el archivo binario ya existe """
+    get_index()
+    return lambda d: (clear_cache(), get_index())
+
+def _process_data(fx):
+    indicador = ShillerPEIndicator()
+    return lambda d: indicador._process_data(str(fx.shiller_file), d)
+
+def _market_report_save(fx):
+    report = MarketReport(filepath=str(fx.report_file))
+    for nombre in WEIGHTS:
+        report.data[nombre] = {"date": str(RANGE_END), "data": {"value": 1.0, "normalized_value": 0.5}}
+    report.data["score"] = {"value": 50.0, "date": str(RANGE_END)}
+    return lambda d: report.save()
+
+def _price_store_history(fx):
+    """ Lectura desde disco de un PriceStore ya poblado (nueva instancia = nuevo proceso) """
+    directorio = fx.workdir / "data" / "prices"
+    hoy = lambda: RANGE_END
+    PriceStore(directory=directorio, yf_client=fx.yf_client, today_fn=hoy).closes("^SPX")
+    store = PriceStore(directory=directorio, yf_client=fx.yf_client, today_fn=hoy)
+    return lambda d: store.Ticker("^SPX").history(start=d, end=d + timedelta(days=1))
+
+def _get_a_validated_date(fx):
+    return lambda d: get_a_validated_date(str(d))
+
+def import_time(module: str) -> float:
+    """
+    Segundos acumulados de importar `module` en un proceso nuevo, segun `python -X importtime`
+    (sin el arranque del interprete ni la cache de modulos del proceso actual)
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])))
+    proceso = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                             cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    for linea in proceso.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        partes = linea.split("|")
+        if linea.startswith("import time:") and len(partes) == 3 and partes[2].strip() == module:
+            return int(partes[1]) / 1e6
+    raise RuntimeError(f"-X importtime no reporto el modulo {module}")
+
+def _import_time(module):
+    return lambda fx, fechas: (lambda: import_time(module))
+
+BENCHMARKS: List[Benchmark] = [
+    Benchmark("ScoreCalculator.calculate_score", _calculate_score),
+    Benchmark("ScoreCalculator.calculate_scores", _calculate_scores, batch=True),
+    *[Benchmark(f"{nombre}.fetch_data", _fetch_data(clave)) for clave, nombre in (
+        ("spx", "SPXIndicator"), ("vix", "VixIndicator"), ("feargreed", "FearGreedIndicator"), ("shiller", "ShillerPEIndicator"))],
+    *[Benchmark(f"{nombre}.normalize", _normalize(clave)) for clave, nombre in (
+        ("spx", "SPXIndicator"), ("vix", "VixIndicator"), ("feargreed", "FearGreedIndicator"), ("shiller", "ShillerPEIndicator"))],
+    *[Benchmark(f"{nombre}.get_scores", _get_scores(clave), batch=True) for clave, nombre in (
+        ("spx", "SPXIndicator"), ("vix", "VixIndicator"), ("feargreed", "FearGreedIndicator"), ("shiller", "ShillerPEIndicator"))],
+    Benchmark("SPXIndicator.sma_series", lambda fx, fechas: (lambda: SPXIndicator(yf_client=fx.yf_client).sma_series(fechas[0], fechas[-1])), batch=True),
+    Benchmark("cnn_feargreed_loader.get_value_by_date", _cada_fecha(_get_value_by_date)),
+    Benchmark("cnn_feargreed_loader.get_values_by_dates", lambda fx, fechas: (lambda: get_values_by_dates(fechas)), batch=True),
+    Benchmark("cnn_feargreed_loader.get_index", _cada_fecha(_get_index)),
+    Benchmark("ShillerPEIndicator._process_data", _cada_fecha(_process_data)),
+    Benchmark("MarketReport.save", _cada_fecha(_market_report_save)),
+    Benchmark("PriceStore.history", _cada_fecha(_price_store_history)),
+    Benchmark("validatedDates.get_a_validated_date", _cada_fecha(_get_a_validated_date)),
+    *[Benchmark(f"import.{modulo}", _import_time(modulo), self_timed=True, scales=("single",)) for modulo in IMPORT_MODULES],
+]
+
+def scale_dates(scale: str, sample: int, batch: bool) -> list:
+    """
+    Fechas de cada escala:
+    - single: la ultima sesion del rango
+    - range: todas las sesiones de los 10 años (batch) o una muestra equiespaciada de `sample` sesiones
+    """
+    sesiones = get_trading_sessions(RANGE_START, RANGE_END)
+    if scale == "single":
+        return sesiones[-1:]
+    if batch or sample >= len(sesiones):
+        return sesiones
+    paso = (len(sesiones) - 1) / max(sample - 1, 1)
+    return [sesiones[round(i * paso)] for i in range(sample)]
+
+def run_benchmark(bench: Benchmark, fx: Fixtures, scale: str, repeat: int, sample: int) -> Dict:
+    fechas = scale_dates(scale, sample, bench.batch)
+    tiempos = []
+    for _ in range(repeat):
+        fn = bench.setup(fx, fechas)
+        inicio = time.perf_counter()
+        medido = fn()
+        tiempos.append(medido if bench.self_timed else time.perf_counter() - inicio)
+    mediana = statistics.median(tiempos)
+    return {
+        "benchmark": bench.name,
+        "scale": scale,
+        "calls": len(fechas),
+        "repeat": repeat,
+        "min_s": min(tiempos),
+        "median_s": mediana,
+        "mean_s": statistics.fmean(tiempos),
+        "max_s": max(tiempos),
+        "per_call_s": mediana / len(fechas),
+    }
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def run_suite(scales=SCALES, repeat: int = DEFAULT_REPEAT, sample: int = DEFAULT_SAMPLE, only: Optional[str] = None) -> Dict:
+    """ Ejecuta los benchmarks seleccionados y devuelve el resultado serializable a JSON """
+    commit = _git_commit()
+    resultados = []
+    with tempfile.TemporaryDirectory(prefix="marketscorer-bench-") as workdir:
+        fx = Fixtures(workdir).write()
+        # Los indicadores imprimen y registran por cada fecha; no forma parte de la salida
+        with fx.offline(), contextlib.redirect_stdout(io.StringIO()):
+            nivel = logging.root.manager.disable
+            logging.disable(logging.WARNING)
+            try:
+                for scale in scales:
+                    for bench in BENCHMARKS:
+                        if (only and only not in bench.name) or scale not in bench.scales:
+                            continue
+                        resultados.append(run_benchmark(bench, fx, scale, repeat, sample))
+            finally:
+                logging.disable(nivel)
+    return {
+        "schema": SCHEMA_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "range": {"start": str(RANGE_START), "end": str(RANGE_END)},
+        "results": resultados,
+    }
+
+def compare(actual: Dict, base: Dict, tolerance: float = DEFAULT_TOLERANCE) -> List[Dict]:
+    """
+    Compara medianas contra una ejecucion anterior.
+    - Retorna las regresiones: benchmarks cuya mediana crecio mas que `tolerance` (0.25 = +25%)
+    """
+    previos = {(r["benchmark"], r["scale"]): r for r in base.get("results", [])}
+    regresiones = []
+    for r in actual["results"]:
+        previo = previos.get((r["benchmark"], r["scale"]))
+        if not previo or previo["median_s"] <= 0:
+            continue
+        ratio = r["median_s"] / previo["median_s"]
+        if ratio > 1 + tolerance:
+            regresiones.append({"benchmark": r["benchmark"], "scale": r["scale"],
+                                "base_s": previo["median_s"], "actual_s": r["median_s"], "ratio": round(ratio, 2)})
+    return regresiones
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks offline del pipeline de scoring")
+    parser.add_argument("--scale", choices=(*SCALES, "all"), default="all")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Repeticiones por benchmark")
+    parser.add_argument("--sample", type=int, default=DEFAULT_SAMPLE, help="Fechas de la muestra en escala 'range'")
+    parser.add_argument("--only", help="Ejecuta solo los benchmarks cuyo nombre contiene este texto")
+    parser.add_argument("--output", help="Archivo JSON de salida (por defecto stdout)")
+    parser.add_argument("--compare", help="JSON de una ejecucion anterior para detectar regresiones")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Crecimiento maximo aceptado de la mediana")
+    args = parser.parse_args(argv)
+
+    scales = SCALES if args.scale == "all" else (args.scale,)
+    resultado = run_suite(scales, args.repeat, args.sample, args.only)
+
+    texto = json.dumps(resultado, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    else:
+        print(texto)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regresiones = compare(resultado, json.load(f), args.tolerance)
+        for r in regresiones:
+            print(f"❌ Regresion en {r['benchmark']} [{r['scale']}]: {r['base_s']:.4f}s -> {r['actual_s']:.4f}s (x{r['ratio']})", file=sys.stderr)
+        if regresiones:
+            return 1
+        print("✅ Sin regresiones respecto a la ejecucion anterior", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+import pytest
+from datetime import date
+from benchmarks.run import run_suite, compare, scale_dates, SCHEMA_VERSION
+
+def test_run_suite_sin_red_emite_json():
+    """Los benchmarks corren contra los fixtures y producen el formato esperado."""
+    resultado = run_suite(scales=("single",), repeat=1, only="VixIndicator")
+
+    assert resultado["schema"] == SCHEMA_VERSION
+    nombres = {r["benchmark"] for r in resultado["results"]}
+    assert nombres == {"VixIndicator.fetch_data", "VixIndicator.normalize", "VixIndicator.get_scores"}
+    for r in resultado["results"]:
+        assert r["scale"] == "single"
+        assert r["calls"] == 1
+        assert r["min_s"] <= r["median_s"] <= r["max_s"]
+
+def test_scale_dates_range():
+    muestra = scale_dates("range", 10, batch=False)
+    sesiones = scale_dates("range", 10, batch=True)
+    assert len(muestra) == 10
+    assert muestra[0] == sesiones[0] and muestra[-1] == sesiones[-1]
+    assert len(sesiones) > 2500  # 10 años de sesiones NYSE
+
+def test_compare_detecta_regresiones():
+    base = {"results": [{"benchmark": "a", "scale": "single", "median_s": 1.0},
+                        {"benchmark": "b", "scale": "single", "median_s": 1.0}]}
+    actual = {"results": [{"benchmark": "a", "scale": "single", "median_s": 1.1},
+                          {"benchmark": "b", "scale": "single", "median_s": 2.0},
+                          {"benchmark": "c", "scale": "single", "median_s": 5.0}]}
+
+    regresiones = compare(actual, base, tolerance=0.25)
+    assert [r["benchmark"] for r in regresiones] == ["b"]
+    assert regresiones[0]["ratio"] == 2.0
+
+def test_import_time_en_proceso_nuevo():
+    resultado = run_suite(scales=("single", "range"), repeat=1, only="import.notifications")
+
+    assert [(r["benchmark"], r["scale"]) for r in resultado["results"]] == [("import.notifications.telegramNotifier", "single")]
+    assert 0 < resultado["results"][0]["median_s"] < 5
+
+def test_offline_no_usa_yfinance_ni_calendario(tmp_path):
+    import data.market_dates as md
+    import data.price_store as price_store
+    from benchmarks.fixtures import Fixtures
+    from utils.lazy_import import lazy_module
+    fx = Fixtures(tmp_path)
+
+    with fx.offline():
+        assert md.last_close_window() == ("2025-12-31", "2026-01-01")
+        assert md.closed_sessions_end() == date(2026, 1, 1)
+        assert price_store.get_price_store() is fx.yf_client
+        with pytest.raises(RuntimeError, match="Red deshabilitada"):
+            lazy_module("yfinance").Ticker("^SPX")
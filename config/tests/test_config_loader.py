@@ -9,10 +9,14 @@ import config.config_loader as config_loader
 @pytest.fixture(autouse=True)
 def reset_config():
     # Resetear la configuración global antes de cada prueba
+    previa = config_loader._GLOBAL_CONFIG
     config_loader._GLOBAL_CONFIG = None
     
     yield
     
+    # Restaurar la configuración del proceso (los modulos la leen al usarla, no al importarse)
+    config_loader._GLOBAL_CONFIG = previa
+
     # Limpiar archivos después de la prueba
     temp_files = ["test_config.json", "cache_test.json", "invalid.json"]
     for file in temp_files:
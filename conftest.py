@@ -10,4 +10,21 @@ def reset_db_singleton():
     evitar contaminaciones entre tests de diferentes módulos.
     """
     Database._reset_instance()
-    yield
\ No newline at end of file
+    yield
+
+@pytest.fixture(scope="session")
+def sessions_dir(tmp_path_factory):
+    """ Directorio del indice de sesiones NYSE para toda la sesion de tests (se calcula una sola vez) """
+    return tmp_path_factory.mktemp("sessions")
+
+@pytest.fixture(autouse=True)
+def datos_de_mercado_aislados(monkeypatch, tmp_path, sessions_dir):
+    """
+    Ningun test escribe en data/prices ni en data/nyse_sessions.npz del repositorio:
+    el PriceStore compartido y el indice de sesiones apuntan a directorios temporales.
+    """
+    import data.price_store as price_store
+    import data.market_calendar as mc
+    monkeypatch.setattr(mc, "SESSIONS_FILE", sessions_dir / "nyse_sessions.npz")
+    monkeypatch.setattr(price_store, "_STORE", price_store.PriceStore(directory=str(tmp_path / "prices")))
+    yield
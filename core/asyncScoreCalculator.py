@@ -0,0 +1,134 @@
+from datetime import date
+from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
+import inspect
+import threading
+from indicators.AsyncIndicatorModule import AsyncIndicatorModule
+from core.scoreCalculator import ScoreCalculator, _default_scorer, call_locked
+from utils.validatedDates import get_a_validated_date
+from utils.instrumentation import record_cache, span
+import logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Executors compartidos por el proceso, uno por tamaño de pool: get_global_score crea una
+# calculadora por peticion y no debe dejar un pool de hilos nuevo en cada una
+_EXECUTORS: Dict[int, ThreadPoolExecutor] = {}
+_EXECUTORS_LOCK = threading.Lock()
+
+def get_shared_executor(max_workers: int) -> ThreadPoolExecutor:
+    """ ThreadPoolExecutor del proceso con max_workers hilos (se crea en el primer uso) """
+    with _EXECUTORS_LOCK:
+        executor = _EXECUTORS.get(max_workers)
+        if executor is None:
+            executor = _EXECUTORS[max_workers] = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="async-indicator")
+        return executor
+
+def shutdown_executors(wait: bool = True):
+    """ Cierra los executors compartidos (se vuelven a crear si se necesitan) """
+    with _EXECUTORS_LOCK:
+        executors = list(_EXECUTORS.values())
+        _EXECUTORS.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
+
+class AsyncScoreCalculator(ScoreCalculator):
+    """
+    ScoreCalculator para servicios asyncio: no bloquea el event loop.
+    - Los indicadores AsyncIndicatorModule se esperan directamente
+    - Los indicadores sincronos (IndicatorModule) se ejecutan en un executor
+    - Todos los indicadores se evaluan de forma concurrente (asyncio.gather)
+    - Pesos, validaciones, cache y matriz de scores son los de ScoreCalculator
+    """
+    def __init__(self, *args, executor: Optional[ThreadPoolExecutor] = None, **kwargs):
+        """
+        Mismos parametros que ScoreCalculator, mas:
+        - executor: Executor para el trabajo bloqueante. Si no se recibe y max_workers esta
+          definido se usa el executor compartido de ese tamaño; si no, el executor por defecto del loop.
+        """
+        super().__init__(*args, **kwargs)
+        if executor is None and self.max_workers:
+            executor = get_shared_executor(self.max_workers)
+        self.executor = executor
+
+    async def _run_blocking(self, fn, *args, **kwargs):
+        """ Ejecuta una funcion sincrona en el executor sin bloquear el event loop """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+
+    async def _score_indicator(self, indicator, date):
+        """
+        Score de un indicador: se espera si es asincrono, si no se ejecuta en el executor.
+        - Las llamadas sincronas toman el lock del indicador: las instancias compartidas guardan
+          estado por fecha y varias peticiones pueden llegar a la vez con fechas distintas
+        - La espera por el lock se limita al timeout del indicador: un hilo abandonado por
+          asyncio.wait_for sigue reteniendolo y no debe dejar bloqueados a los siguientes
+        """
+        limite = self._timeout_for(type(indicator).__name__)
+        if self.scorer_fn is not _default_scorer:
+            if inspect.iscoroutinefunction(self.scorer_fn):
+                return await self.scorer_fn(indicator, date)
+            return await self._run_blocking(call_locked, indicator, self.scorer_fn, indicator, date, timeout=limite)
+        if isinstance(indicator, AsyncIndicatorModule):
+            return await indicator.get_score(date)
+        return await self._run_blocking(call_locked, indicator, indicator.get_score, date, timeout=limite)
+
+    async def _indicator_scores(self, indicator, sessions):
+        if isinstance(indicator, AsyncIndicatorModule):
+            return await indicator.get_scores(sessions)
+        limite = self._timeout_for(type(indicator).__name__)
+        return await self._run_blocking(call_locked, indicator, indicator.get_scores, sessions, timeout=limite)
+
+    async def _gather_indicators(self, make_coro) -> List[tuple]:
+        """
+        Ejecuta make_coro(indicador) para todos los indicadores a la vez.
+        - Retorna [(nombre, resultado)] en el orden de self.indicators
+        - Aplica el tiempo limite de cada indicador (timeout)
+        """
+        async def run(indicator):
+            name = type(indicator).__name__
+            limite = self._timeout_for(name)
+            try:
+                with span(f"indicator.{name}"):
+                    return name, await asyncio.wait_for(make_coro(indicator), timeout=limite)
+            except asyncio.TimeoutError:
+                raise ValueError(f"El indicador '{name}' excedió el tiempo límite de {limite}s")
+
+        return list(await asyncio.gather(*(run(indicator) for indicator in self.indicators)))
+
+    async def calculate_score(self, date: Optional[date] = None):
+        with span("ScoreCalculator.calculate_score"):
+            date = await self._run_blocking(self._resolve_date, date)
+            cache_key = self._cache_key(date)
+            cached = self.cache.get(cache_key)
+            record_cache("ScoreCalculator.cache", cached is not None)
+            if cached is not None:
+                logger.info(f"Datos ya calculados para {date}.... Usando caché")
+                return cached
+            with span("calendar.validate_date"):
+                if not await self._run_blocking(get_a_validated_date, str(date)):
+                    raise ValueError(f"Invalid Date")
+
+            total_weight = self._validate_weights()
+            results = await self._gather_indicators(lambda indicator: self._score_indicator(indicator, date))
+            return await self._run_blocking(self._store_score, date, cache_key, results, total_weight)
+
+    async def calculate_scores(self, start, end) -> Dict[date, float]:
+        with span("ScoreCalculator.calculate_scores"):
+            sessions = await self._run_blocking(self._sessions_between, start, end)
+            if not sessions:
+                return {}
+
+            total_weight = self._validate_weights()
+            results = await self._gather_indicators(lambda indicator: self._indicator_scores(indicator, sessions))
+            return await self._run_blocking(self._store_scores, sessions, results, total_weight)
+
+    @staticmethod
+    async def get_global_score(rounded: bool = False, date: Optional[date] = None) -> float:
+        """ Version asincrona de ScoreCalculator.get_global_score """
+        calculator = AsyncScoreCalculator.from_global_config()
+        raw_score = await calculator.calculate_score(date)
+        return round(raw_score) if rounded else raw_score
@@ -1,42 +1,125 @@
 from datetime import date
-from typing import Callable, List, Dict, Optional
+import json
+from typing import Callable, List, Dict, Optional, Union
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+import threading
+import time
+import weakref
 from indicators.IndicatorModule import IndicatorModule
-from indicators.FearGreedIndicator import FearGreedIndicator
-from indicators.spxIndicator import SPXIndicator
-from indicators.vixIndicator import VixIndicator
-from indicators.shillerPEIndicator import ShillerPEIndicator
+from indicators.AsyncIndicatorModule import AsyncIndicatorModule
+from indicators.registry import default_indicators, get_score_cache, get_score_matrix
+from core.score_cache import ScoreCache
+from core.score_matrix import ScoreMatrix
 from data.market_dates import get_last_trading_close
-from utils.validatedDates import get_a_validated_date
+from data.market_calendar import get_trading_sessions
+from utils.validatedDates import get_a_validated_date, validate_date_iso_format, validate_date_not_future, validate_date_in_range
 from utils.MarketReport import MarketReport
+from utils.instrumentation import span, record_cache
 import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 from config.config_loader import get_config
 
-config = get_config() # Obtener la configuración
+def _default_scorer(indicator, d):
+    """ Score por defecto de un indicador para una fecha """
+    return indicator.get_score(d)
+
+# Un lock por instancia de indicador: las instancias compartidas (indicators.registry) guardan el
+# estado de la ultima fecha calculada, por lo que dos fechas no pueden evaluarse a la vez sobre ellas
+_INDICATOR_LOCKS = weakref.WeakKeyDictionary()
+_INDICATOR_LOCKS_GUARD = threading.Lock()
+
+def indicator_lock(indicator) -> threading.RLock:
+    """ Lock asociado a una instancia de indicador (se crea en el primer uso) """
+    with _INDICATOR_LOCKS_GUARD:
+        lock = _INDICATOR_LOCKS.get(indicator)
+        if lock is None:
+            lock = _INDICATOR_LOCKS[indicator] = threading.RLock()
+        return lock
+
+def call_locked(indicator, fn, *args, timeout: Optional[float] = None):
+    """
+    Ejecuta fn(*args) con el lock del indicador tomado.
+    - timeout: segundos maximos de espera por el lock (None = sin limite). Un hilo abandonado
+      por tiempo limite puede seguir reteniendolo; si no se obtiene a tiempo se lanza el mismo
+      ValueError que cuando el indicador excede su tiempo limite
+    """
+    lock = indicator_lock(indicator)
+    if not lock.acquire(timeout=-1 if timeout is None else max(0.0, timeout)):
+        raise ValueError(f"El indicador '{type(indicator).__name__}' excedió el tiempo límite "
+                         f"esperando a que termine una evaluación anterior")
+    try:
+        return fn(*args)
+    finally:
+        lock.release()
 
 class ScoreCalculator:
-    def __init__(self, indicators: List[IndicatorModule], weights: Dict[str, float], scorer_fn: Callable[[IndicatorModule, date], float] = None ):
+    def __init__(self, indicators: List[IndicatorModule], weights: Dict[str, float], scorer_fn: Callable[[IndicatorModule, date], float] = None,
+                 concurrent: bool = False, max_workers: Optional[int] = None, timeout: Union[float, Dict[str, float], None] = None,
+                 cache: Optional[ScoreCache] = None, score_matrix: Optional[ScoreMatrix] = None):
         """
         Parámetros:
         - indicators: Lista de instancias de indicadores que heredan de IndicatorModule
         - weights: Diccionario con los nombres de los indicadores y su peso
         - scorer_fn: Funcion opcional para obtener el score de un indicador con una fecha (utilidad para mocking)
+        - concurrent: Si es True los indicadores se evaluan en paralelo en un pool de hilos acotado
+        - max_workers: Numero maximo de hilos del pool (por defecto uno por indicador)
+        - timeout: Segundos maximos de espera por indicador, global o por nombre de indicador {nombre: segundos}
+        - cache: Cache LRU/TTL de scores por (fecha, pesos, parametros de indicadores)
+        - score_matrix: Matriz fechas × indicadores con los scores normalizados (para reweight)
         """
         self.indicators = indicators
         self.weights = weights
-        self.scorer_fn = scorer_fn if scorer_fn else lambda indicator, d: indicator.get_score(d)
-        self._last_score = None # Guardar el ultimo calculo
-        self._last_calculated_date = None
+        self.scorer_fn = scorer_fn if scorer_fn else _default_scorer
+        self.concurrent = concurrent
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.cache = cache if cache is not None else ScoreCache()
+        self.score_matrix = score_matrix if score_matrix is not None else ScoreMatrix()
+
+    def _cache_key(self, date) -> tuple:
+        """ Clave del cache: fecha, pesos y huella de los parametros de cada indicador """
+        weights = tuple(sorted(self.weights.items()))
+        fingerprint = tuple(
+            (type(indicator).__name__,
+             tuple(sorted(indicator.get_params().items())) if isinstance(indicator, (IndicatorModule, AsyncIndicatorModule)) else ())
+            for indicator in self.indicators
+        )
+        return (str(date), weights, fingerprint)
+
+    def _params_fingerprint(self) -> Dict[str, str]:
+        """ Huella de los parametros de cada indicador {nombre: json} para validar la matriz de scores """
+        return {
+            type(indicator).__name__: json.dumps(
+                indicator.get_params() if isinstance(indicator, (IndicatorModule, AsyncIndicatorModule)) else {},
+                sort_keys=True, default=str)
+            for indicator in self.indicators
+        }
 
-    def _is_cached(self, date):
-        return self._last_calculated_date == date and self._last_score is not None
+    def cache_stats(self) -> Dict[str, float]:
+        """ Aciertos/fallos del cache de scores (util para dimensionarlo) """
+        return self.cache.stats()
 
     def calculate_score(self, date: Optional[date] = None):
-        if self._is_cached(date):
-            logger.info(f"Datos ya calculados para {date}.... Usando caché")
-            return self._last_score
+        with span("ScoreCalculator.calculate_score"):
+            date = self._resolve_date(date)
+            cache_key = self._cache_key(date)
+            cached = self.cache.get(cache_key)
+            record_cache("ScoreCalculator.cache", cached is not None)
+            if cached is not None:
+                logger.info(f"Datos ya calculados para {date}.... Usando caché")
+                return cached
+            with span("calendar.validate_date"):
+                if not get_a_validated_date(str(date)):
+                    raise ValueError(f"Invalid Date")
+
+            total_weight = self._validate_weights()
+            results = self._map_indicators(lambda indicator: self.scorer_fn(indicator, date))
+            return self._store_score(date, cache_key, results, total_weight)
+
+    def _resolve_date(self, date):
+        """ Si no se recibe fecha se usa el ultimo cierre habil """
         if date is None:
             logger.warning(f"[SC]Fecha no establecida.")
             logger.info(f"Buscando ultimo cierre habil....")
@@ -44,64 +127,188 @@ class ScoreCalculator:
         else:
             logger.info(f"Buscando datos para: {date}....")
         logger.info(f" -> Fecha a calcular {date}")
-        if not get_a_validated_date(str(date)):
-            raise ValueError(f"Invalid Date")
+        return date
 
+    def _store_score(self, date, cache_key, results: List[tuple], total_weight: float) -> float:
+        """
+        Valida y pondera [(nombre, score)], y guarda el resultado en cache, matriz y MarketReport.
+        - La matriz solo se actualiza en memoria; se persiste en calculate_scores o con score_matrix.save()
+        """
         score_final = 0.0
+        normalized = {}
+
+        for name, score in results:
+            self._validate_score(name, score)
+            normalized[name] = score
+            score_final += (score * 100) * self.weights[name]
+        score_final = score_final / total_weight
+        self.cache.set(cache_key, score_final)
+        self.score_matrix.set_params(self._params_fingerprint())
+        self.score_matrix.update(date, normalized)
+
+        # Guardar en MarketReport
+        report = MarketReport()
+        report.set_data("score_calculator", round(score_final), str(date)) # El valor del calculo final
+        return score_final
+    
+    def calculate_scores(self, start, end) -> Dict[date, float]:
+        """
+        Calcula el score para cada sesion NYSE entre start y end (ambas inclusive).
+        - Cada indicador obtiene su serie una sola vez mediante get_scores()
+        - Retorna un diccionario {fecha: score} ordenado por fecha
+        """
+        with span("ScoreCalculator.calculate_scores"):
+            sessions = self._sessions_between(start, end)
+            if not sessions:
+                return {}
+
+            total_weight = self._validate_weights()
+            results = self._map_indicators(lambda indicator: indicator.get_scores(sessions))
+            return self._store_scores(sessions, results, total_weight)
+
+    def _sessions_between(self, start, end) -> List[date]:
+        """ Valida el rango y devuelve las sesiones NYSE entre start y end """
+        start, end = str(start), str(end)
+        if not (validate_date_iso_format(start) and validate_date_iso_format(end)):
+            raise ValueError(f"Formato de fecha inválido: {start} - {end}")
+        if not validate_date_in_range(start):
+            raise ValueError(f"Date Out Of Range Error: {start}")
+        if not validate_date_not_future(end):
+            raise ValueError(f"Future Date Error: {end}")
+        if start > end:
+            raise ValueError(f"La fecha inicial {start} es posterior a la final {end}")
+
+        sessions = get_trading_sessions(start, end)
+        logger.info(f" -> Sesiones a calcular: {len(sessions)} ({start} a {end})")
+        return sessions
+
+    def _store_scores(self, sessions: List[date], results: List[tuple], total_weight: float) -> Dict[date, float]:
+        """
+        Valida y pondera [(nombre, {fecha: score})] y guarda los scores normalizados en la matriz.
+        - Una fecha sin score de algun indicador (p.ej. Fear & Greed antes de su historico) no detiene
+          el lote: se omite del resultado y en la matriz ese indicador queda como NaN
+        - Un score fuera de rango sigue siendo un error
+        """
+        scores = {session: 0.0 for session in sessions}
+        normalized = {session: {} for session in sessions}
+        incompletas = set()
+
+        for name, indicator_scores in results:
+            weight = self.weights[name]
+            for session in sessions:
+                score = indicator_scores.get(session)
+                if score is None:
+                    incompletas.add(session)
+                    continue
+                self._validate_score(name, score, session)
+                normalized[session][name] = score
+                scores[session] += (score * 100) * weight
+
+        if incompletas:
+            logger.warning(f"{len(incompletas)} de {len(sessions)} sesiones sin score de todos los indicadores: se omiten")
+        self.score_matrix.set_params(self._params_fingerprint())
+        self.score_matrix.update_many(normalized)
+        self.score_matrix.save()
+        return {session: score / total_weight for session, score in scores.items() if session not in incompletas}
+
+    def reweight(self, weights: Optional[Dict[str, float]] = None) -> Dict[date, float]:
+        """
+        Recalcula el score de todas las fechas ya calculadas con otros pesos, sin descargar datos.
+        - Usa la matriz de scores normalizados (fechas × indicadores) y un solo producto matricial
+        - Si weights es None se usan los pesos actuales
+        """
+        weights = weights if weights is not None else self.weights
+        self._validate_weights(weights)
+        names = [type(indicator).__name__ for indicator in self.indicators]
+        # Los scores calculados con otros parametros de los indicadores no se reutilizan
+        self.score_matrix.set_params(self._params_fingerprint())
+        return self.score_matrix.reweight({name: weights[name] for name in names})
+
+    def _map_indicators(self, fn: Callable[[IndicatorModule], object]) -> List[tuple]:
+        """
+        Aplica fn a cada indicador y retorna [(nombre, resultado)] en el orden de self.indicators.
+        - En modo concurrente las llamadas se ejecutan en paralelo; el orden del resultado
+          no cambia, por lo que la agregacion ponderada sigue siendo determinista.
+        """
+        inicio = time.monotonic()
+
+        def timed(indicator):
+            name = type(indicator).__name__
+            limite = self._timeout_for(name)
+            # La espera por el lock tambien cuenta dentro del tiempo limite del indicador
+            restante = None if limite is None else inicio + limite - time.monotonic()
+            with span(f"indicator.{name}"):
+                return call_locked(indicator, fn, indicator, timeout=restante)
+
+        if not self.concurrent:
+            return [(type(indicator).__name__, timed(indicator)) for indicator in self.indicators]
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers or len(self.indicators) or 1, thread_name_prefix="indicator")
+        try:
+            futures = [(type(indicator).__name__, executor.submit(timed, indicator)) for indicator in self.indicators]
+            results = []
+            for name, future in futures:
+                limite = self._timeout_for(name)
+                restante = None if limite is None else max(0.0, inicio + limite - time.monotonic())
+                try:
+                    results.append((name, future.result(timeout=restante)))
+                except FuturesTimeoutError:
+                    raise ValueError(f"El indicador '{name}' excedió el tiempo límite de {limite}s")
+            return results
+        finally:
+            # No esperar a hilos que excedieron su tiempo límite
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _timeout_for(self, name: str) -> Optional[float]:
+        """ Tiempo limite (segundos) para un indicador, contado desde el inicio de la evaluacion """
+        if isinstance(self.timeout, dict):
+            return self.timeout.get(name)
+        return self.timeout
+
+    def _validate_weights(self, weights: Optional[Dict[str, float]] = None) -> float:
+        """ Valida el peso de cada indicador y retorna la suma total (debe ser 1.0) """
+        weights = weights if weights is not None else self.weights
         total_weight = 0.0
 
         for indicator in self.indicators:
             name = type(indicator).__name__
 
-            if name not in self.weights:
+            if name not in weights:
                 raise ValueError(f"Falta peso para indicador: {name}")
 
-            weight = self.weights[name]
+            weight = weights[name]
 
             if weight == 404:
                 raise ValueError(f"❌ Hubo un problema al cargar los pesos desde Configuracion Global")
 
             if weight <= 0:
                 raise ValueError(f"El peso para: '{name}' debe ser mayor que cero (actual: {weight})")
-            
-            total_weight += weight
 
-            score = self.scorer_fn(indicator, date)
-
-            if score is None:
-                raise ValueError(f"El indicador '{name}' retornó un score Nulo")
-            if not (0.0 <= score <= 1.0):
-                raise ValueError(f"Score fuera de rango para: '{name}': {score}")
+            total_weight += weight
 
-            score_final += (score * 100) * weight    
-        #print(f"Total de pesos: {total_weight}")
-            #print(f"Score antes del final: {score_final}")
         if total_weight != 1.0:
             raise ValueError(f"El resultado de la suma de los pesos no es 1.0 (actual: {total_weight})")
-        score_final = score_final / total_weight
-        #self._last_score = score_final / total_weight
-        self._last_score = score_final
-        self._last_calculated_date = date
+        return total_weight
+
+    @staticmethod
+    def _validate_score(name, score, date=None):
+        """ Verifica que el score de un indicador exista y este entre 0 y 1 """
+        sufijo = f" ({date})" if date is not None else ""
+        if score is None:
+            raise ValueError(f"El indicador '{name}' retornó un score Nulo{sufijo}")
+        if not (0.0 <= score <= 1.0):
+            raise ValueError(f"Score fuera de rango para: '{name}': {score}{sufijo}")
 
-        # Guardar en MarketReport
-        report = MarketReport()
-        report.set_data("score_calculator", round(score_final), str(date)) # El valor del calculo final
-        return self._last_score
-    
     @classmethod
     def from_global_config(cls):
         """
         Fabrica un ScoreCalculator leyendo:
         1. Configuración global de pesos
-        2. Instancias de los indicadores por defecto
+        2. Instancias compartidas de los indicadores por defecto (indicators.registry)
+        3. Cache de scores y matriz de scores compartidos por el proceso (indicators.registry)
         """
-        # Instanciar indicadores
-        indicators = [
-            SPXIndicator(),
-            FearGreedIndicator(),
-            VixIndicator(),
-            ShillerPEIndicator()
-        ]
+        # Reutilizar los indicadores del proceso para conservar sus caches
+        indicators = default_indicators()
 
         # Mapear pesos según nombre de clase
         pesos = {
@@ -113,7 +320,16 @@ class ScoreCalculator:
                 (indicators[3], "shiller"),
             ]
         }
-        return cls(indicators=indicators, weights=pesos)
+        # Evaluacion concurrente opcional (desactivada por defecto)
+        config = get_config()
+        concurrency = config.get('concurrency', {})
+        score_cache = config.get('score_cache', {})
+        return cls(indicators=indicators, weights=pesos,
+                   concurrent=concurrency.get('enabled', False),
+                   max_workers=concurrency.get('max_workers'),
+                   timeout=concurrency.get('timeout'),
+                   cache=get_score_cache(maxsize=score_cache.get('maxsize', 128), ttl=score_cache.get('ttl')),
+                   score_matrix=get_score_matrix())
 
     @staticmethod
     def get_global_score(rounded: bool = False, date: Optional[date] = None) -> float:
@@ -131,7 +347,7 @@ class ScoreCalculator:
 def valid_weight(param):
     """Obtienemos el peso de un indicador desde la configuración global"""
     try:
-        weights = config.get('weights', {})
+        weights = get_config().get('weights', {})
 
         # Verifico si el parametro existe en los pesos
         if param in weights:
@@ -0,0 +1,68 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+import threading
+import time
+
+class ScoreCache:
+    """
+    Cache LRU acotado con expiracion opcional (TTL) para los scores calculados.
+    - maxsize: Numero maximo de entradas; al excederlo se descarta la menos usada
+    - ttl: Segundos de vida de cada entrada (None = sin expiracion)
+    - Cuenta aciertos (hits) y fallos (misses) para poder dimensionarlo
+    """
+    def __init__(self, maxsize: int = 128, ttl: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        if maxsize <= 0:
+            raise ValueError(f"El tamaño del cache debe ser mayor que cero (actual: {maxsize})")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """ Devuelve el valor cacheado o None si no existe o ya expiro """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                if self.ttl is None or self._clock() - stored_at < self.ttl:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]  # Entrada expirada
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any):
+        """ Guarda un valor y descarta la entrada menos usada si se supera maxsize """
+        with self._lock:
+            self._data[key] = (value, self._clock())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """ Vacia el cache (los contadores se conservan) """
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """ Estadisticas de uso del cache """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,173 @@
+import json
+import os
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCORE_MATRIX_FILE = "data/score_matrix.npz"
+
+def _as_date(value) -> date:
+    """ Acepta date o cadena 'YYYY-MM-DD' """
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+class ScoreMatrix:
+    """
+    Matriz fechas × indicadores con los scores normalizados (0-1) de cada indicador.
+    - Permite recalcular el score compuesto de todo el historico con otros pesos
+      sin volver a descargar datos (un solo producto matricial).
+    - path: Archivo .npz opcional donde se persiste la matriz entre ejecuciones.
+    - params: Huella de los parametros de cada indicador {nombre: json}. Los scores de un
+      indicador cuyos parametros cambiaron (umbrales, periodos) se descartan (set_params).
+    - Es segura entre hilos: ScoreCalculator.from_global_config comparte una instancia por proceso.
+    """
+    def __init__(self, path: Optional[str] = None, params: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.params: Dict[str, str] = dict(params or {})
+        self._scores: Dict[date, Dict[str, float]] = {}
+        self._array = None  # (fechas, nombres, valores) construido bajo demanda
+        self._lock = threading.RLock()
+
+    def set_params(self, params: Dict[str, str]) -> List[str]:
+        """
+        Registra la huella de parametros de los indicadores {nombre: json}.
+        - Si un indicador ya tiene scores calculados con otra huella (o sin huella) se descartan
+        - Retorna los nombres de los indicadores descartados
+        """
+        with self._lock:
+            stale = [name for name, fingerprint in params.items()
+                     if self.params.get(name) != fingerprint and name in self.names]
+            for scores in self._scores.values():
+                for name in stale:
+                    scores.pop(name, None)
+            if stale:
+                logger.warning(f"Scores descartados por cambio de parametros: {stale}")
+                self._array = None
+            self.params.update(params)
+            return stale
+
+    def update(self, fecha, scores: Dict[str, float]):
+        """ Guarda los scores normalizados de los indicadores para una fecha """
+        with self._lock:
+            self._scores.setdefault(_as_date(fecha), {}).update(scores)
+            self._array = None
+
+    def update_many(self, scores_by_date: Dict[date, Dict[str, float]]):
+        """ Guarda los scores normalizados de varias fechas """
+        with self._lock:
+            for fecha, scores in scores_by_date.items():
+                self._scores.setdefault(_as_date(fecha), {}).update(scores)
+            self._array = None
+
+    @property
+    def names(self) -> List[str]:
+        with self._lock:
+            return sorted({name for scores in self._scores.values() for name in scores})
+
+    def to_array(self, names: Optional[List[str]] = None) -> Tuple[List[date], List[str], np.ndarray]:
+        """
+        Devuelve (fechas, nombres, valores) con valores de forma (n_fechas, n_indicadores).
+        - Los scores faltantes quedan como NaN
+        """
+        with self._lock:
+            return self._to_array(names)
+
+    def _to_array(self, names: Optional[List[str]]) -> Tuple[List[date], List[str], np.ndarray]:
+        names = list(names) if names is not None else self.names
+        if self._array is None or self._array[1] != names:
+            dates = sorted(self._scores)
+            values = np.full((len(dates), len(names)), np.nan)
+            for i, fecha in enumerate(dates):
+                row = self._scores[fecha]
+                for j, name in enumerate(names):
+                    if name in row:
+                        values[i, j] = row[name]
+            self._array = (dates, names, values)
+        return self._array
+
+    def reweight(self, weights: Dict[str, float]) -> Dict[date, float]:
+        """
+        Score compuesto (0-100) de cada fecha con los pesos indicados: valores @ pesos.
+        - Solo se incluyen las fechas que tienen score para todos los indicadores
+        """
+        names = list(weights)
+        dates, _, values = self.to_array(names)
+        if not dates:
+            return {}
+        w = np.fromiter(weights.values(), dtype=float, count=len(names))
+        completos = ~np.isnan(values).any(axis=1)
+        composite = (values[completos] @ w) * 100 / w.sum()
+        fechas = [fecha for fecha, ok in zip(dates, completos) if ok]
+        return dict(zip(fechas, composite.tolist()))
+
+    def save(self, path: Optional[str] = None):
+        """
+        Persiste la matriz en formato .npz (fechas como ordinales y huella de parametros).
+        - Se escribe en un temporal y se reemplaza con os.replace: nunca queda un archivo a medias
+        - Las fechas guardadas por otro proceso que no estan en memoria se conservan
+          (solo las de indicadores con la misma huella de parametros)
+        """
+        path = path or self.path
+        if path is None:
+            return
+        with self._lock:
+            self._merge_missing(path)
+            dates, names, values = self._to_array(None)
+            params = json.dumps(self.params, sort_keys=True)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                np.savez(f, ordinals=np.array([d.toordinal() for d in dates], dtype=np.int64),
+                         names=np.array(names, dtype=str), values=values, params=np.array(params))
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _merge_missing(self, path: str):
+        """ Agrega los scores del archivo que no estan en memoria y tienen la misma huella """
+        if not Path(path).exists():
+            return
+        try:
+            disco = ScoreMatrix.load(path)
+        except Exception as e:
+            logger.warning(f"No se pudo leer la matriz de scores {path}: {e}. Se sobrescribe")
+            return
+        validos = {name for name, fingerprint in disco.params.items() if self.params.get(name) == fingerprint}
+        for fecha, scores in disco._scores.items():
+            actuales = self._scores.setdefault(fecha, {})
+            for name, value in scores.items():
+                if name in validos and name not in actuales:
+                    actuales[name] = value
+        self._array = None
+
+    @classmethod
+    def load(cls, path: str = SCORE_MATRIX_FILE) -> "ScoreMatrix":
+        """ Carga una matriz persistida; si el archivo no existe devuelve una matriz vacia """
+        matrix = cls(path=path)
+        if not Path(path).exists():
+            return matrix
+        with np.load(path) as data:
+            names = data["names"].tolist()
+            ordinals = data["ordinals"].tolist()
+            values = data["values"]
+            # Archivos anteriores a la huella de parametros: sus scores se descartan en set_params
+            matrix.params = json.loads(str(data["params"])) if "params" in data.files else {}
+        presentes = ~np.isnan(values)
+        valores = values.tolist()
+        for ordinal, row, mask in zip(ordinals, valores, presentes.tolist()):
+            matrix._scores[date.fromordinal(ordinal)] = {
+                name: value for name, value, ok in zip(names, row, mask) if ok
+            }
+        return matrix
+
+    def __len__(self):
+        with self._lock:
+            return len(self._scores)
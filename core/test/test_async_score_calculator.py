@@ -0,0 +1,158 @@
+import asyncio
+import threading
+import time
+import pytest
+from datetime import date
+from unittest.mock import MagicMock
+from indicators.AsyncIndicatorModule import AsyncIndicatorModule
+from indicators.IndicatorModule import IndicatorModule
+from core.asyncScoreCalculator import AsyncScoreCalculator, shutdown_executors
+
+DATE_BACKTESTING = "2025-12-17"
+
+class AsyncFake(AsyncIndicatorModule):
+    def __init__(self, score, delay=0.0):
+        self.score = score
+        self.delay = delay
+        self.calls = 0
+
+    async def fetch_data(self, date):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.score
+
+    async def normalize(self, date):
+        return await self.fetch_data(date)
+
+class SyncStateful(IndicatorModule):
+    """ Guarda el dato de la ultima fecha en la instancia, como los indicadores compartidos """
+    def __init__(self, scores, delay=0.05):
+        self.scores = scores
+        self.delay = delay
+        self.value = None
+
+    def fetch_data(self, date):
+        self.value = self.scores[date]
+        time.sleep(self.delay)
+
+    def normalize(self, date):
+        self.fetch_data(date)
+        return self.value
+
+@pytest.fixture(autouse=True)
+def fecha_valida(monkeypatch):
+    monkeypatch.setattr("core.asyncScoreCalculator.get_a_validated_date", lambda d: True)
+
+def test_async_indicador_asincrono_y_sincrono():
+    asincrono = AsyncFake(0.5)
+    sincrono = MagicMock()
+    sincrono.get_score.return_value = 1.0
+    calculator = AsyncScoreCalculator([asincrono, sincrono], {"AsyncFake": 0.5, "MagicMock": 0.5})
+
+    assert asyncio.run(calculator.calculate_score(DATE_BACKTESTING)) == 75.0
+    assert asincrono.calls == 1
+    sincrono.get_score.assert_called_once_with(DATE_BACKTESTING)
+
+def test_async_indicadores_sincronos_en_executor_concurrente():
+    # La barrera solo se libera si ambos indicadores sincronos corren en paralelo en el executor
+    barrera = threading.Barrier(2, timeout=5)
+
+    def get_score(d):
+        barrera.wait()
+        return 0.5
+
+    indicadores = []
+    for nombre in ("SyncA", "SyncB"):
+        ind = MagicMock()
+        type(ind).__name__ = nombre
+        ind.get_score.side_effect = get_score
+        indicadores.append(ind)
+    calculator = AsyncScoreCalculator(indicadores, {"SyncA": 0.5, "SyncB": 0.5}, max_workers=2)
+
+    assert asyncio.run(calculator.calculate_score(DATE_BACKTESTING)) == 50.0
+
+def test_async_no_bloquea_event_loop():
+    async def main():
+        calculator = AsyncScoreCalculator([AsyncFake(0.5, delay=0.05)], {"AsyncFake": 1.0})
+        ticks = 0
+        async def contador():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+        tarea = asyncio.create_task(contador())
+        resultados = await asyncio.gather(*(calculator.calculate_score(f"2025-12-1{i}") for i in range(5)))
+        tarea.cancel()
+        return resultados, ticks
+
+    resultados, ticks = asyncio.run(main())
+    assert resultados == [50.0] * 5
+    assert ticks > 1
+
+def test_async_timeout_por_indicador():
+    calculator = AsyncScoreCalculator([AsyncFake(0.5, delay=1)], {"AsyncFake": 1.0}, timeout=0.01)
+    with pytest.raises(ValueError, match="excedió el tiempo límite"):
+        asyncio.run(calculator.calculate_score(DATE_BACKTESTING))
+
+def test_async_timeout_no_deja_bloqueado_el_indicador():
+    # Un hilo abandonado por wait_for retiene el lock; las peticiones siguientes no deben quedar colgadas
+    liberar = threading.Event()
+
+    class Bloqueado(SyncStateful):
+        def fetch_data(self, date):
+            liberar.wait(5)
+            super().fetch_data(date)
+
+    indicador = Bloqueado({DATE_BACKTESTING: 0.5}, delay=0)
+    calculator = AsyncScoreCalculator([indicador], {"Bloqueado": 1.0}, timeout=0.05, max_workers=2)
+    try:
+        for _ in range(2):
+            inicio = time.monotonic()
+            with pytest.raises(ValueError, match="excedió el tiempo límite"):
+                asyncio.run(calculator.calculate_score(DATE_BACKTESTING))
+            assert time.monotonic() - inicio < 2
+        # El hilo que esperaba el lock se rinde a tiempo: el pool (2 hilos) sigue teniendo uno libre
+        assert calculator.executor.submit(lambda: True).result(timeout=1)
+    finally:
+        liberar.set()
+    assert asyncio.run(AsyncScoreCalculator([indicador], {"Bloqueado": 1.0}, timeout=5).calculate_score(DATE_BACKTESTING)) == 50.0
+
+def test_async_usa_cache():
+    indicador = AsyncFake(0.5)
+    calculator = AsyncScoreCalculator([indicador], {"AsyncFake": 1.0})
+    asyncio.run(calculator.calculate_score(DATE_BACKTESTING))
+    asyncio.run(calculator.calculate_score(DATE_BACKTESTING))
+    assert indicador.calls == 1
+    assert calculator.cache_stats()["hits"] == 1
+
+def test_async_calculate_scores(monkeypatch):
+    sesiones = [date(2025, 12, 15), date(2025, 12, 16)]
+    monkeypatch.setattr("core.scoreCalculator.get_trading_sessions", lambda start, end: sesiones)
+    monkeypatch.setattr("data.market_dates.get_market_today", lambda: date(2025, 12, 18))
+    sincrono = MagicMock()
+    sincrono.get_scores.return_value = {d: 1.0 for d in sesiones}
+    calculator = AsyncScoreCalculator([AsyncFake(0.5), sincrono], {"AsyncFake": 0.5, "MagicMock": 0.5})
+
+    scores = asyncio.run(calculator.calculate_scores("2025-12-15", "2025-12-16"))
+    assert scores == {sesiones[0]: 75.0, sesiones[1]: 75.0}
+
+def test_async_fechas_concurrentes_sobre_indicador_compartido():
+    # Dos peticiones con fechas distintas sobre la misma instancia no deben mezclar su estado
+    indicador = SyncStateful({"2025-12-15": 0.2, "2025-12-16": 0.8})
+    calculator = AsyncScoreCalculator([indicador], {"SyncStateful": 1.0}, max_workers=4)
+
+    async def main():
+        return await asyncio.gather(calculator.calculate_score("2025-12-15"), calculator.calculate_score("2025-12-16"))
+
+    assert asyncio.run(main()) == [20.0, 80.0]
+
+def test_async_executor_compartido_entre_calculadoras():
+    # Cada peticion crea una calculadora: todas deben reutilizar el mismo pool de hilos
+    primera = AsyncScoreCalculator([AsyncFake(0.5)], {"AsyncFake": 1.0}, max_workers=3)
+    segunda = AsyncScoreCalculator([AsyncFake(0.5)], {"AsyncFake": 1.0}, max_workers=3)
+    assert primera.executor is segunda.executor
+
+    shutdown_executors()
+    tercera = AsyncScoreCalculator([AsyncFake(0.5)], {"AsyncFake": 1.0}, max_workers=3)
+    assert tercera.executor is not primera.executor
+    assert asyncio.run(tercera.calculate_score(DATE_BACKTESTING)) == 50.0
@@ -0,0 +1,30 @@
+import subprocess
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[2]
+
+def test_importar_modulos_no_hace_io():
+    # Proceso nuevo: importar el pipeline no debe consultar el calendario/yfinance ni leer la configuracion
+    codigo = (
+        "import data.market_dates as md, config.config_loader as cl\n"
+        "def falla(*a, **k): raise SystemExit('I/O al importar')\n"
+        "md.yfinance_window_for_last_close = falla\n"
+        "md.get_last_trading_date = falla\n"
+        "cl.get_config = cl.load_config = falla\n"
+        "import core.scoreCalculator, indicators.spxIndicator, indicators.vixIndicator, indicators.shillerPEIndicator\n"
+    )
+    resultado = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True)
+    assert resultado.returncode == 0, resultado.stderr
+
+def test_importar_no_carga_dependencias_pesadas():
+    # yfinance, pandas_market_calendars, bs4 y psycopg2 se importan en el primer uso
+    codigo = (
+        "import sys\n"
+        "import core.scoreCalculator, data.scorer_backup, notifications.telegramNotifier\n"
+        "pesados = ['yfinance', 'pandas_market_calendars', 'bs4', 'psycopg2', 'fear_and_greed']\n"
+        "print(','.join(m for m in pesados if m in sys.modules))\n"
+    )
+    resultado = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True)
+    assert resultado.returncode == 0, resultado.stderr
+    assert resultado.stdout.strip() == ""
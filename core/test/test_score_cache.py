@@ -0,0 +1,45 @@
+import pytest
+from core.score_cache import ScoreCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+def test_get_set_y_contadores():
+    cache = ScoreCache(maxsize=2)
+    assert cache.get("a") is None
+    cache.set("a", 10.0)
+    assert cache.get("a") == 10.0
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+def test_descarta_el_menos_usado():
+    cache = ScoreCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")      # 'a' pasa a ser el mas reciente
+    cache.set("c", 3)   # se descarta 'b'
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_expiracion_ttl():
+    clock = FakeClock()
+    cache = ScoreCache(maxsize=4, ttl=10, clock=clock)
+    cache.set("a", 1)
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10.0
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+def test_tamano_invalido():
+    with pytest.raises(ValueError, match="debe ser mayor que cero"):
+        ScoreCache(maxsize=0)
@@ -1,6 +1,9 @@
 import pytest
 from unittest.mock import MagicMock
 from unittest import mock
+from datetime import date
+import threading
+import numpy as np
 
 from core.scoreCalculator import ScoreCalculator, valid_weight
 
@@ -167,3 +170,236 @@ def test_get_global_score_redondeado(monkeypatch):
     # Debe devolver el valor redondeado
     assert result == 43
     fake_calc.calculate_score.assert_called_once()
+
+###### Calculo por rango de fechas (calculate_scores)
+SESIONES = [date(2025, 12, 15), date(2025, 12, 16), date(2025, 12, 17)]
+
+@pytest.fixture
+def sesiones(monkeypatch):
+    monkeypatch.setattr("core.scoreCalculator.get_trading_sessions", lambda start, end: SESIONES)
+    monkeypatch.setattr("data.market_dates.get_market_today", lambda: date(2025, 12, 18))
+    return SESIONES
+
+def test_calculate_scores_una_llamada_por_indicador(sesiones):
+    mock_a = MagicMock()
+    mock_b = MagicMock()
+    type(mock_a).__name__ = "IndicadorA"
+    type(mock_b).__name__ = "IndicadorB"
+    mock_a.get_scores.return_value = {d: 0.5 for d in sesiones}
+    mock_b.get_scores.return_value = {d: 1.0 for d in sesiones}
+
+    calculator = ScoreCalculator([mock_a, mock_b], {"IndicadorA": 0.5, "IndicadorB": 0.5})
+    scores = calculator.calculate_scores("2025-12-15", "2025-12-17")
+
+    assert list(scores) == sesiones
+    assert all(s == pytest.approx(75.0) for s in scores.values())
+    mock_a.get_scores.assert_called_once_with(sesiones)
+    mock_b.get_scores.assert_called_once_with(sesiones)
+    mock_a.get_score.assert_not_called()
+
+def test_calculate_scores_score_nulo_en_fecha(sesiones):
+    # Una fecha sin datos de un indicador se omite sin abortar el resto del rango
+    mock_a, mock_b = _indicadores(None, None)
+    mock_a.get_scores.return_value = {sesiones[0]: 0.5, sesiones[1]: None, sesiones[2]: 0.5}
+    mock_b.get_scores.return_value = {d: 1.0 for d in sesiones}
+    calculator = ScoreCalculator([mock_a, mock_b], {"Indicador0": 0.5, "Indicador1": 0.5})
+
+    assert calculator.calculate_scores("2025-12-15", "2025-12-17") == {sesiones[0]: 75.0, sesiones[2]: 75.0}
+    dates, _, values = calculator.score_matrix.to_array(["Indicador0", "Indicador1"])
+    assert dates == sesiones
+    assert np.isnan(values[1, 0]) and values[1, 1] == 1.0
+
+def test_calculate_scores_score_fuera_de_rango_en_fecha(sesiones):
+    mock_indicator = MagicMock()
+    mock_indicator.get_scores.return_value = {sesiones[0]: 0.5, sesiones[1]: 1.5, sesiones[2]: 0.5}
+
+    with pytest.raises(ValueError, match="Score fuera de rango"):
+        ScoreCalculator([mock_indicator], {"MagicMock": 1.0}).calculate_scores("2025-12-15", "2025-12-17")
+
+def test_calculate_scores_rango_invertido(sesiones):
+    with pytest.raises(ValueError, match="es posterior a la final"):
+        ScoreCalculator([MagicMock()], {"MagicMock": 1.0}).calculate_scores("2025-12-17", "2025-12-15")
+
+def test_calculate_scores_fecha_futura(sesiones):
+    with pytest.raises(ValueError, match="Future Date Error"):
+        ScoreCalculator([MagicMock()], {"MagicMock": 1.0}).calculate_scores("2025-12-15", "2025-12-19")
+
+###### Evaluacion concurrente
+def _indicadores(*scores):
+    indicators = []
+    for i, score in enumerate(scores):
+        mock_indicator = MagicMock()
+        type(mock_indicator).__name__ = f"Indicador{i}"
+        mock_indicator.get_score.return_value = score
+        indicators.append(mock_indicator)
+    return indicators
+
+def test_concurrent_mismo_resultado_que_secuencial():
+    indicators = _indicadores(0.4, 0.28, 0.08, 0.08)
+    weights = {"Indicador0": 0.3, "Indicador1": 0.2, "Indicador2": 0.2, "Indicador3": 0.3}
+
+    secuencial = ScoreCalculator(indicators, weights).calculate_score(DATE_BACKTESTING)
+    concurrente = ScoreCalculator(indicators, weights, concurrent=True, max_workers=2).calculate_score(DATE_BACKTESTING)
+    assert concurrente == secuencial
+
+def test_concurrent_evalua_en_paralelo():
+    indicators = _indicadores(0.5, 0.5, 0.5)
+    weights = {"Indicador0": 0.5, "Indicador1": 0.25, "Indicador2": 0.25}
+    # La barrera solo se libera si los tres indicadores se ejecutan a la vez
+    barrera = threading.Barrier(3, timeout=5)
+
+    def scorer(indicator, d):
+        barrera.wait()
+        return indicator.get_score(d)
+
+    calculator = ScoreCalculator(indicators, weights, scorer_fn=scorer, concurrent=True)
+    assert calculator.calculate_score(DATE_BACKTESTING) == 50.0
+
+def test_concurrent_timeout_por_indicador():
+    indicators = _indicadores(0.5, 0.5)
+    weights = {"Indicador0": 0.5, "Indicador1": 0.5}
+    liberar = threading.Event()
+
+    def scorer(indicator, d):
+        if type(indicator).__name__ == "Indicador1":
+            liberar.wait(5)
+        return indicator.get_score(d)
+
+    calculator = ScoreCalculator(indicators, weights, scorer_fn=scorer, concurrent=True, timeout={"Indicador1": 0.05})
+    try:
+        with pytest.raises(ValueError, match="excedió el tiempo límite"):
+            calculator.calculate_score(DATE_BACKTESTING)
+    finally:
+        liberar.set()
+
+def test_timeout_seguido_de_llamada_secuencial_no_se_bloquea():
+    # El hilo abandonado por tiempo limite sigue reteniendo el lock del indicador compartido:
+    # la siguiente evaluacion secuencial debe fallar por tiempo limite en vez de esperar para siempre
+    indicators = _indicadores(0.5)
+    weights = {"Indicador0": 1.0}
+    liberar = threading.Event()
+    en_curso = threading.Event()
+
+    def lento(indicator, d):
+        en_curso.set()
+        liberar.wait(5)
+        return indicator.get_score(d)
+
+    concurrente = ScoreCalculator(indicators, weights, scorer_fn=lento, concurrent=True, timeout=0.05)
+    secuencial = ScoreCalculator(indicators, weights, timeout=0.05)
+    try:
+        with pytest.raises(ValueError, match="excedió el tiempo límite"):
+            concurrente.calculate_score(DATE_BACKTESTING)
+        assert en_curso.is_set()
+        with pytest.raises(ValueError, match="excedió el tiempo límite"):
+            secuencial.calculate_score(DATE_BACKTESTING)
+    finally:
+        liberar.set()
+
+    # Liberado el lock, la misma instancia vuelve a evaluarse con normalidad
+    assert ScoreCalculator(indicators, weights, timeout=5).calculate_score(DATE_BACKTESTING) == 50.0
+
+def test_concurrent_propaga_errores_del_indicador():
+    indicators = _indicadores(0.5, None)
+    weights = {"Indicador0": 0.5, "Indicador1": 0.5}
+
+    with pytest.raises(ValueError, match="retornó un score Nulo"):
+        ScoreCalculator(indicators, weights, concurrent=True).calculate_score(DATE_BACKTESTING)
+
+###### Cache de scores
+def test_cache_alterna_fechas_sin_recalcular():
+    indicators = _indicadores(0.5)
+    calculator = ScoreCalculator(indicators, {"Indicador0": 1.0})
+
+    for _ in range(3):
+        calculator.calculate_score("2025-12-17")
+        calculator.calculate_score("2025-12-10")
+
+    assert indicators[0].get_score.call_count == 2
+    stats = calculator.cache_stats()
+    assert stats["hits"] == 4
+    assert stats["misses"] == 2
+
+def test_get_global_score_reutiliza_cache_entre_llamadas(monkeypatch):
+    from indicators.registry import reset_registry
+    reset_registry()
+    indicators = []
+    for nombre in ("SPXIndicator", "FearGreedIndicator", "VixIndicator", "ShillerPEIndicator"):
+        mock_indicator = MagicMock()
+        type(mock_indicator).__name__ = nombre
+        mock_indicator.get_score.return_value = 0.5
+        indicators.append(mock_indicator)
+    monkeypatch.setattr("core.scoreCalculator.default_indicators", lambda: indicators)
+    monkeypatch.setattr("core.scoreCalculator.get_a_validated_date", lambda d: True)
+    monkeypatch.setattr("core.scoreCalculator.ScoreMatrix.load", lambda path: None)
+
+    # Cada llamada crea su calculadora, pero el cache es el del proceso
+    for _ in range(2):
+        assert ScoreCalculator.get_global_score(date="2025-12-17") == 50.0
+        assert ScoreCalculator.get_global_score(date="2025-12-10") == 50.0
+
+    assert all(indicator.get_score.call_count == 2 for indicator in indicators)
+    reset_registry()
+
+def test_cache_cambio_de_pesos_recalcula():
+    indicators = _indicadores(0.5, 1.0)
+    calculator = ScoreCalculator(indicators, {"Indicador0": 0.5, "Indicador1": 0.5})
+    assert calculator.calculate_score(DATE_BACKTESTING) == 75.0
+
+    calculator.weights = {"Indicador0": 0.75, "Indicador1": 0.25}
+    assert calculator.calculate_score(DATE_BACKTESTING) == 62.5
+    assert indicators[0].get_score.call_count == 2
+
+def test_cache_cambio_de_parametros_recalcula():
+    from indicators.vixIndicator import VixIndicator
+    indicador = VixIndicator(yf_client=MagicMock(), vix_min=9, vix_max=80)
+    calculator = ScoreCalculator([indicador], {"VixIndicator": 1.0}, scorer_fn=lambda ind, d: 0.5)
+    clave = calculator._cache_key(DATE_BACKTESTING)
+
+    indicador.vix_max = 60
+    assert calculator._cache_key(DATE_BACKTESTING) != clave
+
+###### Recalculo solo de pesos (reweight)
+def test_reweight_sin_volver_a_calcular(sesiones):
+    mock_a, mock_b = _indicadores(None, None)
+    mock_a.get_scores.return_value = {d: 0.5 for d in sesiones}
+    mock_b.get_scores.return_value = {d: 1.0 for d in sesiones}
+    calculator = ScoreCalculator([mock_a, mock_b], {"Indicador0": 0.5, "Indicador1": 0.5})
+    original = calculator.calculate_scores("2025-12-15", "2025-12-17")
+
+    assert calculator.reweight() == pytest.approx(original)
+    nuevos = calculator.reweight({"Indicador0": 0.25, "Indicador1": 0.75})
+    assert all(score == pytest.approx(87.5) for score in nuevos.values())
+    mock_a.get_scores.assert_called_once()
+    mock_a.get_score.assert_not_called()
+
+def test_reweight_descarta_scores_con_otros_parametros(sesiones):
+    from indicators.IndicatorModule import IndicatorModule
+    class Umbral(IndicatorModule):
+        umbral = 10
+        def fetch_data(self, date): return None
+        def normalize(self, date): return 0.5
+        def get_params(self): return {"umbral": self.umbral}
+
+    indicador = Umbral()
+    calculator = ScoreCalculator([indicador], {"Umbral": 1.0})
+    calculator.calculate_scores("2025-12-15", "2025-12-17")
+    assert len(calculator.reweight()) == 3
+
+    indicador.umbral = 20
+    assert calculator.reweight() == {}
+
+def test_calculate_score_no_escribe_la_matriz(tmp_path, monkeypatch):
+    from core.score_matrix import ScoreMatrix
+    monkeypatch.setattr("core.scoreCalculator.get_a_validated_date", lambda d: True)
+    path = tmp_path / "score_matrix.npz"
+    calculator = ScoreCalculator(_indicadores(0.5), {"Indicador0": 1.0}, score_matrix=ScoreMatrix(path=str(path)))
+    calculator.calculate_score(DATE_BACKTESTING)
+    # Se guarda solo en memoria; el archivo se escribe en lote o explicitamente
+    assert len(calculator.score_matrix) == 1
+    assert not path.exists()
+
+def test_reweight_valida_pesos():
+    calculator = ScoreCalculator(_indicadores(0.5), {"Indicador0": 1.0})
+    with pytest.raises(ValueError, match="los pesos no es 1.0"):
+        calculator.reweight({"Indicador0": 0.5})
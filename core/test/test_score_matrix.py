@@ -0,0 +1,94 @@
+import pytest
+import numpy as np
+from datetime import date
+from core.score_matrix import ScoreMatrix
+
+@pytest.fixture
+def matrix():
+    m = ScoreMatrix()
+    m.update("2025-12-15", {"A": 0.5, "B": 1.0})
+    m.update_many({
+        date(2025, 12, 16): {"A": 0.2, "B": 0.4},
+        date(2025, 12, 17): {"A": 0.9},  # Falta B
+    })
+    return m
+
+def test_to_array_forma_y_faltantes(matrix):
+    dates, names, values = matrix.to_array()
+    assert dates == [date(2025, 12, 15), date(2025, 12, 16), date(2025, 12, 17)]
+    assert names == ["A", "B"]
+    assert values.shape == (3, 2)
+    assert np.isnan(values[2, 1])
+
+def test_reweight_producto_matricial(matrix):
+    result = matrix.reweight({"A": 0.5, "B": 0.5})
+    assert result[date(2025, 12, 15)] == pytest.approx(75.0)
+    assert result[date(2025, 12, 16)] == pytest.approx(30.0)
+    # Fechas incompletas se omiten
+    assert date(2025, 12, 17) not in result
+
+    result = matrix.reweight({"A": 0.25, "B": 0.75})
+    assert result[date(2025, 12, 15)] == pytest.approx(87.5)
+
+def test_save_y_load(matrix, tmp_path):
+    path = tmp_path / "score_matrix.npz"
+    matrix.save(str(path))
+
+    cargada = ScoreMatrix.load(str(path))
+    assert len(cargada) == 3
+    assert cargada.reweight({"A": 0.5, "B": 0.5}) == pytest.approx(matrix.reweight({"A": 0.5, "B": 0.5}))
+
+def test_load_sin_archivo(tmp_path):
+    assert len(ScoreMatrix.load(str(tmp_path / "no_existe.npz"))) == 0
+
+def test_save_atomico_sin_temporales(matrix, tmp_path):
+    path = tmp_path / "score_matrix.npz"
+    matrix.save(str(path))
+    matrix.save(str(path))
+    assert [p.name for p in tmp_path.iterdir()] == ["score_matrix.npz"]
+
+HUELLA = {"A": '{"umbral": 1}', "B": "{}"}
+
+@pytest.fixture
+def matrix_con_huella():
+    m = ScoreMatrix(params=HUELLA)
+    m.update_many({
+        date(2025, 12, 15): {"A": 0.5, "B": 1.0},
+        date(2025, 12, 16): {"A": 0.2, "B": 0.4},
+    })
+    return m
+
+def test_huella_de_parametros_persistida(matrix_con_huella, tmp_path):
+    path = tmp_path / "score_matrix.npz"
+    matrix_con_huella.save(str(path))
+
+    cargada = ScoreMatrix.load(str(path))
+    assert cargada.params == HUELLA
+    # Misma huella: se conservan los scores
+    assert cargada.set_params(HUELLA) == []
+    assert len(cargada.reweight({"A": 0.5, "B": 0.5})) == 2
+
+def test_cambio_de_parametros_descarta_scores(matrix_con_huella):
+    assert matrix_con_huella.set_params({"A": '{"umbral": 2}', "B": "{}"}) == ["A"]
+    # Sin scores de A ninguna fecha esta completa; los de B se conservan
+    assert matrix_con_huella.reweight({"A": 0.5, "B": 0.5}) == {}
+    assert matrix_con_huella.to_array(["B"])[2].ravel().tolist() == [1.0, 0.4]
+
+def test_matriz_sin_huella_se_descarta(matrix, tmp_path):
+    # Archivos guardados sin huella de parametros no se pueden validar
+    path = tmp_path / "score_matrix.npz"
+    matrix.save(str(path))
+    cargada = ScoreMatrix.load(str(path))
+    assert sorted(cargada.set_params(HUELLA)) == ["A", "B"]
+
+def test_save_conserva_fechas_de_otro_proceso(matrix_con_huella, tmp_path):
+    path = str(tmp_path / "score_matrix.npz")
+    matrix_con_huella.save(path)
+
+    otra = ScoreMatrix(path=path, params=HUELLA)
+    otra.update("2025-12-18", {"A": 0.1, "B": 0.1})
+    otra.save()
+
+    cargada = ScoreMatrix.load(path)
+    assert len(cargada) == 3
+    assert cargada.reweight({"A": 0.5, "B": 0.5})[date(2025, 12, 15)] == pytest.approx(75.0)
@@ -0,0 +1,97 @@
+import pytest
+import numpy as np
+import pandas as pd
+from datetime import date
+from unittest.mock import MagicMock
+from core.score_matrix import ScoreMatrix
+from core.weight_optimizer import weight_grid, forward_returns, evaluate_weights, rank_weights, optimize_weights
+
+@pytest.fixture
+def closes():
+    index = pd.bdate_range("2024-01-01", periods=60)
+    return pd.Series(np.linspace(100, 160, 60), index=index)
+
+@pytest.fixture
+def matrix(closes):
+    """ El indicador 'A' anticipa el rendimiento futuro, 'B' es ruido. """
+    rng = np.random.default_rng(7)
+    fwd = forward_returns(closes, [d.date() for d in closes.index], 5)
+    m = ScoreMatrix()
+    for d, r in zip(closes.index[:50], fwd[:50]):
+        m.update(d.date(), {"A": float(r * 10), "B": float(rng.random())})
+    return m
+
+def test_weight_grid_suma_uno_y_positivos():
+    grid = weight_grid(4, 0.05)
+    assert grid.shape == (969, 4)
+    assert np.allclose(grid.sum(axis=1), 1.0)
+    assert (grid > 0).all()
+
+def test_weight_grid_invalido():
+    with pytest.raises(ValueError, match="No hay combinaciones"):
+        weight_grid(4, 0.5)
+
+def test_forward_returns(closes):
+    fechas = [closes.index[0].date(), closes.index[-1].date(), date(2023, 12, 30)]
+    fwd = forward_returns(closes, fechas, 1)
+    assert fwd[0] == pytest.approx(closes.iloc[1] / closes.iloc[0] - 1)
+    assert np.isnan(fwd[1])   # Sin sesiones posteriores
+    assert np.isnan(fwd[2])   # Fecha sin cierre
+
+def test_evaluate_correlation_igual_a_pearson_por_candidato():
+    rng = np.random.default_rng(1)
+    values = rng.random((40, 3))
+    fwd = rng.random(40)
+    grid = weight_grid(3, 0.1)
+
+    resultado = evaluate_weights(values, grid, fwd, "correlation")
+    esperado = [np.corrcoef(values @ w, fwd)[0, 1] for w in grid]
+    assert resultado == pytest.approx(esperado)
+
+def test_evaluate_objetivo_invalido():
+    with pytest.raises(ValueError, match="Objetivo no soportado"):
+        evaluate_weights(np.ones((3, 2)), weight_grid(2, 0.5), np.ones(3), "sharpe")
+
+@pytest.mark.parametrize("objective", ["correlation", "spread"])
+def test_rank_weights_prefiere_indicador_predictivo(matrix, closes, objective):
+    ranking = rank_weights(matrix, closes, names=["A", "B"], step=0.1, horizon=5, objective=objective, top=3)
+    assert len(ranking) == 3
+    assert ranking[0]["weights"]["A"] == pytest.approx(0.9)
+    assert ranking[0][objective] >= ranking[1][objective]
+
+def test_rank_weights_solo_fechas_de_la_ventana(matrix, closes):
+    esperado = rank_weights(matrix, closes, names=["A", "B"], step=0.1, horizon=5, top=3)
+    # Fechas fuera de la ventana (otro periodo, ejecucion diaria) con la relacion invertida
+    fwd = forward_returns(closes, [d.date() for d in closes.index], 5)
+    for d, r in zip(closes.index[50:55], fwd[50:55]):
+        matrix.update(d.date(), {"A": float(-r * 10), "B": 0.5})
+
+    inicio, fin = closes.index[0].date().isoformat(), closes.index[49].date().isoformat()
+    ranking = rank_weights(matrix, closes, names=["A", "B"], step=0.1, horizon=5, top=3, start=inicio, end=fin)
+    assert ranking == esperado
+
+def test_optimize_weights_usa_matriz_y_una_descarga(matrix, closes):
+    client = MagicMock()
+    client.Ticker.return_value.history.return_value = pd.DataFrame({"Close": closes.to_numpy()}, index=closes.index)
+    ranking = optimize_weights("2024-01-01", "2024-03-08", matrix=matrix, names=["A", "B"], step=0.1, horizon=5, top=1, yf_client=client)
+    assert client.Ticker.return_value.history.call_count == 1
+    assert ranking[0]["weights"]["A"] == pytest.approx(0.9)
+
+def test_optimize_weights_sin_matriz_calcula_el_periodo(matrix, closes, monkeypatch):
+    from core.scoreCalculator import ScoreCalculator
+    sesiones = [d.date() for d in closes.index[:50]]
+    fechas, _, values = matrix.to_array(["A", "B"])
+    ind_a, ind_b = MagicMock(), MagicMock()
+    type(ind_a).__name__, type(ind_b).__name__ = "A", "B"
+    ind_a.get_scores.return_value = dict(zip(fechas, values[:, 0].tolist()))
+    # Sin historico al inicio del periodo (como Fear & Greed): no debe abortar el calculo
+    ind_b.get_scores.return_value = {d: (None if i < 3 else v) for i, (d, v) in enumerate(zip(fechas, values[:, 1].tolist()))}
+    calculator = ScoreCalculator([ind_a, ind_b], {"A": 0.5, "B": 0.5})
+    monkeypatch.setattr(ScoreCalculator, "from_global_config", classmethod(lambda cls: calculator))
+    monkeypatch.setattr("core.scoreCalculator.get_trading_sessions", lambda start, end: sesiones)
+
+    client = MagicMock()
+    client.Ticker.return_value.history.return_value = pd.DataFrame({"Close": closes.to_numpy()}, index=closes.index)
+    ranking = optimize_weights("2024-01-01", "2024-03-08", names=["A", "B"], step=0.1, horizon=5, top=1, yf_client=client)
+    ind_a.get_scores.assert_called_once_with(sesiones)
+    assert ranking[0]["weights"]["A"] == pytest.approx(0.9)
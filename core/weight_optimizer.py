@@ -0,0 +1,153 @@
+from datetime import date, timedelta
+from itertools import combinations
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from utils.lazy_import import lazy_module
+yf = lazy_module("yfinance")     # se importa en la primera descarga
+from core.score_matrix import ScoreMatrix
+from data.price_history import to_close_series
+from config.config_loader import get_config
+import logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INDICATOR_NAMES = ["SPXIndicator", "FearGreedIndicator", "VixIndicator", "ShillerPEIndicator"]
+SYMBOL = "^SPX"
+
+def weight_grid(n_indicators: int, step: float = 0.05) -> np.ndarray:
+    """
+    Genera todos los vectores de pesos (multiplos de `step`, todos > 0) que suman 1.0.
+    - Retorna un arreglo de forma (n_candidatos, n_indicadores)
+    - Con 4 indicadores: step=0.05 -> 969 candidatos, step=0.02 -> 18424 candidatos
+    """
+    total = int(round(1 / step))
+    if n_indicators < 1 or total < n_indicators:
+        raise ValueError(f"No hay combinaciones validas para {n_indicators} indicadores con paso {step}")
+    if n_indicators == 1:
+        return np.ones((1, 1))
+    # Barras y estrellas: los puntos de corte definen una composicion de `total` en partes positivas
+    cortes = np.array(list(combinations(range(1, total), n_indicators - 1)), dtype=np.int64)
+    bordes = np.hstack([np.zeros((len(cortes), 1), dtype=np.int64), cortes, np.full((len(cortes), 1), total)])
+    return np.diff(bordes, axis=1) / total
+
+def forward_returns(closes: pd.Series, dates: List[date], horizon: int) -> np.ndarray:
+    """
+    Rendimiento futuro a `horizon` sesiones para cada fecha: cierre[t + horizon] / cierre[t] - 1.
+    - NaN si la fecha no tiene cierre o no hay suficientes sesiones posteriores
+    """
+    valores = closes.to_numpy(dtype=float)
+    objetivo = pd.DatetimeIndex([pd.Timestamp(d) for d in dates])
+    pos = closes.index.searchsorted(objetivo)
+    fwd = np.full(len(dates), np.nan)
+    validas = (pos + horizon < len(valores))
+    validas[validas] &= closes.index[pos[validas]] == objetivo[validas]
+    fwd[validas] = valores[pos[validas] + horizon] / valores[pos[validas]] - 1
+    return fwd
+
+def _objective_correlation(values: np.ndarray, grid: np.ndarray, fwd: np.ndarray) -> np.ndarray:
+    """
+    Correlacion de Pearson entre el score compuesto (values @ w) y el rendimiento futuro.
+    - Se calcula para todos los candidatos a la vez con la covarianza de los indicadores:
+      cov(Vw, y) = w·cov(V, y) y var(Vw) = wᵀ Σ w, sin construir la matriz fechas × candidatos
+    """
+    centrados = values - values.mean(axis=0)
+    y = fwd - fwd.mean()
+    cov_y = centrados.T @ y                    # (k,)
+    sigma = centrados.T @ centrados            # (k, k)
+    num = grid @ cov_y
+    var = np.einsum("ck,kl,cl->c", grid, sigma, grid)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return num / (np.sqrt(var) * np.sqrt(y @ y))
+
+def _objective_spread(values: np.ndarray, grid: np.ndarray, fwd: np.ndarray, quantile: float = 0.2) -> np.ndarray:
+    """
+    Diferencia del rendimiento futuro medio entre el quintil superior y el inferior del score compuesto.
+    """
+    composite = values @ grid.T                # (fechas, candidatos)
+    alto = composite >= np.quantile(composite, 1 - quantile, axis=0)
+    bajo = composite <= np.quantile(composite, quantile, axis=0)
+    y = fwd[:, None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (y * alto).sum(axis=0) / alto.sum(axis=0) - (y * bajo).sum(axis=0) / bajo.sum(axis=0)
+
+OBJECTIVES = {
+    "correlation": _objective_correlation,
+    "spread": _objective_spread,
+}
+
+def evaluate_weights(values: np.ndarray, grid: np.ndarray, fwd: np.ndarray, objective: str = "correlation") -> np.ndarray:
+    """
+    Evalua todos los vectores de pesos de `grid` contra el rendimiento futuro `fwd`.
+    - values: matriz (fechas, indicadores) de scores normalizados
+    - Se descartan las fechas con NaN en los scores o en el rendimiento futuro
+    - Retorna el valor del objetivo por candidato (NaN si no se puede calcular)
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Objetivo no soportado: {objective} (opciones: {', '.join(OBJECTIVES)})")
+    validas = ~np.isnan(values).any(axis=1) & ~np.isnan(fwd)
+    if validas.sum() < 2:
+        raise ValueError("No hay suficientes fechas con scores y rendimiento futuro para evaluar")
+    return OBJECTIVES[objective](values[validas], grid, fwd[validas])
+
+def rank_weights(matrix: ScoreMatrix, closes: pd.Series, names: List[str] = INDICATOR_NAMES, step: float = 0.05,
+                 horizon: int = 21, objective: str = "correlation", top: int = 10,
+                 start: Optional[str] = None, end: Optional[str] = None) -> List[Dict]:
+    """
+    Ordena los candidatos de pesos por el objetivo elegido (de mayor a menor).
+    - matrix: Scores normalizados historicos por indicador
+    - closes: Serie de cierres del S&P 500 indexada por fecha
+    - start / end: Solo se evaluan las fechas de la matriz en [start, end] (la matriz persistida
+      tambien guarda fechas de otros periodos y de la ejecucion diaria)
+    """
+    dates, names, values = matrix.to_array(names)
+    if start is not None or end is not None:
+        desde = date.fromisoformat(str(start)) if start is not None else date.min
+        hasta = date.fromisoformat(str(end)) if end is not None else date.max
+        dentro = np.fromiter((desde <= d <= hasta for d in dates), dtype=bool, count=len(dates))
+        dates = [d for d, ok in zip(dates, dentro) if ok]
+        values = values[dentro]
+    grid = weight_grid(len(names), step)
+    fwd = forward_returns(closes, dates, horizon)
+    resultado = evaluate_weights(values, grid, fwd, objective)
+
+    orden = np.argsort(np.nan_to_num(resultado, nan=-np.inf))[::-1][:top]
+    return [
+        {"weights": dict(zip(names, np.round(grid[i], 4).tolist())), objective: float(resultado[i])}
+        for i in orden
+    ]
+
+def optimize_weights(start: Optional[str] = None, end: Optional[str] = None, matrix: Optional[ScoreMatrix] = None,
+                     names: List[str] = INDICATOR_NAMES, step: float = 0.05, horizon: int = 21, objective: str = "correlation", top: int = 10,
+                     yf_client=None) -> List[Dict]:
+    """
+    Modo de optimizacion de pesos sobre el periodo de backtesting de config.json.
+    - Si no se recibe `matrix` se calculan los scores del periodo con ScoreCalculator.calculate_scores
+    - Descarga ^SPX una sola vez para los rendimientos futuros
+    """
+    backtesting = get_config().get('backtesting', {})
+    start = start or backtesting.get('start_date')
+    end = end or backtesting.get('end_date')
+    if not start or not end:
+        raise ValueError("Faltan las fechas de backtesting (start_date / end_date)")
+
+    if matrix is None:
+        from core.scoreCalculator import ScoreCalculator
+        calculator = ScoreCalculator.from_global_config()
+        calculator.calculate_scores(start, end)
+        matrix = calculator.score_matrix
+
+    client = yf_client or yf
+    # Margen de calendario suficiente para `horizon` sesiones despues de end
+    fin = date.fromisoformat(str(end)) + timedelta(days=horizon * 2 + 10)
+    closes = to_close_series(client.Ticker(SYMBOL).history(start=str(start), end=fin.isoformat(), auto_adjust=True))
+    logger.info(f"Evaluando pesos {start} a {end} (horizonte {horizon} sesiones, objetivo {objective})")
+    return rank_weights(matrix, closes, names=names, step=step, horizon=horizon, objective=objective, top=top,
+                        start=start, end=end)
+
+if __name__ == "__main__":
+    try:
+        for posicion, candidato in enumerate(optimize_weights(), start=1):
+            print(f"{posicion}. {candidato}")
+    except Exception as e:
+        print(f"❌ Error en la optimizacion de pesos: {e}")
@@ -1,29 +1,207 @@
-import pandas_market_calendars as mcal
-import yfinance as yf
-from datetime import datetime, timedelta
+import os
+import threading
+from importlib import metadata
+import numpy as np
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Optional
+from utils.instrumentation import span, record_cache
+from utils.lazy_import import LazyObject, lazy_module
+import logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
-nyse = mcal.get_calendar("NYSE")
+# pandas_market_calendars solo se importa si hay que (re)calcular el indice o consultar fuera de el
+mcal = lazy_module("pandas_market_calendars")
+nyse = LazyObject(lambda: mcal.get_calendar("NYSE"), "NYSE")
+
+# Indice de sesiones precalculado: desde SESSIONS_START hasta fin de año de hoy + SESSIONS_YEARS_AHEAD
+SESSIONS_FILE = Path("data/nyse_sessions.npz")
+SESSIONS_START = date(1990, 1, 1)
+SESSIONS_YEARS_AHEAD = 3
+
+class SessionIndex:
+    """
+    Sesiones de NYSE entre start y end (ambas inclusive) como arreglo ordenado datetime64[D].
+    - Todas las consultas son busquedas binarias (searchsorted) sobre el arreglo
+    - Fuera de [start, end] el indice no sabe responder: covers() devuelve False
+    """
+    def __init__(self, sessions: np.ndarray, start: date, end: date):
+        self.sessions = np.asarray(sessions, dtype="datetime64[D]")
+        self.start = start
+        self.end = end
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def covers(self, *fechas) -> bool:
+        return all(self.start <= _as_date(f) <= self.end for f in fechas)
+
+    def is_session(self, fecha) -> bool:
+        d = np.datetime64(_as_date(fecha), "D")
+        pos = np.searchsorted(self.sessions, d)
+        return bool(pos < len(self.sessions) and self.sessions[pos] == d)
+
+    def previous(self, fecha) -> Optional[date]:
+        """ Ultima sesion estrictamente anterior a fecha; None si no hay en el indice """
+        pos = int(np.searchsorted(self.sessions, np.datetime64(_as_date(fecha), "D"), side="left")) - 1
+        return self.sessions[pos].item() if pos >= 0 else None
+
+    def next(self, fecha) -> Optional[date]:
+        """ Primera sesion estrictamente posterior a fecha; None si no hay en el indice """
+        pos = int(np.searchsorted(self.sessions, np.datetime64(_as_date(fecha), "D"), side="right"))
+        return self.sessions[pos].item() if pos < len(self.sessions) else None
+
+    def between(self, start, end) -> np.ndarray:
+        """ Sesiones entre start y end, ambas inclusive (vista del arreglo) """
+        izq = np.searchsorted(self.sessions, np.datetime64(_as_date(start), "D"), side="left")
+        der = np.searchsorted(self.sessions, np.datetime64(_as_date(end), "D"), side="right")
+        return self.sessions[izq:der]
+
+_INDEX: Optional[SessionIndex] = None
+_INDEX_LOCK = threading.Lock()
+
+def _as_date(fecha) -> date:
+    if isinstance(fecha, datetime):
+        return fecha.date()
+    if isinstance(fecha, date):
+        return fecha
+    return date.fromisoformat(str(fecha)[:10])
+
+def _sessions_end(today: Optional[date] = None) -> date:
+    today = today or date.today()
+    return date(today.year + SESSIONS_YEARS_AHEAD, 12, 31)
+
+def _build_index(start: date, end: date) -> SessionIndex:
+    with span("calendar.build_index"):
+        dias = nyse.valid_days(start_date=start.isoformat(), end_date=end.isoformat())
+        sesiones = dias.tz_localize(None).values.astype("datetime64[D]")
+    return SessionIndex(sesiones, start, end)
+
+def _calendar_version() -> str:
+    """ Version instalada de pandas_market_calendars (sin importar el paquete) """
+    return metadata.version("pandas_market_calendars")
+
+def _load_index_file(path: Path, end: date) -> Optional[SessionIndex]:
+    """ Indice guardado en disco si cubre hasta `end` y fue generado con la misma version del calendario """
+    if not path.exists():
+        return None
+    try:
+        with np.load(path) as npz:
+            if str(npz["version"]) != _calendar_version():
+                return None
+            index = SessionIndex(npz["sessions"], date.fromisoformat(str(npz["start"])), date.fromisoformat(str(npz["end"])))
+        return index if index.start <= SESSIONS_START and index.end >= end else None
+    except Exception as e:
+        logger.warning(f"Indice de sesiones invalido {path}: {e}. Se regenera")
+        return None
+
+def _save_index_file(index: SessionIndex, path: Path):
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp.npz")
+        with open(tmp, "wb") as f:
+            np.savez(f, sessions=index.sessions, start=index.start.isoformat(), end=index.end.isoformat(),
+                     version=_calendar_version())
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning(f"No se pudo guardar el indice de sesiones en {path}: {e}")
+
+def get_session_index() -> SessionIndex:
+    """
+    Indice de sesiones NYSE desde 1990 hasta fin de año de hoy + SESSIONS_YEARS_AHEAD.
+    - Se calcula una vez con el calendario oficial y se guarda en SESSIONS_FILE
+    - Se regenera si el archivo no cubre el rango (cambio de año) o cambia la version de pandas_market_calendars
+    """
+    global _INDEX
+    end = _sessions_end()
+    with _INDEX_LOCK:
+        if _INDEX is not None and _INDEX.end >= end:
+            record_cache("calendar.sessions", hit=True)
+            return _INDEX
+        index = _load_index_file(SESSIONS_FILE, end)
+        record_cache("calendar.sessions", hit=index is not None)
+        if index is None:
+            index = _build_index(SESSIONS_START, end)
+            _save_index_file(index, SESSIONS_FILE)
+        _INDEX = index
+        return index
+
+def clear_session_index():
+    """ Descarta el indice en memoria (el archivo en disco se mantiene) """
+    global _INDEX
+    with _INDEX_LOCK:
+        _INDEX = None
 
 def get_trading_schedule(start: str, end: str):
     """ Devuelve el calendario oficial de trading (apertura / cierre) entre fechas """
-    return nyse.schedule(start_date=start, end_date=end)
+    with span("calendar.schedule"):
+        return nyse.schedule(start_date=start, end_date=end)
+
+def is_trading_day(fecha) -> bool:
+    """ True si NYSE abrio (o abrira) en fecha """
+    index = get_session_index()
+    if index.covers(fecha):
+        return index.is_session(fecha)
+    d = _as_date(fecha).isoformat()
+    return not get_trading_schedule(d, d).empty
+
+def previous_session(fecha) -> date:
+    """ Ultima sesion NYSE estrictamente anterior a fecha """
+    index = get_session_index()
+    anterior = index.previous(fecha) if index.covers(fecha) else None
+    if anterior is not None:
+        return anterior
+    d = _as_date(fecha) - timedelta(days=1)
+    while not is_trading_day(d):
+        d -= timedelta(days=1)
+    return d
+
+def next_session(fecha) -> date:
+    """ Primera sesion NYSE estrictamente posterior a fecha """
+    index = get_session_index()
+    siguiente = index.next(fecha) if index.covers(fecha) else None
+    if siguiente is not None:
+        return siguiente
+    d = _as_date(fecha) + timedelta(days=1)
+    while not is_trading_day(d):
+        d += timedelta(days=1)
+    return d
+
+def get_trading_sessions(start, end) -> list:
+    """ Devuelve la lista de sesiones (date) de NYSE entre start y end, ambas inclusive """
+    index = get_session_index()
+    if index.covers(start, end):
+        return index.between(start, end).tolist()
+    schedule = get_trading_schedule(str(start), str(end))
+    return [ts.date() for ts in schedule.index]
+
+# Sesiones que se revisan hacia atras antes de dar por caida la fuente de datos
+MAX_SESSIONS_WITHOUT_DATA = 10
 
-def get_last_valid_trading_day(symbol="^SPX", now=None):
+def get_last_valid_trading_day(symbol="^SPX", now=None, yf_client=None, max_sessions=MAX_SESSIONS_WITHOUT_DATA):
     """
         Devuelve el ultimo cierre habil con datos reales.
-        - Usa calendario oficial para saber si el dia fue habil
+        - Usa el indice de sesiones para saber si el dia fue habil (y saltar al anterior)
         - Valida contra yfinance para confirmar que hubo datos
+        - Los cierres se leen del PriceStore compartido salvo que se reciba yf_client
+        - Lanza LookupError si ninguna de las ultimas max_sessions sesiones tiene datos (sin red, simbolo invalido)
     """
     if now is None:
         now = datetime.now()
+    if yf_client is None:
+        from data.price_store import get_price_store
+        yf_client = get_price_store()
 
-    # Retroceder hasta encontrar un dia con datos
-    while True:
-        schedule = nyse.schedule(start_date=now.date().isoformat() , end_date=now.date().isoformat())
-        if not schedule.empty:
-            datos = yf.Ticker(symbol).history(
-                start = now.date().isoformat(), end = (now.date() + timedelta(days=1)).isoformat())
-            
-            if not datos.empty:
-                return now.date()
-        now -= timedelta(days=1)
\ No newline at end of file
+    dia = _as_date(now)
+    if not is_trading_day(dia):
+        dia = previous_session(dia)
+    # Retroceder de sesion en sesion hasta encontrar una con datos
+    for _ in range(max_sessions):
+        with span("calendar.yfinance_history", symbol=symbol):
+            datos = yf_client.Ticker(symbol).history(
+                start = dia.isoformat(), end = (dia + timedelta(days=1)).isoformat())
+        if not datos.empty:
+            return dia
+        dia = previous_session(dia)
+    raise LookupError(f"Sin datos de {symbol} en las ultimas {max_sessions} sesiones anteriores a {_as_date(now)}")
@@ -0,0 +1,78 @@
+import threading
+from datetime import date, timedelta
+from typing import Callable, Dict, Tuple
+import pandas as pd
+from utils.lazy_import import lazy_module
+yf = lazy_module("yfinance")     # se importa en la primera descarga
+import data.market_dates as md
+from data.price_history import to_close_series
+from utils.instrumentation import span
+
+# Margen anterior a la primera fecha pedida: cubre la ventana de 300 dias del SMA-200 de SPX
+LOOKBACK_DAYS = 300
+
+def _as_date(value) -> date:
+    """ Acepta date, datetime, Timestamp o cadena 'YYYY-MM-DD' """
+    return pd.Timestamp(value).date()
+
+class _ContextTicker:
+    """ Misma interfaz que yf.Ticker(symbol).history(), servida desde el MarketDataContext """
+    def __init__(self, context: "MarketDataContext", symbol: str):
+        self._context = context
+        self.symbol = symbol
+
+    def history(self, start=None, end=None, **kwargs) -> pd.DataFrame:
+        return pd.DataFrame({"Close": self._context.closes(self.symbol, start, end)})
+
+class MarketDataContext:
+    """
+    Datos de mercado compartidos por los indicadores durante una ejecucion.
+    - Cada simbolo se descarga una sola vez en una ventana amplia: desde la fecha pedida
+      menos LOOKBACK_DAYS hasta hoy. SMA de SPX, ultimo cierre de SPX y denominador
+      del CAPE diario de Shiller se responden desde ese mismo frame.
+    - Solo se vuelve a descargar si una consulta cae fuera de la ventana guardada
+    - Se inyecta como yf_client: context.Ticker(symbol).history(start, end)
+    """
+    def __init__(self, yf_client=None, lookback_days: int = LOOKBACK_DAYS, today_fn: Callable[[], date] = None):
+        """
+        - yf_client: Cliente de descarga (yfinance o el PriceStore compartido)
+        - lookback_days: Dias adicionales descargados antes de la fecha pedida
+        - today_fn: Fecha actual del mercado (por defecto market_dates.get_market_today)
+        """
+        self.yf_client = yf_client or yf
+        self.lookback = timedelta(days=lookback_days)
+        self.today_fn = today_fn or md.get_market_today
+        self._frames: Dict[str, Tuple[date, date, pd.Series]] = {}  # {simbolo: (inicio, fin, cierres)}
+        self._lock = threading.Lock()
+
+    def Ticker(self, symbol: str) -> _ContextTicker:
+        return _ContextTicker(self, symbol)
+
+    def closes(self, symbol: str, start=None, end=None) -> pd.Series:
+        """ Cierres en [start, end) indexados por fecha sin zona horaria """
+        hoy = self.today_fn()
+        start = _as_date(start) if start is not None else hoy
+        end = _as_date(end) if end is not None else hoy + timedelta(days=1)
+        # No hay cierres posteriores a hoy: un end futuro no obliga a descargar de nuevo
+        limite = min(end, hoy + timedelta(days=1))
+        with self._lock:
+            ventana = self._frames.get(symbol)
+            if ventana is None or start < ventana[0] or limite > ventana[1]:
+                desde = min(start, ventana[0]) if ventana else start
+                hasta = max(limite, ventana[1]) if ventana else limite
+                ventana = self._download(symbol, desde - self.lookback, max(hasta, hoy + timedelta(days=1)))
+                # Una descarga vacia no se guarda: la siguiente consulta vuelve a intentarlo
+                if not ventana[2].empty:
+                    self._frames[symbol] = ventana
+        cierres = ventana[2]
+        return cierres.iloc[cierres.index.searchsorted(pd.Timestamp(start)):cierres.index.searchsorted(pd.Timestamp(end))]
+
+    def clear(self):
+        """ Descarta los datos descargados (nueva ejecucion) """
+        with self._lock:
+            self._frames.clear()
+
+    def _download(self, symbol: str, start: date, end: date) -> Tuple[date, date, pd.Series]:
+        with span("market_data.download", symbol=symbol):
+            historico = self.yf_client.Ticker(symbol).history(start=start, end=end, auto_adjust=True)
+        return start, end, to_close_series(historico)
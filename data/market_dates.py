@@ -37,43 +37,52 @@ def get_market_today(now: datetime | None = None, tz: ZoneInfo = MARKET_TZ) -> d
     """Devuelve 'la fecha de hoy' en formato date en la zona horaria del mercado (independiente de cierres)."""
     return market_now(now, tz).date()
 
+def _calendar_last_session(day: datetime) -> date | None:
+    """
+    Ultima sesion NYSE <= day segun market_calendar (feriados incluidos).
+    - Primero se confirma que la sesion tenga datos; si la fuente de datos no responde
+      se usa solo el calendario de sesiones
+    - None si el calendario no esta disponible
+    """
+    if not _HAS_CALENDAR:
+        return None
+    try:
+        return mc.get_last_valid_trading_day(now=day)
+    except Exception:
+        pass
+    try:
+        return day.date() if mc.is_trading_day(day) else mc.previous_session(day)
+    except Exception:
+        return None
+
 def get_last_trading_date(now: datetime | None = None, market_close: time = MARKET_CLOSE, tz: ZoneInfo = MARKET_TZ) -> date:
     """
     Devuelve la fecha (date) del último cierre válido:
     - Si es día hábil y la hora actual es < hora de cierre -> usa el día hábil anterior
     - Si es día hábil y la hora actual es >= hora de cierre -> usa hoy
     - Si es fin de semana -> retrocede hasta el viernes más cercano
-    No considera feriados (si 'hoy' no abrió, seguirá devolviendo 'hoy' tras el cierre).
+    Con market_calendar disponible los feriados se saltan (p.ej. un 4 de julio devuelve el día 3).
+    Sin calendario solo se consideran los fines de semana.
     """
     current = market_now(now, tz)
 
     # Si es fin de semana, retrocede hasta viernes
     if current.weekday() >= 5:
-        back = current
-        while back.weekday() >= 5:
-            back -= timedelta(days=1)
-        return back.date()
-
+        candidate = current
+        while candidate.weekday() >= 5:
+            candidate -= timedelta(days=1)
     # Día hábil
-    if current.time() < market_close:
+    elif current.time() < market_close:
         # Mercado aún abierto -> retroceder al último día hábil anterior
         candidate = current - timedelta(days=1)
         while candidate.weekday() >= 5:
             candidate -= timedelta(days=1)
-        if _HAS_CALENDAR:
-            try:
-                return mc.get_last_valid_trading_day(candidate)
-            except Exception:
-                pass
-        return candidate.date()
     else:
         # Mercado ya cerró -> hoy es válido
-        if _HAS_CALENDAR:
-            try:
-                return mc.get_last_valid_trading_day(current)
-            except Exception:
-                pass
-        return current.date()
+        candidate = current
+
+    session = _calendar_last_session(candidate)
+    return session if session is not None else candidate.date()
 
 def get_last_trading_close(now: datetime | None = None, market_close: time = MARKET_CLOSE, tz: ZoneInfo = MARKET_TZ) -> datetime:
     """
@@ -90,3 +99,28 @@ def yfinance_window_for_last_close(now: datetime | None = None, market_close: ti
     start_d = get_last_trading_date(now, market_close, tz)
     end_d = start_d + timedelta(days=1)
     return (start_d.strftime("%Y-%m-%d"), end_d.strftime("%Y-%m-%d"))
+
+def closed_sessions_end(now: datetime | None = None, market_close: time = MARKET_CLOSE, tz: ZoneInfo = MARKET_TZ) -> date:
+    """
+    Fin (exclusivo) de las sesiones con cierre completo, solo con el reloj (sin calendario ni yfinance):
+    - Antes del cierre -> hoy (la sesion de hoy aun no cierra)
+    - Despues del cierre -> mañana
+    Los fines de semana y feriados no tienen datos, por lo que no hace falta saltarlos para acotar una consulta.
+    """
+    current = market_now(now, tz)
+    return current.date() + timedelta(days=1) if current.time() >= market_close else current.date()
+
+# Ventanas ya calculadas: {(fecha de mercado, despues del cierre): (start_str, end_str)}
+_WINDOWS: dict[tuple, tuple[str, str]] = {}
+
+def last_close_window(now: datetime | None = None, market_close: time = MARKET_CLOSE, tz: ZoneInfo = MARKET_TZ) -> tuple[str, str]:
+    """
+    yfinance_window_for_last_close() calculada al primer uso y reutilizada mientras no cambie
+    el dia de mercado ni se cruce la hora de cierre (consulta el calendario y yfinance una sola vez).
+    - Los indicadores la usan en lugar de calcular la ventana al importarse
+    """
+    current = market_now(now, tz)
+    clave = (current.date(), current.time() >= market_close)
+    if clave not in _WINDOWS:
+        _WINDOWS[clave] = yfinance_window_for_last_close(current, market_close, tz)
+    return _WINDOWS[clave]
@@ -0,0 +1,45 @@
+import pandas as pd
+from datetime import date, timedelta
+
+# Dias pedidos a partir de una fecha para leer su cierre: cubre fines de semana largos y cierres extraordinarios
+CLOSE_LOOKUP_DAYS = 7
+
+def to_close_series(historical_data) -> pd.Series:
+    """
+    Convierte la respuesta de yfinance (DataFrame con columna 'Close') en una serie de cierres
+    indexada por fecha (sin zona horaria), ordenada ascendentemente.
+    - Devuelve una serie vacia si no hay datos o no existe la columna 'Close'
+    - Lanza ValueError si el indice no es de fechas (un RangeIndex se convertiria en 1970-01-01)
+    """
+    if historical_data is None or historical_data.empty or 'Close' not in historical_data.columns:
+        return pd.Series(dtype=float)
+    if not isinstance(historical_data.index, pd.DatetimeIndex):
+        raise ValueError(f"Historico sin indice de fechas ({type(historical_data.index).__name__})")
+
+    index = historical_data.index
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    cierres = pd.Series(historical_data['Close'].to_numpy(dtype=float), index=index.normalize())
+    return cierres.sort_index()
+
+def close_on_or_after(closes: pd.Series, date) -> float | None:
+    """
+    Devuelve el primer cierre disponible en la fecha indicada o posterior,
+    igual que history(start=date, ...).iloc[0]. None si no hay datos.
+    """
+    pos = closes.index.searchsorted(pd.Timestamp(date))
+    if pos >= len(closes):
+        return None
+    return float(closes.iloc[pos])
+
+def close_lookup_window(fecha, limit=None) -> tuple[date, date]:
+    """
+    Ventana [fecha, fecha + CLOSE_LOOKUP_DAYS) para leer el cierre de una sola sesion
+    (o la siguiente si la fecha no fue habil) sin descargar todo el historico posterior.
+    - limit: fin maximo de la ventana (p.ej. el dia siguiente al ultimo cierre completo)
+    """
+    inicio = pd.Timestamp(fecha).date()
+    fin = inicio + timedelta(days=CLOSE_LOOKUP_DAYS)
+    if limit is not None:
+        fin = min(fin, pd.Timestamp(limit).date())
+    return inicio, fin
@@ -0,0 +1,204 @@
+import os
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from utils.lazy_import import lazy_module
+yf = lazy_module("yfinance")     # se importa en la primera descarga
+import data.market_dates as md
+from data.price_history import to_close_series
+from utils.instrumentation import span
+import logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PRICE_STORE_DIR = os.getenv("PRICE_STORE_DIR", "data/prices")
+# Inicio de la primera descarga de un simbolo (el SMA-200 y el CAPE necesitan historia larga)
+HISTORY_START = date(1990, 1, 1)
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+def _as_date(value) -> date:
+    """ Acepta date, datetime, Timestamp o cadena 'YYYY-MM-DD' """
+    return pd.Timestamp(value).date()
+
+class _SymbolData:
+    """ Cierres de un simbolo y el rango que ya esta descargado """
+    __slots__ = ("closes", "covered_from", "complete_until")
+
+    def __init__(self, closes: pd.Series, covered_from: Optional[date], complete_until: Optional[date]):
+        self.closes = closes
+        self.covered_from = covered_from        # primera fecha pedida a yfinance
+        self.complete_until = complete_until    # (exclusiva) sesiones anteriores ya cerradas y guardadas
+
+class StoredTicker:
+    """ Misma interfaz que yf.Ticker(symbol).history(), servida desde el PriceStore """
+    def __init__(self, store: "PriceStore", symbol: str):
+        self._store = store
+        self.symbol = symbol
+
+    def history(self, start=None, end=None, **kwargs) -> pd.DataFrame:
+        return self._store.history(self.symbol, start, end)
+
+class PriceStore:
+    """
+    Historico diario de cierres por simbolo guardado en disco (un .npz por simbolo).
+    - Solo se descarga de yfinance la cola que falta desde la ultima sesion guardada
+    - La ultima sesion guardada se vuelve a pedir por si se guardo con el mercado abierto
+    - La cola se revisa una vez por objetivo y otra vez cuando cierra la sesion del dia
+    - Se usa como yf_client de los indicadores: store.Ticker(symbol).history(start, end)
+    """
+    def __init__(self, directory: str = PRICE_STORE_DIR, yf_client=None, today_fn: Callable[[], date] = None,
+                 closed_end_fn: Callable[[], date] = None):
+        """
+        - directory: Carpeta de los archivos .npz
+        - yf_client: Cliente yfinance mockeable para las descargas
+        - today_fn: Fecha actual del mercado (por defecto market_dates.get_market_today)
+        - closed_end_fn: Fin (exclusivo) de las sesiones ya cerradas (por defecto market_dates.closed_sessions_end;
+          si solo se inyecta today_fn, la fecha de hoy: la sesion de hoy se trata como abierta)
+        """
+        self.directory = Path(directory)
+        self.yf_client = yf_client or yf
+        self.today_fn = today_fn or md.get_market_today
+        self.closed_end_fn = closed_end_fn or (today_fn if today_fn is not None else md.closed_sessions_end)
+        self._data: Dict[str, _SymbolData] = {}
+        # Ultima revision de la cola por simbolo en este proceso: (objetivo, fin de sesiones cerradas)
+        self._checked: Dict[str, Tuple[date, date]] = {}
+        self._lock = threading.RLock()
+
+    def Ticker(self, symbol: str) -> StoredTicker:
+        return StoredTicker(self, symbol)
+
+    def path(self, symbol: str) -> Path:
+        nombre = "".join(c if c.isalnum() else "_" for c in symbol.lstrip("^"))
+        return self.directory / f"{nombre}.npz"
+
+    def history(self, symbol: str, start=None, end=None) -> pd.DataFrame:
+        """
+        Cierres en [start, end) como DataFrame con columna 'Close' (igual que yfinance).
+        - Descarga solo lo que falte en disco para cubrir el rango pedido
+        """
+        closes = self.closes(symbol, start, end)
+        return pd.DataFrame({"Close": closes})
+
+    def closes(self, symbol: str, start=None, end=None) -> pd.Series:
+        """ Serie de cierres en [start, end), indexada por fecha sin zona horaria """
+        start = _as_date(start) if start is not None else None
+        end = _as_date(end) if end is not None else None
+        with self._lock:
+            datos = self._ensure(symbol, start, end)
+            serie = datos.closes
+        desde = serie.index.searchsorted(pd.Timestamp(start)) if start is not None else 0
+        hasta = serie.index.searchsorted(pd.Timestamp(end)) if end is not None else len(serie)
+        return serie.iloc[desde:hasta]
+
+    def _ensure(self, symbol: str, start: Optional[date], end: Optional[date]) -> _SymbolData:
+        """ Completa en disco el rango pedido: historia anterior a lo guardado y cola hasta end """
+        datos = self._load(symbol)
+        hoy = self.today_fn()
+        # Antes del cierre la sesion de hoy no se da por completa; despues si
+        cerradas = min(max(self.closed_end_fn(), hoy), hoy + timedelta(days=1))
+        objetivo = min(end, hoy + timedelta(days=1)) if end is not None else hoy + timedelta(days=1)
+        inicio = min(start, HISTORY_START) if start is not None else HISTORY_START
+        closes, covered_from, complete_until = datos.closes, datos.covered_from, datos.complete_until
+
+        if covered_from is None or inicio < covered_from:
+            # Primera descarga del simbolo o historia anterior a la guardada
+            fin = covered_from or objetivo
+            cabecera = self._download(symbol, inicio, fin)
+            # Una descarga vacia sin nada guardado se trata como fallo (yfinance no siempre lanza excepcion)
+            if cabecera is not None and not (cabecera.empty and closes.empty):
+                closes = pd.concat([cabecera, closes]) if not closes.empty else cabecera
+                covered_from = inicio
+                # Completo solo hasta el ultimo cierre recibido, no hasta el fin pedido
+                complete_until = complete_until or self._received_until(cabecera, min(fin, cerradas))
+                if fin == objetivo:
+                    # La cabecera ya llego hasta el objetivo: no hace falta pedir la cola
+                    self._checked[symbol] = (objetivo, cerradas)
+
+        revision = (objetivo, cerradas)
+        if complete_until is not None and complete_until < objetivo and self._checked.get(symbol) != revision:
+            # Se revisa una vez por objetivo (aunque la descarga falle) y de nuevo al cerrar la sesion del dia
+            self._checked[symbol] = revision
+            if self._missing_sessions(complete_until, objetivo):
+                # Cola: desde la ultima sesion guardada (inclusive) por si se guardo con el mercado abierto
+                desde = min(closes.index[-1].date(), complete_until) if not closes.empty else complete_until
+                cola = self._download(symbol, desde, objetivo)
+                if cola is not None and not cola.empty:
+                    closes = pd.concat([closes, cola])
+                    complete_until = max(complete_until, self._received_until(cola, min(objetivo, cerradas)))
+
+        if (covered_from, complete_until) != (datos.covered_from, datos.complete_until):
+            closes = closes[~closes.index.duplicated(keep="last")].sort_index()
+            datos = _SymbolData(closes, covered_from, complete_until)
+            self._data[symbol] = datos
+            self._save(symbol, datos)
+        return datos
+
+    @staticmethod
+    def _missing_sessions(desde: date, hasta: date) -> bool:
+        """ True si hay sesiones NYSE en [desde, hasta) (fines de semana y feriados no se descargan) """
+        if desde >= hasta:
+            return False
+        from data.market_calendar import get_trading_sessions
+        return bool(get_trading_sessions(desde, hasta - timedelta(days=1)))
+
+    @staticmethod
+    def _received_until(closes: pd.Series, limite: date) -> date:
+        """ Dia siguiente al ultimo cierre recibido, sin pasar de limite """
+        return min(limite, closes.index[-1].date() + timedelta(days=1))
+
+    def _download(self, symbol: str, start: date, end: date) -> Optional[pd.Series]:
+        """
+        Cierres de yfinance en [start, end); None si la descarga falla.
+        - Una respuesta sin indice de fechas se trata como fallo y las fechas fuera del rango pedido se descartan
+        """
+        if start >= end:
+            return pd.Series(dtype=float)
+        try:
+            with span("price_store.download", symbol=symbol):
+                historico = self.yf_client.Ticker(symbol).history(start=start, end=end, auto_adjust=True)
+            cierres = to_close_series(historico)
+            return cierres[(cierres.index >= pd.Timestamp(start)) & (cierres.index < pd.Timestamp(end))]
+        except Exception as e:
+            logger.warning(f"No se pudo actualizar {symbol} ({start} a {end}): {e}. Se usan los datos guardados")
+            return None
+
+    def _load(self, symbol: str) -> _SymbolData:
+        if symbol in self._data:
+            return self._data[symbol]
+        path = self.path(symbol)
+        datos = _SymbolData(pd.Series(dtype=float), None, None)
+        if path.exists():
+            try:
+                with span("price_store.load", symbol=symbol), np.load(path) as npz:
+                    index = pd.to_datetime(npz["ordinals"] - _EPOCH_ORDINAL, unit="D")
+                    datos = _SymbolData(pd.Series(npz["closes"], index=index),
+                                        date.fromordinal(int(npz["covered_from"])),
+                                        date.fromordinal(int(npz["complete_until"])))
+            except Exception as e:
+                logger.warning(f"Archivo de precios invalido {path}: {e}. Se descargara de nuevo")
+        self._data[symbol] = datos
+        return datos
+
+    def _save(self, symbol: str, datos: _SymbolData):
+        path = self.path(symbol)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp.npz")
+        ordinals = datos.closes.index.values.astype("datetime64[D]").astype(np.int64) + _EPOCH_ORDINAL
+        with open(tmp, "wb") as f:
+            np.savez(f, ordinals=ordinals, closes=datos.closes.to_numpy(dtype=float),
+                     covered_from=datos.covered_from.toordinal(), complete_until=datos.complete_until.toordinal())
+        os.replace(tmp, path)
+
+_STORE: Optional[PriceStore] = None
+_STORE_LOCK = threading.Lock()
+
+def get_price_store() -> PriceStore:
+    """ PriceStore compartido por proceso (indicadores y calendario leen del mismo almacen) """
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = PriceStore()
+        return _STORE
@@ -1,6 +1,6 @@
 import json
 import logging
-from psycopg2 import DatabaseError
+from utils.lazy_import import lazy_module
 from db.db_connection import Database
 from data.market_dates import get_last_trading_date
 from config.config_loader import get_config
@@ -8,8 +8,12 @@ from indicators.FearGreedIndicator import FearGreedIndicator
 from indicators.spxIndicator import SPXIndicator, SIMBOL
 from indicators.vixIndicator import VixIndicator
 from indicators.shillerPEIndicator import ShillerPEIndicator
+from indicators.registry import get_indicator
 from core.scoreCalculator import ScoreCalculator
 
+# psycopg2 se importa al abrir la conexion o al capturar un error de la base
+psycopg2 = lazy_module("psycopg2")
+
 logger = logging.getLogger(__name__)
 logging.basicConfig(
     level=logging.INFO,
@@ -21,11 +25,11 @@ class ScorerBackup:
         self.db = db or Database()
         self.calc_date = get_last_trading_date()
         self.config    = get_config()
-        # instancias de indicadores
-        self.fg = FearGreedIndicator()
-        self.sp = SPXIndicator()
-        self.vx = VixIndicator()
-        self.pe = ShillerPEIndicator()
+        # instancias compartidas de indicadores (las mismas que usa ScoreCalculator.get_global_score)
+        self.fg = get_indicator(FearGreedIndicator)
+        self.sp = get_indicator(SPXIndicator)
+        self.vx = get_indicator(VixIndicator)
+        self.pe = get_indicator(ShillerPEIndicator)
 
     @staticmethod
     def to_native(val):
@@ -62,7 +66,7 @@ class ScorerBackup:
             ]
             result = self.db.execute_query(sql, params)
             return result[0]["id"]
-        except DatabaseError as db_error:
+        except psycopg2.DatabaseError as db_error:
             self.db.get_connection().rollback()
             raise RuntimeError("Error al respaldar la configuración") from db_error
 
@@ -85,7 +89,7 @@ class ScorerBackup:
             if insertado == 0:
                 logger.warning("[backup_fear_greed]: No se insertaron los registros para %s: ya existen", self.calc_date)
             # opcional: devolver ID si lo necesitas
-        except (ValueError, DatabaseError) as err:
+        except (ValueError, psycopg2.DatabaseError) as err:
             self.db.get_connection().rollback()
             raise RuntimeError("Error al respaldar FearGreedIndicator") from err
 
@@ -108,7 +112,7 @@ class ScorerBackup:
             insertado = self.db.execute_non_query(sql, params)
             if insertado == 0:
                 logger.warning("[backup_spx]: No se insertaron los registros para %s: ya existen", self.calc_date)
-        except (ValueError, DatabaseError) as err:
+        except (ValueError, psycopg2.DatabaseError) as err:
             self.db.get_connection().rollback()
             raise RuntimeError("Error al respaldar SPXIndicator") from err
 
@@ -129,7 +133,7 @@ class ScorerBackup:
             insertado = self.db.execute_non_query(sql, params)
             if insertado == 0:
                 logger.warning("[backup_vix]: No se insertaron los registros para  %s: ya existen", self.calc_date)
-        except (ValueError, DatabaseError) as err:
+        except (ValueError, psycopg2.DatabaseError) as err:
             self.db.get_connection().rollback()
             raise RuntimeError("Error al respaldar VixIndicator") from err
 
@@ -154,7 +158,7 @@ class ScorerBackup:
             insertado = self.db.execute_non_query(sql, params)
             if insertado == 0:
                 logger.warning("[backup_shiller]: No se insertaron los registros para  %s: ya existen", self.calc_date)
-        except (ValueError, DatabaseError) as err:
+        except (ValueError, psycopg2.DatabaseError) as err:
             self.db.get_connection().rollback()
             raise RuntimeError("Error al respaldar: ") from err
 
@@ -171,7 +175,7 @@ class ScorerBackup:
             if insretado == 0:
                 logger.warning("[backup_score]: No se insertaron los registros para %s: ya existen", self.calc_date)
             return score
-        except (ValueError, DatabaseError) as err:
+        except (ValueError, psycopg2.DatabaseError) as err:
             self.db.get_connection().rollback()
             raise RuntimeError("Error al respaldar ScoreCalculator") from err
 
@@ -0,0 +1,183 @@
+import glob
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+from utils.instrumentation import span, record_cache
+import logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Columnas de la hoja 'Data' que usa el indicador: fecha (YYYY.MM), E10 real y CAPE
+COLUMNS = (0, 10, 12)
+CACHE_PREFIX = "shiller_"
+
+# Datasets ya cargados en este proceso: {sha256: DataFrame}
+_MEMORY: Dict[str, pd.DataFrame] = {}
+_LOCK = threading.Lock()
+
+def file_sha256(path) -> str:
+    """ Hash SHA-256 del contenido del archivo """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def excel_engine(path) -> str:
+    """ Engine de pandas segun la extension: xlrd para .xls, openpyxl para el resto """
+    return "xlrd" if str(path).split(".")[-1].lower() == "xls" else "openpyxl"
+
+def load_shiller_frame(path, cache_dir=None) -> pd.DataFrame:
+    """
+    Hoja 'Data' del archivo Shiller con solo las columnas 0, 10 y 12 (el resto queda en NaN
+    para conservar las posiciones de df.iloc).
+    - El resultado se guarda en un .npz junto al archivo (o en cache_dir) con el hash del contenido:
+      mientras el archivo no cambie no se vuelve a leer el Excel
+    """
+    sha = file_sha256(path)
+    with _LOCK:
+        if sha in _MEMORY:
+            record_cache("shiller_dataset", hit=True)
+            return _MEMORY[sha]
+    cache = _cache_path(path, sha, cache_dir)
+    df = _load_cache(cache)
+    record_cache("shiller_dataset", hit=df is not None)
+    if df is None:
+        engine = excel_engine(path)
+        with span("shiller_dataset.parse_excel", engine=engine):
+            df = pd.read_excel(path, sheet_name="Data", engine=engine)
+        df = store_shiller_frame(df, path, cache_dir, sha=sha)
+    with _LOCK:
+        _MEMORY[sha] = df
+    return df
+
+def store_shiller_frame(df: pd.DataFrame, path, cache_dir=None, sha: Optional[str] = None) -> pd.DataFrame:
+    """
+    Guarda en la cache la hoja 'Data' ya leida (p.ej. durante la validacion de la descarga).
+    - Retorna el DataFrame compacto que devolvera load_shiller_frame
+    """
+    sha = sha or file_sha256(path)
+    columnas = {i: pd.to_numeric(df.iloc[:, i], errors="coerce").to_numpy(dtype=float)
+                for i in COLUMNS if i < df.shape[1]}
+    cache = _cache_path(path, sha, cache_dir)
+    try:
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache.with_suffix(".tmp.npz")
+        with open(tmp, "wb") as f:
+            np.savez(f, n_columns=df.shape[1], **{f"c{i}": v for i, v in columnas.items()})
+        os.replace(tmp, cache)
+        # Solo se conserva la version vigente del archivo
+        for anterior in glob.glob(str(cache.parent / f"{CACHE_PREFIX}*.npz")):
+            if Path(anterior) != cache:
+                os.remove(anterior)
+    except OSError as e:
+        logger.warning(f"No se pudo guardar la cache del archivo Shiller en {cache}: {e}")
+    compacto = _to_frame(df.shape[1], columnas, len(df))
+    with _LOCK:
+        _MEMORY[sha] = compacto
+    return compacto
+
+def clear_memory():
+    """ Descarta los datasets cargados en este proceso (la cache en disco se mantiene) """
+    with _LOCK:
+        _MEMORY.clear()
+
+def _cache_path(path, sha: str, cache_dir=None) -> Path:
+    directorio = Path(cache_dir) if cache_dir is not None else Path(path).parent
+    return directorio / f"{CACHE_PREFIX}{sha[:16]}.npz"
+
+def _load_cache(cache: Path) -> Optional[pd.DataFrame]:
+    if not cache.exists():
+        return None
+    try:
+        with span("shiller_dataset.load"), np.load(cache) as npz:
+            columnas = {i: npz[f"c{i}"] for i in COLUMNS if f"c{i}" in npz.files}
+            n_columns = int(npz["n_columns"])
+        filas = len(next(iter(columnas.values()))) if columnas else 0
+        return _to_frame(n_columns, columnas, filas)
+    except Exception as e:
+        logger.warning(f"Cache del archivo Shiller invalida {cache}: {e}. Se lee el Excel")
+        return None
+
+def _to_frame(n_columns: int, columnas: Dict[int, np.ndarray], filas: int) -> pd.DataFrame:
+    vacia = np.full(filas, np.nan)
+    return pd.DataFrame({i: columnas.get(i, vacia) for i in range(n_columns)})
+
+def shiller_months(values) -> np.ndarray:
+    """
+    Fechas YYYY.MM de la columna 0 como indice de mes (año * 12 + mes - 1); NaN si no son validas.
+    - El mes sale de los dos decimales: 2025.1 es octubre (2025.10), no enero
+    """
+    numeros = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float)
+    anios = np.floor(numeros)
+    meses = np.round((numeros - anios) * 100)
+    validos = (meses >= 1) & (meses <= 12)
+    return np.where(validos, anios * 12 + meses - 1, np.nan)
+
+def target_month(target_date) -> int:
+    """
+    Ultimo mes del archivo Shiller utilizable en una fecha (indice año * 12 + mes - 1).
+    - Si la fecha no es el ultimo dia del mes se usa el mes anterior
+    """
+    target = pd.Timestamp(target_date)
+    mes = target.year * 12 + target.month - 1
+    return mes if target.day == target.days_in_month else mes - 1
+
+class CapeStatistics:
+    """
+    Estadisticas moviles del archivo Shiller precalculadas para cada mes en una sola pasada.
+    - Para cada mes: media y desviacion de los ultimos `window` valores numericos de una columna
+      (E10 en la 10, CAPE en la 12) hasta ese mes inclusive
+    - lookup(fecha) es una busqueda binaria sobre los meses: O(log n) por fecha
+    """
+    def __init__(self, df: pd.DataFrame):
+        meses = shiller_months(df.iloc[:, 0])
+        validas = ~np.isnan(meses)
+        # Orden estable por mes (el archivo ya viene ordenado; las filas sin fecha no cuentan)
+        orden = np.argsort(meses[validas], kind="stable")
+        self.months = meses[validas][orden]
+        self._columns = {i: pd.to_numeric(df.iloc[:, i], errors="coerce").to_numpy(dtype=float)[validas][orden]
+                         for i in COLUMNS if 0 < i < df.shape[1]}
+        self._rolling: Dict[tuple, tuple] = {}
+
+    def rolling(self, column: int, window: int) -> tuple:
+        """ (medias, desviaciones) de la ventana por fila; NaN donde no hay valores """
+        clave = (column, window)
+        if clave not in self._rolling:
+            self._rolling[clave] = _rolling_mean_std(self._columns[column], window)
+        return self._rolling[clave]
+
+    def lookup(self, target_date, column: int, window: int) -> tuple:
+        """ (media, desviacion) hasta el mes utilizable en target_date; (None, None) si no hay datos """
+        pos = int(np.searchsorted(self.months, target_month(target_date), side="right")) - 1
+        if pos < 0 or column not in self._columns:
+            return None, None
+        medias, desviaciones = self.rolling(column, window)
+        if np.isnan(medias[pos]):
+            return None, None
+        return float(medias[pos]), float(desviaciones[pos])
+
+def _rolling_mean_std(valores: np.ndarray, window: int) -> tuple:
+    """
+    Media y desviacion (ddof=1) de los ultimos `window` valores no NaN hasta cada posicion,
+    con sumas acumuladas sobre los valores presentes (igual que dropna().tail(window)).
+    """
+    presentes = ~np.isnan(valores)
+    datos = valores[presentes]
+    cuenta = np.cumsum(presentes)                     # valores presentes hasta cada fila
+    largo = np.minimum(cuenta, window)
+    # Centrar antes de acumular evita la cancelacion en la suma de cuadrados
+    centro = datos.mean() if len(datos) else 0.0
+    suma = np.concatenate(([0.0], np.cumsum(datos - centro)))
+    cuadrados = np.concatenate(([0.0], np.cumsum((datos - centro) ** 2)))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        s1 = suma[cuenta] - suma[cuenta - largo]
+        s2 = cuadrados[cuenta] - cuadrados[cuenta - largo]
+        medias = np.where(largo > 0, s1 / largo + centro, np.nan)
+        varianza = np.where(largo > 1, (s2 - s1 * s1 / largo) / (largo - 1), np.nan)
+    return medias, np.sqrt(np.maximum(varianza, 0.0))
@@ -0,0 +1,120 @@
+import json
+import math
+import os
+from collections import deque
+from datetime import date
+from pathlib import Path
+from typing import Optional
+import logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SMA_STATE_FILE = "data/spx_sma_state.json"
+# Diferencia relativa maxima entre el cierre guardado y el descargado antes de considerarlo revisado
+REVISION_TOLERANCE = 1e-6
+
+class SMAState:
+    """
+    Estado persistido de la media movil de un simbolo para la ejecucion diaria.
+    - closes: buffer circular con los ultimos `period` cierres hasta last_date (inclusive)
+    - total: suma acumulada del buffer; la SMA de la sesion siguiente es total / period (O(1))
+    - sma_last: SMA de last_date (media de los `period` cierres anteriores a last_date)
+    """
+    def __init__(self, path: str = SMA_STATE_FILE, symbol: str = "^SPX"):
+        self.path = path
+        self.symbol = symbol
+        self.period: Optional[int] = None
+        self.last_date: Optional[date] = None
+        self.closes: deque = deque()
+        self.total = 0.0
+        self.sma_last: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.last_date is not None and self.period is not None and len(self.closes) == self.period
+
+    @property
+    def last_close(self) -> Optional[float]:
+        return self.closes[-1] if self.closes else None
+
+    def next_sma(self) -> float:
+        """ SMA de la sesion siguiente a last_date """
+        return self.total / self.period
+
+    def load(self, period: int) -> bool:
+        """
+        Carga el estado desde disco. Retorna False (y descarta el estado) si no existe,
+        es de otro simbolo/periodo o la suma no coincide con el buffer.
+        """
+        self._reset(period)
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            closes = [float(c) for c in data["closes"]]
+            total = float(data["total"])
+            if data.get("symbol") != self.symbol or int(data["period"]) != period or len(closes) != period:
+                return False
+            if not math.isclose(total, math.fsum(closes), rel_tol=1e-9):
+                logger.warning(f"Estado SMA inconsistente en {self.path}; se resincroniza")
+                return False
+            self.last_date = date.fromisoformat(data["last_date"])
+            self.closes = deque(closes, maxlen=period)
+            self.total = total
+            self.sma_last = float(data["sma_last"])
+            return True
+        except Exception as e:
+            logger.warning(f"No se pudo leer el estado SMA {self.path}: {e}")
+            self._reset(period)
+            return False
+
+    def save(self):
+        if not self.path or not self.ready:
+            return
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "symbol": self.symbol,
+                "period": self.period,
+                "last_date": self.last_date.isoformat(),
+                "closes": list(self.closes),
+                "total": self.total,
+                "sma_last": self.sma_last,
+            }, f)
+        os.replace(tmp, self.path)
+
+    def is_revised(self, close: float) -> bool:
+        """ True si el cierre descargado de last_date difiere del guardado (dato revisado) """
+        return not math.isclose(close, self.last_close, rel_tol=REVISION_TOLERANCE)
+
+    def advance(self, fecha: date, close: float) -> float:
+        """
+        Agrega el cierre de la sesion siguiente a last_date en O(1).
+        - Retorna la SMA de esa sesion (los `period` cierres anteriores)
+        """
+        sma = self.next_sma()
+        self.total += close - self.closes[0]
+        self.closes.append(close)   # maxlen descarta el cierre mas antiguo
+        self.last_date = fecha
+        self.sma_last = sma
+        return sma
+
+    def rebuild(self, fecha: date, previous_closes, close: float):
+        """
+        Resincronizacion completa a partir de los cierres anteriores a `fecha` y su cierre.
+        - previous_closes debe tener al menos `period` valores
+        """
+        previos = [float(c) for c in previous_closes][-self.period:]
+        self.sma_last = math.fsum(previos) / self.period
+        self.closes = deque(previos[1:] + [float(close)], maxlen=self.period)
+        self.total = math.fsum(self.closes)
+        self.last_date = fecha
+
+    def _reset(self, period: int):
+        self.period = period
+        self.last_date = None
+        self.closes = deque(maxlen=period)
+        self.total = 0.0
+        self.sma_last = None
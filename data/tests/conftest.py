@@ -1,4 +1,5 @@
 import pytest
+import pandas as pd
 from freezegun import freeze_time
 from db.db_connection import Database
 from data.scorer_backup import ScorerBackup
@@ -9,6 +10,26 @@ def fixed_date():
     with freeze_time("2025-09-03"):
         yield
 
+class FakePriceStore:
+    """ PriceStore sin red: hay cierre en cada dia pedido (o en ninguno si vacio=True) """
+    def __init__(self, vacio=False):
+        self.vacio = vacio
+        self.consultas = []
+
+    def Ticker(self, symbol):
+        return self
+
+    def history(self, start=None, end=None, **kwargs):
+        self.consultas.append(start)
+        return pd.DataFrame() if self.vacio else pd.DataFrame({"Close": [1.0]}, index=[pd.Timestamp(start)])
+
+@pytest.fixture(autouse=True)
+def price_store(monkeypatch):
+    # get_last_trading_date confirma el cierre contra el PriceStore compartido: nunca se usa la red
+    store = FakePriceStore()
+    monkeypatch.setattr("data.price_store.get_price_store", lambda: store)
+    return store
+
 @pytest.fixture
 def fake_config(monkeypatch):
     """
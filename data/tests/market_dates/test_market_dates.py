@@ -1,6 +1,7 @@
 import pytest
 from zoneinfo import ZoneInfo
 from datetime import date, datetime,time, timedelta
+from data.market_calendar import MAX_SESSIONS_WITHOUT_DATA
 from data.market_dates import  market_now, is_market_open, get_last_trading_close, yfinance_window_for_last_close, get_market_today, get_last_trading_date
 
 @pytest.fixture
@@ -83,9 +84,49 @@ def test_get_last_trading_date_monday_befote_close(ny_tz, market_hours):
     last_date = get_last_trading_date(now=now, market_close=market_hours["close"], tz=ny_tz)
     assert last_date.weekday() == 4  # Viernes
 
+def test_get_last_trading_date_salta_feriado(ny_tz, market_hours, price_store):
+    # Viernes 5 de julio antes del cierre: el jueves 4 es feriado -> miercoles 3
+    now = datetime(2024, 7, 5, 10, 0, tzinfo=ny_tz)
+    assert get_last_trading_date(now=now, market_close=market_hours["close"], tz=ny_tz) == date(2024, 7, 3)
+    assert price_store.consultas == ["2024-07-03"]
+
+def test_get_last_trading_date_feriado_tras_el_cierre(ny_tz, market_hours):
+    now = datetime(2024, 7, 4, 17, 0, tzinfo=ny_tz)
+    assert get_last_trading_date(now=now, market_close=market_hours["close"], tz=ny_tz) == date(2024, 7, 3)
+
+def test_get_last_trading_date_feriado_sin_datos_usa_calendario(ny_tz, market_hours, price_store):
+    # Sin datos (sin red) se usa solo el calendario de sesiones, sin recorrer todo el historico
+    price_store.vacio = True
+    now = datetime(2024, 7, 5, 10, 0, tzinfo=ny_tz)
+    assert get_last_trading_date(now=now, market_close=market_hours["close"], tz=ny_tz) == date(2024, 7, 3)
+    assert len(price_store.consultas) == MAX_SESSIONS_WITHOUT_DATA
+
 ##### Tests para yfinance_window_for_last_close #####
 def test_yfinance_window_for_last_close(ny_tz, market_hours):
     now = datetime(2025, 8, 29, 17, 0, tzinfo=ny_tz)  # Viernes después del cierre
     start, end = yfinance_window_for_last_close(now=now, market_close=market_hours["close"], tz=ny_tz)
     assert start == "2025-08-29"
     assert end == "2025-08-30"
+
+##### Tests para closed_sessions_end #####
+def test_closed_sessions_end_antes_y_despues_del_cierre(ny_tz, market_hours):
+    import data.market_dates as md
+    antes = datetime(2025, 8, 29, 15, 0, tzinfo=ny_tz)
+    despues = datetime(2025, 8, 29, 16, 30, tzinfo=ny_tz)
+    assert md.closed_sessions_end(antes, market_hours["close"], ny_tz) == date(2025, 8, 29)
+    assert md.closed_sessions_end(despues, market_hours["close"], ny_tz) == date(2025, 8, 30)
+
+##### Tests para last_close_window #####
+def test_last_close_window_se_calcula_una_vez_por_dia(monkeypatch, ny_tz):
+    import data.market_dates as md
+    llamadas = []
+    monkeypatch.setattr(md, "_WINDOWS", {})
+    monkeypatch.setattr(md, "get_last_trading_date", lambda now, *a: llamadas.append(now) or now.date())
+
+    assert md.last_close_window(datetime(2025, 8, 29, 17, 0, tzinfo=ny_tz)) == ("2025-08-29", "2025-08-30")
+    assert md.last_close_window(datetime(2025, 8, 29, 18, 30, tzinfo=ny_tz)) == ("2025-08-29", "2025-08-30")
+    assert len(llamadas) == 1
+    # Otro dia (o cruzar la hora de cierre) vuelve a calcular la ventana
+    md.last_close_window(datetime(2025, 9, 2, 10, 0, tzinfo=ny_tz))
+    md.last_close_window(datetime(2025, 9, 2, 16, 5, tzinfo=ny_tz))
+    assert len(llamadas) == 3
@@ -1,5 +1,6 @@
 import pytest
 from core.scoreCalculator import ScoreCalculator
+from indicators.registry import reset_registry
 from psycopg2 import DatabaseError
 import logging
 
@@ -42,4 +43,19 @@ def test_backup_score_fails(scorer, db_mock, monkeypatch):
 
     with pytest.raises(RuntimeError) as rte:
         scorer.backup_score(cfg_id=8)
-    assert "Error al respaldar" in str(rte.value)
\ No newline at end of file
+    assert "Error al respaldar" in str(rte.value)
+
+@pytest.fixture
+def registry_limpio():
+    reset_registry()
+    yield
+    reset_registry()
+
+def test_indicadores_compartidos_con_score_calculator(db_mock, fake_config, registry_limpio):
+    """ ScorerBackup y ScoreCalculator.from_global_config usan las mismas instancias. """
+    from indicators.registry import default_indicators
+    from data.scorer_backup import ScorerBackup
+    s = ScorerBackup(db=db_mock)
+    sp, fg, vx, pe = default_indicators()
+    assert (s.sp, s.fg, s.vx, s.pe) == (sp, fg, vx, pe)
+    assert s.sp is sp and s.pe is pe
@@ -0,0 +1,88 @@
+import pytest
+import pandas as pd
+from datetime import date, datetime
+from data import market_calendar as mc
+
+@pytest.fixture
+def indice(monkeypatch, tmp_path):
+    """ Indice de sesiones en un archivo temporal; arranca sin indice en memoria """
+    monkeypatch.setattr("data.market_calendar.SESSIONS_FILE", tmp_path / "nyse_sessions.npz")
+    mc.clear_session_index()
+    yield tmp_path / "nyse_sessions.npz"
+    mc.clear_session_index()
+
+def _sin_schedule(monkeypatch):
+    monkeypatch.setattr(mc.nyse, "schedule", lambda *a, **k: pytest.fail("no deberia consultar el calendario"))
+
+def test_indice_coincide_con_el_calendario_oficial(indice):
+    schedule = mc.nyse.schedule(start_date="2024-01-01", end_date="2024-12-31")
+    assert mc.get_trading_sessions(date(2024, 1, 1), date(2024, 12, 31)) == [ts.date() for ts in schedule.index]
+    index = mc.get_session_index()
+    assert index.start == mc.SESSIONS_START
+    assert index.end == date(2025 + mc.SESSIONS_YEARS_AHEAD, 12, 31)
+
+def test_consultas_son_busquedas_en_el_indice(monkeypatch, indice):
+    mc.get_session_index()
+    _sin_schedule(monkeypatch)
+    assert mc.is_trading_day(date(2024, 7, 4)) is False          # feriado
+    assert mc.is_trading_day("2024-07-05") is True
+    assert mc.is_trading_day(datetime(2024, 7, 6, 12)) is False  # sabado
+    assert mc.next_session(date(2024, 7, 3)) == date(2024, 7, 5)
+    assert mc.previous_session(date(2024, 7, 5)) == date(2024, 7, 3)
+    assert mc.previous_session(date(2024, 7, 7)) == date(2024, 7, 5)
+    assert mc.get_trading_sessions("2024-07-03", "2024-07-08") == [date(2024, 7, 3), date(2024, 7, 5), date(2024, 7, 8)]
+
+def test_indice_se_lee_del_disco(monkeypatch, indice):
+    original = mc.get_session_index()
+    assert indice.exists()
+    mc.clear_session_index()
+    monkeypatch.setattr("data.market_calendar._build_index", lambda *a: pytest.fail("no deberia recalcular"))
+    cargado = mc.get_session_index()
+    assert cargado is not original
+    assert (cargado.sessions == original.sessions).all()
+
+def test_indice_se_regenera_si_no_cubre_el_rango(monkeypatch, indice):
+    mc.get_session_index()
+    mc.clear_session_index()
+    monkeypatch.setattr("data.market_calendar.SESSIONS_YEARS_AHEAD", mc.SESSIONS_YEARS_AHEAD + 1)
+    index = mc.get_session_index()
+    assert index.end == date(2025 + mc.SESSIONS_YEARS_AHEAD, 12, 31)
+
+def test_indice_se_regenera_con_otra_version_del_calendario(monkeypatch, indice):
+    mc.get_session_index()
+    mc.clear_session_index()
+    monkeypatch.setattr("data.market_calendar._calendar_version", lambda: "0.0")
+    llamadas = []
+    construir = mc._build_index
+    monkeypatch.setattr("data.market_calendar._build_index", lambda *a: llamadas.append(a) or construir(*a))
+    mc.get_session_index()
+    assert len(llamadas) == 1
+
+def test_fuera_del_indice_usa_el_calendario(indice):
+    assert mc.is_trading_day(date(1989, 12, 29)) is True
+    assert mc.previous_session(date(1990, 1, 2)) == date(1989, 12, 29)
+    assert mc.get_trading_sessions(date(1989, 12, 28), date(1990, 1, 3)) == [
+        date(1989, 12, 28), date(1989, 12, 29), date(1990, 1, 2), date(1990, 1, 3)]
+
+def test_last_valid_trading_day_salta_sesiones_sin_datos(monkeypatch, indice):
+    mc.get_session_index()
+    _sin_schedule(monkeypatch)
+    consultas = []
+    class FakeTicker:
+        def history(self, start, end):
+            consultas.append(start)
+            return pd.DataFrame({"Close": [1.0]}) if start == "2024-07-03" else pd.DataFrame()
+    class FakeYF:
+        def Ticker(self, symbol): return FakeTicker()
+    # Domingo: se consulta el viernes 5 (sin datos) y luego el 3 (el 4 es feriado)
+    assert mc.get_last_valid_trading_day(now=datetime(2024, 7, 7, 10), yf_client=FakeYF()) == date(2024, 7, 3)
+    assert consultas == ["2024-07-05", "2024-07-03"]
+
+def test_last_valid_trading_day_sin_datos_lanza_lookup_error(monkeypatch, indice):
+    mc.get_session_index()
+    _sin_schedule(monkeypatch)
+    class FakeYF:
+        def Ticker(self, symbol): return self
+        def history(self, start, end): return pd.DataFrame()
+    with pytest.raises(LookupError):
+        mc.get_last_valid_trading_day(now=datetime(2024, 7, 7, 10), yf_client=FakeYF(), max_sessions=3)
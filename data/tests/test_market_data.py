@@ -0,0 +1,55 @@
+import pandas as pd
+from datetime import date
+from unittest.mock import MagicMock, patch
+from data.market_data import MarketDataContext
+from indicators.spxIndicator import SPXIndicator
+from indicators.shillerPEIndicator import ShillerPEIndicator
+
+def fake_client():
+    """yf_client falso: un cierre por dia habil en [start, end)."""
+    client = MagicMock()
+
+    def history(start=None, end=None, **kwargs):
+        index = pd.bdate_range(pd.Timestamp(start), pd.Timestamp(end) - pd.Timedelta(days=1))
+        return pd.DataFrame({"Close": [100.0 + i for i in range(len(index))]}, index=index)
+
+    client.Ticker.return_value.history.side_effect = history
+    return client
+
+def test_spx_y_shiller_comparten_una_descarga():
+    client = fake_client()
+    contexto = MarketDataContext(yf_client=client, today_fn=lambda: date(2025, 9, 3))
+    fecha = date(2025, 9, 2)
+
+    with patch("utils.MarketReport.MarketReport.save"):
+        spx = SPXIndicator(sma_period=5, upper_ratio=0.2, lower_ratio=-0.2, yf_client=contexto)
+        sma = spx.fetch_data(fecha)
+        shiller = ShillerPEIndicator(yf_client=contexto)
+        cierre_shiller = shiller.get_last_close("^SPX", fecha)
+
+    assert client.Ticker.return_value.history.call_count == 1
+    assert spx.last_close == cierre_shiller
+    # SMA de los 5 cierres anteriores a la fecha
+    cierres = contexto.closes("^SPX", date(2025, 8, 1), fecha)
+    assert sma == cierres.tail(5).mean()
+
+def test_consulta_fuera_de_la_ventana_vuelve_a_descargar():
+    client = fake_client()
+    contexto = MarketDataContext(yf_client=client, lookback_days=10, today_fn=lambda: date(2025, 9, 3))
+
+    contexto.closes("^VIX", date(2025, 8, 1), date(2025, 8, 5))
+    contexto.closes("^VIX", date(2025, 7, 25), date(2025, 8, 1))   # dentro del margen
+    assert client.Ticker.return_value.history.call_count == 1
+
+    cierres = contexto.closes("^VIX", date(2025, 1, 2), date(2025, 1, 4))
+    assert client.Ticker.return_value.history.call_count == 2
+    assert list(cierres.index.date) == [date(2025, 1, 2), date(2025, 1, 3)]
+
+def test_descarga_vacia_no_se_guarda():
+    client = MagicMock()
+    client.Ticker.return_value.history.return_value = pd.DataFrame()
+    contexto = MarketDataContext(yf_client=client, today_fn=lambda: date(2025, 9, 3))
+
+    assert contexto.closes("^SPX", date(2025, 9, 1), date(2025, 9, 3)).empty
+    contexto.closes("^SPX", date(2025, 9, 1), date(2025, 9, 3))
+    assert client.Ticker.return_value.history.call_count == 2
@@ -0,0 +1,119 @@
+import pandas as pd
+import pytest
+from datetime import date
+from unittest.mock import MagicMock
+from data.price_store import PriceStore, HISTORY_START
+
+def fake_client(ultimo_dia):
+    """yf_client falso: un cierre por dia habil en [start, end) hasta ultimo_dia."""
+    client = MagicMock()
+
+    def history(start=None, end=None, **kwargs):
+        fin = min(pd.Timestamp(end) - pd.Timedelta(days=1), pd.Timestamp(ultimo_dia))
+        index = pd.bdate_range(pd.Timestamp(start), fin)
+        return pd.DataFrame({"Close": [float(ts.toordinal() % 1000) for ts in index]}, index=index)
+
+    client.Ticker.return_value.history.side_effect = history
+    return client
+
+def llamadas(client):
+    return [(c.kwargs["start"], c.kwargs["end"]) for c in client.Ticker.return_value.history.call_args_list]
+
+def test_primera_lectura_descarga_historia_completa_y_guarda(tmp_path):
+    client = fake_client(date(2025, 9, 2))
+    store = PriceStore(directory=tmp_path, yf_client=client, today_fn=lambda: date(2025, 9, 3))
+
+    datos = store.Ticker("^SPX").history(start=date(2025, 8, 25), end=date(2025, 8, 30))
+
+    assert llamadas(client) == [(HISTORY_START, date(2025, 8, 30))]
+    assert list(datos.index.date) == [date(2025, 8, d) for d in (25, 26, 27, 28, 29)]
+    assert "Close" in datos.columns
+    assert store.path("^SPX").exists()
+
+def test_lecturas_del_pasado_se_sirven_desde_disco(tmp_path):
+    client = fake_client(date(2025, 9, 2))
+    PriceStore(directory=tmp_path, yf_client=client, today_fn=lambda: date(2025, 9, 3)).closes("^VIX", end=date(2025, 9, 3))
+
+    # Nuevo proceso: mismo directorio, sin red
+    sin_red = MagicMock()
+    sin_red.Ticker.side_effect = AssertionError("no deberia descargar")
+    store = PriceStore(directory=tmp_path, yf_client=sin_red, today_fn=lambda: date(2025, 9, 3))
+    cierres = store.closes("^VIX", start=date(2020, 1, 1), end=date(2020, 1, 8))
+
+    assert list(cierres.index.date) == [date(2020, 1, d) for d in (1, 2, 3, 6, 7)]
+
+def test_solo_descarga_la_cola_desde_la_ultima_sesion(tmp_path):
+    client = fake_client(date(2025, 8, 29))
+    PriceStore(directory=tmp_path, yf_client=client, today_fn=lambda: date(2025, 8, 30)).closes("^SPX")
+
+    client = fake_client(date(2025, 9, 5))
+    store = PriceStore(directory=tmp_path, yf_client=client, today_fn=lambda: date(2025, 9, 6))
+    cierres = store.closes("^SPX", start=date(2025, 9, 1))
+
+    # Se vuelve a pedir la ultima sesion guardada (29/08) por si estaba incompleta
+    assert llamadas(client) == [(date(2025, 8, 29), date(2025, 9, 7))]
+    assert cierres.index[-1].date() == date(2025, 9, 5)
+
+def test_fallo_de_descarga_usa_los_datos_guardados(tmp_path):
+    PriceStore(directory=tmp_path, yf_client=fake_client(date(2025, 8, 29)), today_fn=lambda: date(2025, 8, 30)).closes("^SPX")
+
+    caido = MagicMock()
+    caido.Ticker.return_value.history.side_effect = ConnectionError("sin red")
+    store = PriceStore(directory=tmp_path, yf_client=caido, today_fn=lambda: date(2025, 9, 6))
+    cierres = store.closes("^SPX", start=date(2025, 8, 25))
+
+    assert cierres.index[-1].date() == date(2025, 8, 29)
+    # No se reintenta en el mismo proceso
+    store.closes("^SPX", start=date(2025, 8, 25))
+    assert caido.Ticker.return_value.history.call_count == 1
+
+def test_fin_de_semana_no_descarga(tmp_path):
+    PriceStore(directory=tmp_path, yf_client=fake_client(date(2025, 8, 29)), today_fn=lambda: date(2025, 8, 30)).closes("^SPX")
+
+    sin_red = MagicMock()
+    sin_red.Ticker.side_effect = AssertionError("no deberia descargar")
+    store = PriceStore(directory=tmp_path, yf_client=sin_red, today_fn=lambda: date(2025, 8, 31))
+    assert store.closes("^SPX").index[-1].date() == date(2025, 8, 29)
+
+def test_respuesta_sin_indice_de_fechas_no_se_guarda(tmp_path):
+    # Un DataFrame sin fechas (p.ej. un mock) no debe guardarse como un cierre del 1970-01-01
+    sin_fechas = MagicMock()
+    sin_fechas.Ticker.return_value.history.return_value = pd.DataFrame({"Close": [4500.55]})
+    store = PriceStore(directory=tmp_path, yf_client=sin_fechas, today_fn=lambda: date(2025, 9, 3))
+
+    assert store.closes("^SPX").empty
+    assert not store.path("^SPX").exists()
+
+    # Con un cliente valido se descarga el historico completo
+    client = fake_client(date(2025, 9, 2))
+    store = PriceStore(directory=tmp_path, yf_client=client, today_fn=lambda: date(2025, 9, 3))
+    assert store.closes("^SPX", start=date(2025, 1, 1)).index[-1].date() == date(2025, 9, 2)
+
+def test_cobertura_solo_hasta_el_ultimo_cierre_recibido(tmp_path):
+    # La descarga se corta el 27/08 aunque se pidio hasta hoy: el 28 y 29 se vuelven a pedir
+    PriceStore(directory=tmp_path, yf_client=fake_client(date(2025, 8, 27)), today_fn=lambda: date(2025, 8, 30)).closes("^SPX")
+
+    client = fake_client(date(2025, 8, 29))
+    store = PriceStore(directory=tmp_path, yf_client=client, today_fn=lambda: date(2025, 8, 30))
+    cierres = store.closes("^SPX", start=date(2025, 8, 25))
+
+    assert llamadas(client) == [(date(2025, 8, 27), date(2025, 8, 31))]
+    assert cierres.index[-1].date() == date(2025, 8, 29)
+
+def test_cola_se_revisa_de_nuevo_al_cerrar_la_sesion(tmp_path):
+    # Proceso iniciado con el mercado abierto: el cierre del dia se descarga despues de las 16:00
+    reloj = {"cerradas": date(2025, 9, 3)}
+    client = fake_client(date(2025, 9, 3))
+    store = PriceStore(directory=tmp_path, yf_client=client, today_fn=lambda: date(2025, 9, 3),
+                       closed_end_fn=lambda: reloj["cerradas"])
+
+    store.closes("^SPX")
+    store.closes("^SPX")
+    assert llamadas(client) == [(HISTORY_START, date(2025, 9, 4))]
+
+    reloj["cerradas"] = date(2025, 9, 4)
+    store.closes("^SPX")
+    store.closes("^SPX")
+    # Una sola revision mas, desde la sesion guardada con el mercado abierto, y queda completa
+    assert llamadas(client)[1:] == [(date(2025, 9, 3), date(2025, 9, 4))]
+    assert store._data["^SPX"].complete_until == date(2025, 9, 4)
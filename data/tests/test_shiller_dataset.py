@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from data import shiller_dataset
+from data.shiller_dataset import load_shiller_frame, store_shiller_frame
+
+@pytest.fixture(autouse=True)
+def memoria_limpia():
+    shiller_dataset.clear_memory()
+    yield
+    shiller_dataset.clear_memory()
+
+def _excel(tmp_path, filas=30, nombre="latest.xlsx"):
+    df = pd.DataFrame({f"c{i}": [float(i * 100 + r) for r in range(filas)] for i in range(13)})
+    df["c0"] = [2000 + r / 100 for r in range(filas)]
+    file_path = tmp_path / nombre
+    df.to_excel(file_path, sheet_name="Data", index=False, engine="openpyxl")
+    return file_path, df
+
+def test_conserva_posiciones_de_las_columnas(tmp_path):
+    file_path, original = _excel(tmp_path)
+    df = load_shiller_frame(file_path)
+
+    assert df.shape == original.shape
+    for i in (0, 10, 12):
+        assert df.iloc[:, i].tolist() == pytest.approx(original.iloc[:, i].tolist())
+    # Las columnas que no usa el indicador no se guardan
+    assert df.iloc[:, 5].isna().all()
+
+def test_segunda_lectura_sale_de_la_cache_en_disco(tmp_path):
+    file_path, _ = _excel(tmp_path)
+    load_shiller_frame(file_path)
+    assert len(list(tmp_path.glob("shiller_*.npz"))) == 1
+
+    shiller_dataset.clear_memory()
+    with patch("data.shiller_dataset.pd.read_excel") as mock_read:
+        df = load_shiller_frame(file_path)
+    mock_read.assert_not_called()
+    assert df.iloc[:, 10].tolist() == pytest.approx([1000.0 + r for r in range(30)])
+
+def test_contenido_nuevo_invalida_la_cache(tmp_path):
+    file_path, _ = _excel(tmp_path, filas=30)
+    load_shiller_frame(file_path)
+    _excel(tmp_path, filas=40)
+
+    assert len(load_shiller_frame(file_path)) == 40
+    # Solo queda la cache de la version vigente
+    assert len(list(tmp_path.glob("shiller_*.npz"))) == 1
+
+def test_store_desde_la_validacion(tmp_path):
+    (tmp_path / "descarga").mkdir()
+    file_path, original = _excel(tmp_path / "descarga", nombre="tmp.xlsx")
+    cache_dir = tmp_path / "inputs"
+    store_shiller_frame(original, file_path, cache_dir)
+
+    # Mismo contenido en otra ruta: se reutiliza la hoja ya leida
+    shiller_dataset.clear_memory()
+    final = cache_dir / "latest.xlsx"
+    final.write_bytes(file_path.read_bytes())
+    with patch("data.shiller_dataset.pd.read_excel") as mock_read:
+        df = load_shiller_frame(final)
+    mock_read.assert_not_called()
+    assert df.iloc[:, 12].tolist() == pytest.approx(original.iloc[:, 12].tolist())
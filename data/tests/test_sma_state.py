@@ -0,0 +1,57 @@
+import json
+import pytest
+from datetime import date
+from data.sma_state import SMAState
+
+def _estado(tmp_path, period=3):
+    estado = SMAState(path=str(tmp_path / "sma.json"))
+    estado.load(period)
+    return estado
+
+def test_rebuild_y_advance_mantienen_la_suma(tmp_path):
+    estado = _estado(tmp_path)
+    estado.rebuild(date(2024, 3, 4), [1.0, 2.0, 3.0, 4.0], 5.0)
+    # SMA del 4/3 con los 3 cierres previos; el buffer termina en el cierre del 4/3
+    assert estado.sma_last == pytest.approx(3.0)
+    assert list(estado.closes) == [3.0, 4.0, 5.0]
+    assert estado.next_sma() == pytest.approx(4.0)
+
+    assert estado.advance(date(2024, 3, 5), 9.0) == pytest.approx(4.0)
+    assert list(estado.closes) == [4.0, 5.0, 9.0]
+    assert estado.total == pytest.approx(18.0)
+    assert estado.last_date == date(2024, 3, 5)
+
+def test_save_y_load(tmp_path):
+    estado = _estado(tmp_path)
+    estado.rebuild(date(2024, 3, 4), [1.0, 2.0, 3.0], 4.0)
+    estado.save()
+
+    cargado = SMAState(path=estado.path)
+    assert cargado.load(3) is True
+    assert cargado.last_date == date(2024, 3, 4)
+    assert list(cargado.closes) == [2.0, 3.0, 4.0]
+    assert cargado.sma_last == pytest.approx(2.0)
+
+def test_load_descarta_otro_periodo_o_estado_inconsistente(tmp_path):
+    estado = _estado(tmp_path)
+    estado.rebuild(date(2024, 3, 4), [1.0, 2.0, 3.0], 4.0)
+    estado.save()
+    assert SMAState(path=estado.path).load(5) is False
+
+    with open(estado.path) as f:
+        data = json.load(f)
+    data["total"] = 100.0
+    with open(estado.path, "w") as f:
+        json.dump(data, f)
+    cargado = SMAState(path=estado.path)
+    assert cargado.load(3) is False
+    assert cargado.last_date is None
+
+def test_load_sin_archivo(tmp_path):
+    assert SMAState(path=str(tmp_path / "no_existe.json")).load(3) is False
+
+def test_is_revised(tmp_path):
+    estado = _estado(tmp_path)
+    estado.rebuild(date(2024, 3, 4), [1.0, 2.0, 3.0], 4000.0)
+    assert estado.is_revised(4000.0) is False
+    assert estado.is_revised(4001.5) is True
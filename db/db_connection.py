@@ -1,5 +1,7 @@
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from utils.lazy_import import lazy_module
+# psycopg2 se importa al abrir la primera conexion
+psycopg2 = lazy_module("psycopg2")
+extras = lazy_module("psycopg2.extras")
 import os
 from dotenv import load_dotenv
 
@@ -24,7 +26,7 @@ class Database:
             # En el primer init define el factory por defecto
             self._connection_factory = getattr(
                 self, "_connection_factory",
-                lambda: psycopg2.connect(DB_URL, cursor_factory=RealDictCursor)
+                lambda: psycopg2.connect(DB_URL, cursor_factory=extras.RealDictCursor)
             )
     
     # Metodo que permite reiniciar el singleton (Util para los tests)
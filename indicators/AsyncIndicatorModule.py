@@ -0,0 +1,37 @@
+from abc import ABC, abstractmethod
+from datetime import date
+import asyncio
+
+class AsyncIndicatorModule(ABC):
+    """
+    Variante asincrona de IndicatorModule para indicadores con I/O nativo asyncio.
+    Los indicadores sincronos (IndicatorModule) no necesitan implementarla:
+    AsyncScoreCalculator los ejecuta en un executor automaticamente.
+    """
+
+    @abstractmethod
+    async def fetch_data(self, date: date):
+        """ Obtiene los datos necesarios para el indicador. """
+
+    @abstractmethod
+    async def normalize(self, date: date):
+        """
+        - Procesa los datos obtenidos y los transforma en valores entre 0 y 1.
+        - Este valor representa la contribución del indicador al sistema.
+        """
+
+    async def get_score(self, date: date):
+        """
+        - Retorna el valor normalizado.
+        - Este metodo puede ser sobreescrito si el indicador necesita ajustar el resultado.
+        """
+        return await self.normalize(date)
+
+    def get_params(self) -> dict:
+        """ Parametros que afectan al score (huella para el cache de scores) """
+        return {}
+
+    async def get_scores(self, dates):
+        """ Retorna un diccionario {fecha: score}, evaluando las fechas de forma concurrente """
+        scores = await asyncio.gather(*(self.get_score(d) for d in dates))
+        return dict(zip(dates, scores))
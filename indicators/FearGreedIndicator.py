@@ -1,9 +1,9 @@
-from fear_and_greed import get as get_fear_greed_current
 from utils.MarketReport import MarketReport
 from indicators.IndicatorModule import IndicatorModule
 from datetime import datetime
 import data.market_dates as md
-from utils.cnn_feargreed_loader import get_value_by_date, DateOutOfRangeError
+from utils.cnn_feargreed_loader import get_value_by_date, get_values_by_dates, DateOutOfRangeError
+import numpy as np
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -26,9 +26,13 @@ class FearGreedIndicator(IndicatorModule):
 
     def fetch_data(self, date): 
         try:
-            if self._is_cached(date):
-                return self.fgi_value
-            fgi = self.fetch_fn(date)
+            with self.span("cache") as s:
+                if self._is_cached(date):
+                    s.cache_hit()
+                    return self.fgi_value
+                s.cache_miss()
+            with self.span("fetch"):
+                fgi = self.fetch_fn(date)
             self.fgi_value = fgi
             # Validación para evitar datos fuera de rango
             if not (0 <= fgi.value <= 100):
@@ -55,13 +59,43 @@ class FearGreedIndicator(IndicatorModule):
                 raise ValueError("No se pudieron obtener datos para normalizar")
 
             # Normalizamos
-            fg_normalize = (100 - self.fgi_value.value.__round__()) / 100
+            fg_normalize = self._normalize_value(self.fgi_value.value)
             self.fg_normalized = fg_normalize
             return fg_normalize
 
         except Exception as e:
             logger.warning(f"Datos insuficientes: {e}")
             return None
+
+    @staticmethod
+    def _normalize_value(value):
+        """ A mayor miedo, mayor score: (100 - valor) / 100 """
+        return (100 - value.__round__()) / 100
+
+    def normalize_series(self, raw_values):
+        """ Version vectorizada de _normalize_value sobre valores del indice (0-100) """
+        return (100 - np.rint(np.asarray(raw_values, dtype=float))) / 100
+
+    def get_scores(self, dates):
+        """
+        Calcula el score de varias fechas sin escribir el reporte por cada una.
+        - El historico de CNN se descarga como maximo una vez al dia (cache de cnn_feargreed_loader)
+        - Las fechas sin dato o fuera de rango se devuelven como None
+        - Con la fuente por defecto todas las fechas se resuelven en una sola busqueda por lotes
+        """
+        lote = get_values_by_dates(dates) if self.fetch_fn is get_value_by_date else None
+        scores = {}
+        for d in dates:
+            if lote is not None:
+                fgi = lote[d]
+            else:
+                try:
+                    fgi = self.fetch_fn(d)
+                except DateOutOfRangeError:
+                    fgi = None
+            valido = fgi is not None and fgi.value is not None and 0 <= fgi.value <= 100
+            scores[d] = self._normalize_value(fgi.value) if valido else None
+        return scores
         
     def set_report(self, date):
         report = MarketReport()
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
+import numpy as np
 from datetime import date
+from utils.instrumentation import get_tracer
 class IndicatorModule(ABC):
     """
     Clase abstracta para todos los indicadores.
@@ -26,6 +28,49 @@ class IndicatorModule(ABC):
         """
         return self.normalize(date)
 
+    def _normalize_value(self, value):
+        """
+        - Normaliza un valor crudo del indicador (escalar) a un score entre 0 y 1.
+        - Es la base de normalize_series por defecto; los indicadores que la usan deben sobreescribirlo.
+        """
+        raise NotImplementedError(f"{type(self).__name__} no implementa _normalize_value")
+
+    def normalize_series(self, raw_values):
+        """
+        - Version vectorizada de normalize: recibe un arreglo de valores crudos del indicador
+          y retorna un arreglo numpy de scores entre 0 y 1 (NaN donde el valor es NaN).
+        - Pensado para backtests y reponderaciones sobre muchas fechas sin llamadas por elemento.
+        - Por defecto aplica _normalize_value a cada valor; los indicadores pueden sobreescribirlo
+          con una formula sobre el arreglo completo.
+        """
+        valores = np.asarray(raw_values, dtype=float)
+        if valores.size == 0:
+            return valores
+        normalizar = np.vectorize(lambda v: np.nan if np.isnan(v) else self._normalize_value(v), otypes=[float])
+        return normalizar(valores)
+
+    def get_params(self) -> dict:
+        """
+        - Retorna los parametros que afectan al score (umbrales, periodos, etc.).
+        - Se usan como huella del indicador en el cache de ScoreCalculator.
+        """
+        return {}
+
+    def span(self, stage: str, **attrs):
+        """
+        - Span de instrumentacion '<Indicador>.<etapa>' para medir tiempo, bytes y cache.
+        - Es un no-op si el tracing esta desactivado (utils.instrumentation).
+        """
+        return get_tracer().span(f"{type(self).__name__}.{stage}", **attrs)
+
+    def get_scores(self, dates):
+        """
+        - Retorna un diccionario {fecha: score} para una lista de fechas.
+        - Por defecto llama a get_score por cada fecha.
+        - Los indicadores pueden sobreescribirlo para descargar su serie una sola vez.
+        """
+        return {d: self.get_score(d) for d in dates}
+
     def get_last_close(self):
         """
         - Metodo para obtener el valor del ultimo cierre de un simbolo.
@@ -0,0 +1,78 @@
+from typing import Dict, List, Optional, Type
+import threading
+from indicators.IndicatorModule import IndicatorModule
+from indicators.spxIndicator import SPXIndicator
+from indicators.FearGreedIndicator import FearGreedIndicator
+from indicators.vixIndicator import VixIndicator
+from indicators.shillerPEIndicator import ShillerPEIndicator
+from data.price_store import get_price_store
+from data.market_data import MarketDataContext
+from data.sma_state import SMAState
+from core.score_cache import ScoreCache
+from core.score_matrix import ScoreMatrix, SCORE_MATRIX_FILE
+
+# Instancias compartidas por proceso: {clase: instancia}
+_REGISTRY: Dict[Type[IndicatorModule], IndicatorModule] = {}
+_LOCK = threading.Lock()
+_MARKET_DATA: Optional[MarketDataContext] = None
+# Cache de scores del proceso: sobrevive entre llamadas a get_global_score
+_SCORE_CACHE: Optional[ScoreCache] = None
+# Matriz de scores persistida: se lee del disco una sola vez por proceso
+_SCORE_MATRIX: Optional[ScoreMatrix] = None
+# Indicadores que leen precios de yfinance: se crean con el MarketDataContext compartido como yf_client
+_PRICE_READERS = (SPXIndicator, VixIndicator, ShillerPEIndicator)
+
+def get_indicator(cls: Type[IndicatorModule]) -> IndicatorModule:
+    """
+    Devuelve la instancia compartida de un indicador (se crea la primera vez).
+    - Los caches internos del indicador sobreviven entre llamadas, por lo que
+      ScorerBackup y ScoreCalculator descargan cada fuente una sola vez por fecha.
+    - SPX, VIX y Shiller comparten un MarketDataContext: ^SPX se descarga una sola vez por
+      ejecucion (SMA, ultimo cierre y denominador del CAPE) desde el PriceStore en disco.
+    - SPX usa el estado persistido de la SMA (data/sma_state.py): la sesion nueva solo necesita su cierre.
+    """
+    global _MARKET_DATA
+    with _LOCK:
+        if cls not in _REGISTRY:
+            if cls in _PRICE_READERS:
+                if _MARKET_DATA is None:
+                    _MARKET_DATA = MarketDataContext(yf_client=get_price_store())
+                # La SMA de SPX avanza desde su estado persistido en la ejecucion diaria
+                extra = {"sma_state": SMAState()} if cls is SPXIndicator else {}
+                _REGISTRY[cls] = cls(yf_client=_MARKET_DATA, **extra)
+            else:
+                _REGISTRY[cls] = cls()
+        return _REGISTRY[cls]
+
+def default_indicators() -> List[IndicatorModule]:
+    """ Instancias compartidas de los indicadores por defecto, en el orden de ScoreCalculator """
+    return [get_indicator(cls) for cls in (SPXIndicator, FearGreedIndicator, VixIndicator, ShillerPEIndicator)]
+
+def get_score_cache(maxsize: int = 128, ttl: Optional[float] = None) -> ScoreCache:
+    """
+    Cache de scores compartido por el proceso (ScoreCalculator.from_global_config).
+    - Las claves incluyen pesos y parametros de los indicadores, por lo que se puede compartir entre calculadoras
+    - Se crea de nuevo si cambian maxsize o ttl en la configuracion
+    """
+    global _SCORE_CACHE
+    with _LOCK:
+        if _SCORE_CACHE is None or (_SCORE_CACHE.maxsize, _SCORE_CACHE.ttl) != (maxsize, ttl):
+            _SCORE_CACHE = ScoreCache(maxsize=maxsize, ttl=ttl)
+        return _SCORE_CACHE
+
+def get_score_matrix(path: str = SCORE_MATRIX_FILE) -> ScoreMatrix:
+    """ Matriz de scores del proceso (ScoreCalculator.from_global_config), cargada de path en el primer uso """
+    global _SCORE_MATRIX
+    with _LOCK:
+        if _SCORE_MATRIX is None or _SCORE_MATRIX.path != path:
+            _SCORE_MATRIX = ScoreMatrix.load(path)
+        return _SCORE_MATRIX
+
+def reset_registry():
+    """ Descarta las instancias compartidas, los datos de mercado, el cache y la matriz de scores (util para los tests) """
+    global _MARKET_DATA, _SCORE_CACHE, _SCORE_MATRIX
+    with _LOCK:
+        _REGISTRY.clear()
+        _MARKET_DATA = None
+        _SCORE_CACHE = None
+        _SCORE_MATRIX = None
@@ -1,11 +1,16 @@
 from indicators.IndicatorModule import IndicatorModule
 from utils.file_downloader import download_latest_file
-from data.market_dates import yfinance_window_for_last_close
+import data.market_dates as md
 from utils.MarketReport import MarketReport
+from data.price_history import to_close_series, close_on_or_after, close_lookup_window
+from data.shiller_dataset import load_shiller_frame, CapeStatistics
+from datetime import timedelta
 from dotenv import load_dotenv
-import yfinance as yf
+from utils.lazy_import import lazy_module
+yf = lazy_module("yfinance")     # se importa en la primera descarga
 import os
 import pandas as pd
+import numpy as np
 import logging
 
 load_dotenv()
@@ -13,13 +18,13 @@ URL = os.getenv("SHILLER_PE_URL")
 NAME = "latest.xls"
 PATH_DIR = os.getenv("SAVE_PATH", "data/inputs")
 MAX_VALUE = 120
-start_date, end_date = yfinance_window_for_last_close()
 SYMBOL = "^SPX"
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 class ShillerPEIndicator(IndicatorModule):
     #Constructor
-    def __init__(self):
+    def __init__(self, yf_client = None):
+        """ yf_client: cliente yfinance mockeable (p.ej. el PriceStore compartido) """
         super().__init__()
         # Atributos para almacenar los resultados y la fecha de cálculo
         self._last_calculated_date = None
@@ -29,17 +34,27 @@ class ShillerPEIndicator(IndicatorModule):
         self.last_close = None
         self.promedio_cape_30 = None
         self.desv_cape_30 = None
+        self.yf_client = yf_client or yf
+        self._closes = {}   # cierres ya consultados: {(simbolo, fecha): cierre}
+        self._statistics = None   # (DataFrame, CapeStatistics) del ultimo archivo procesado
 
     def _is_cached(self, date):
         # Verifica si los datos ya estan calculados para esta fecha
         return self._last_calculated_date == date and self.daily_cape is not None
 
+    def get_params(self):
+        return {"url": self.url, "max_value": MAX_VALUE, "window_cape_30": 360}
+
     def fetch_data(self, date):
             # Comenzamos con la verificación en cache
-            if self._is_cached(date):
-                return self.daily_cape
+            with self.span("cache") as s:
+                if self._is_cached(date):
+                    s.cache_hit()
+                    return self.daily_cape
+                s.cache_miss()
             # Descargar el archivo mas reciente
-            filepath = download_latest_file(base_url=URL, file_name=NAME, save_dir=PATH_DIR)
+            with self.span("download"):
+                filepath = download_latest_file(base_url=URL, file_name=NAME, save_dir=PATH_DIR)
             if not filepath:
                 raise RuntimeError("No se pudo descargar el archivo Shiller PE")
 
@@ -63,13 +78,34 @@ class ShillerPEIndicator(IndicatorModule):
         if self.daily_cape is None or self.promedio_cape_30 is None or self.desv_cape_30 is None:
             raise RuntimeError("No se puede normalizar: faltan datos criticos")
 
-        if self.desv_cape_30 <= 0.1:
+        return self._normalize_cape(self.daily_cape, self.promedio_cape_30, self.desv_cape_30)
+
+    @staticmethod
+    def _normalize_cape(daily_cape, promedio_cape_30, desv_cape_30):
+        """ Score por z-score del CAPE diario frente a la media/desviacion de 30 años """
+        if desv_cape_30 <= 0.1:
             return 1.0   # salir inmediatamente, no recalcular
 
-        z = (self.daily_cape - self.promedio_cape_30) / self.desv_cape_30
+        z = (daily_cape - promedio_cape_30) / desv_cape_30
         score = max(0, min(100, 100 - max(0, z) * 25)) / 100
         return score
 
+    def normalize_series(self, raw_values, promedio_cape_30=None, desv_cape_30=None):
+        """
+        Version vectorizada de _normalize_cape sobre CAPE diarios.
+        - promedio_cape_30 / desv_cape_30: escalares o arreglos por fecha (por defecto los ultimos calculados)
+        """
+        promedio = self.promedio_cape_30 if promedio_cape_30 is None else promedio_cape_30
+        desv = self.desv_cape_30 if desv_cape_30 is None else desv_cape_30
+        if promedio is None or desv is None:
+            raise RuntimeError("No se puede normalizar: faltan datos criticos")
+        cape = np.asarray(raw_values, dtype=float)
+        promedio, desv = np.asarray(promedio, dtype=float), np.asarray(desv, dtype=float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            z = (cape - promedio) / desv
+        score = np.clip(100 - np.maximum(0, z) * 25, 0, 100) / 100
+        return np.where(desv <= 0.1, 1.0, score)
+
     def get_score(self, date):
         # Primero, asegurarnos de que los datos estén calculados.
         if not self._is_cached(date):
@@ -79,13 +115,48 @@ class ShillerPEIndicator(IndicatorModule):
         normalized_score = self.normalize(date)
         return round(normalized_score, 2)
     
+    def get_scores(self, dates):
+        """
+        Calcula el score de varias fechas descargando y leyendo el archivo Shiller una sola vez,
+        y con una sola descarga de ^SPX para todo el rango.
+        - Las fechas sin datos suficientes se devuelven como None
+        """
+        if not dates:
+            return {}
+        with self.span("download"):
+            filepath = download_latest_file(base_url=URL, file_name=NAME, save_dir=PATH_DIR)
+        if not filepath:
+            raise RuntimeError("No se pudo descargar el archivo Shiller PE")
+        df = self._read_excel(filepath)
+
+        sp500 = self.yf_client.Ticker(SYMBOL)
+        with self.span("yfinance_history", symbol=SYMBOL):
+            cierres = to_close_series(sp500.history(start=min(dates), end=max(dates) + timedelta(days=1), auto_adjust=True))
+
+        scores = {}
+        for d in dates:
+            cape_average = self.calculate_cape_average(df, d, MAX_VALUE)
+            promedio, desv = self.calculate_cape_30(df, d, 360)
+            cierre = close_on_or_after(cierres, d)
+            if cierre is None or cape_average is None or promedio is None or desv is None:
+                scores[d] = None
+                continue
+            daily_cape = round(cierre / cape_average, 2)
+            scores[d] = round(self._normalize_cape(daily_cape, promedio, desv), 2)
+        return scores
+
+    def _read_excel(self, file_path):
+        """
+        Hoja 'Data' del archivo Shiller (columnas 0, 10 y 12).
+        - El Excel se lee una sola vez por contenido; despues sale de la cache de data.shiller_dataset
+        """
+        with self.span("parse_excel"):
+            return load_shiller_frame(file_path)
+
     def _process_data(self, file_path, date=None):
         try:
-            # Detectar extensión y elegir engine
-            ext = str(file_path).split(".")[-1].lower()
-            engine = "xlrd" if ext == "xls" else "openpyxl"
             # Leer el archivo
-            df = pd.read_excel(file_path, sheet_name="Data", engine=engine)
+            df = self._read_excel(file_path)
             if date:
                 self.cape_average = self.calculate_cape_average(df, date, MAX_VALUE)
             else:
@@ -107,9 +178,7 @@ class ShillerPEIndicator(IndicatorModule):
             raise RuntimeError(f"Error al procesar el archivo {file_path}: {e}")
     
     def _process_data_30(self, file_path, date=None):
-        ext = str(file_path).split(".")[-1].lower()
-        engine = "xlrd" if ext == "xls" else "openpyxl"
-        df = pd.read_excel(file_path, sheet_name="Data", engine=engine)
+        df = self._read_excel(file_path)
         if date:
             self.promedio_cape_30, self.desv_cape_30 = self.calculate_cape_30(df, date, 360)
         else:    
@@ -125,19 +194,32 @@ class ShillerPEIndicator(IndicatorModule):
             self.promedio_cape_30 = val_obtenidos.mean() if not val_obtenidos.empty else None
             self.desv_cape_30 = val_obtenidos.std() if not val_obtenidos.empty else None
 
-    def get_last_close(self, symbol, date):
-        sp500 = yf.Ticker(symbol)
-        data = sp500.history(start=date, end=end_date, auto_adjust=True)
+    def get_last_close(self, symbol, date, limit=None):
+        """
+        Cierre de symbol en date (o la siguiente sesion), leido de yf_client.
+        - limit: fin maximo de la consulta; por defecto el de las sesiones ya cerradas segun el reloj (sin I/O)
+        """
+        clave = (symbol, pd.Timestamp(date).date())
+        if clave in self._closes:
+            return self._closes[clave]
+        sp500 = self.yf_client.Ticker(symbol)
+        # Solo la sesion pedida (o la siguiente), sin pasar del ultimo cierre completo
+        inicio, fin = close_lookup_window(date, limit or md.closed_sessions_end())
+        with self.span("yfinance_history", symbol=symbol):
+            data = sp500.history(start=inicio, end=fin, auto_adjust=True)
         if data.empty:
             print("❌ No se pudieron obtener datos del índice S&P 500")
             return None
-        return float(data['Close'].iloc[0])
+        self._closes[clave] = float(data['Close'].iloc[0])
+        return self._closes[clave]
     
     def parser_shiller_dates_searcher(self, df):
         """1. Convertir la primera columna del archivo ShillerPE a datetime.
             - El formato esperado es -> YYYY - MM
+            - Se formatea con dos decimales: el Excel guarda octubre como 2025.1
         """
-        fechas = pd.to_datetime(df.iloc[:, 0].astype(str), format="%Y.%m", errors="coerce")
+        numeros = pd.to_numeric(df.iloc[:, 0], errors="coerce")
+        fechas = pd.to_datetime(numeros.map(lambda v: f"{v:.2f}", na_action="ignore"), format="%Y.%m", errors="coerce")
         df = df.assign(fecha=fechas)
         return df
     
@@ -162,20 +244,21 @@ class ShillerPEIndicator(IndicatorModule):
         col = pd.to_numeric(df.iloc[:, col_index], errors="coerce").dropna()
         return col.tail(window_size)
     
+    def cape_statistics(self, df) -> CapeStatistics:
+        """ Estadisticas moviles del archivo, calculadas una sola vez por DataFrame """
+        if self._statistics is None or self._statistics[0] is not df:
+            self._statistics = (df, CapeStatistics(df))
+        return self._statistics[1]
+
     # Funciones especificas
     def calculate_cape_average(self, df, target_date, max_value=120):
-        df = self.parser_shiller_dates_searcher(df)
-        df = self.filter_until_date(df, target_date)
-        values = self.extract_numeric_column(df, 10, max_value)
-        return values.mean() if not values.empty else None
+        """ Promedio de los ultimos `max_value` E10 (columna 10) hasta el mes utilizable en target_date """
+        promedio, _ = self.cape_statistics(df).lookup(target_date, 10, max_value)
+        return promedio
 
     def calculate_cape_30(self, df, target_date, window_size=360):
-        df = self.parser_shiller_dates_searcher(df)
-        df = self.filter_until_date(df, target_date)
-        values = self.extract_numeric_column(df, 12, window_size)
-        promedio = values.mean() if not values.empty else None
-        desv = values.std() if not values.empty else None
-        return promedio, desv
+        """ Media y desviacion de los ultimos `window_size` CAPE (columna 12) hasta el mes utilizable """
+        return self.cape_statistics(df).lookup(target_date, 12, window_size)
     
     def set_report(self, date):
         report = MarketReport()
@@ -1,23 +1,28 @@
 from indicators.IndicatorModule import IndicatorModule
 from config.config_loader import get_config
-import yfinance as yf
+from utils.lazy_import import lazy_module
+yf = lazy_module("yfinance")     # se importa en la primera descarga
 import data.market_dates as md
+import pandas as pd
+import numpy as np
+from data.price_history import to_close_series, close_lookup_window
+from data.market_calendar import get_trading_sessions
+from data.sma_state import SMAState
 from datetime import datetime, timedelta
 from utils.MarketReport import MarketReport
 import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-config = get_config()
-# Obtenemos el valor del periodo para SMA desde el modulo de configuracion
-periodo_sma = config.get('indicators',{}).get('spx',{}).get('sma_period')
 SIMBOL = "^SPX"
-start_date, end_date = md.yfinance_window_for_last_close()
 
 class SPXIndicator(IndicatorModule):
     # Constructor
-    def __init__(self, upper_ratio = None, lower_ratio = None, sma_period = None, yf_client = None, config_data = None):
-        """ El objetivo es poder crear un objeto yf_client falso para mockear en las pruebas. """
+    def __init__(self, upper_ratio = None, lower_ratio = None, sma_period = None, yf_client = None, config_data = None, sma_state: SMAState = None):
+        """
+        El objetivo es poder crear un objeto yf_client falso para mockear en las pruebas.
+        - sma_state: Estado persistido de la SMA para la ejecucion diaria (None = siempre ruta completa)
+        """
         # Cargar configuracion mockeable para tests
         self.config = config_data or get_config()
         spx_config = self.config.get('indicators', {}).get('spx', {})
@@ -30,25 +35,39 @@ class SPXIndicator(IndicatorModule):
         self.sma_value = None
         self.last_close = None
         self.ratio_normalize = None
+        self._closes = {}   # cierres ya consultados: {(simbolo, fecha): cierre}
 
         # Cliente yf mockeable
         self.yf_client = yf_client or yf
+        self.sma_state = sma_state
 
     def _is_cached(self, date):
         return self._last_calculated_date == date and self.sma_value is not None
+
+    def get_params(self):
+        return {"upper_ratio": self.upper_ratio, "lower_ratio": self.lower_ratio, "sma_period": self.sma_period}
     
 ### Metodo independiente para obtener el ultimo cierre ###
-    def get_last_close(self, SIMBOL, date):
+    def get_last_close(self, SIMBOL, date, limit=None):
         # Metodo para obtener el valor del ultimo cierre del indice S&P 500
+        # limit: fin maximo de la consulta; por defecto el de las sesiones ya cerradas segun el reloj (sin I/O)
         try:
+            clave = (SIMBOL, pd.Timestamp(date).date())
+            if clave in self._closes:
+                self.last_close = self._closes[clave]
+                return self.last_close
             sp500 = self.yf_client.Ticker(SIMBOL)
-            datos = sp500.history(start=date, end=end_date, auto_adjust=True)
+            # Solo la sesion pedida (o la siguiente), sin pasar del ultimo cierre completo
+            inicio, fin = close_lookup_window(date, limit or md.closed_sessions_end())
+            with self.span("yfinance_history", symbol=SIMBOL):
+                datos = sp500.history(start=inicio, end=fin, auto_adjust=True)
 
             if datos.empty:
                 print("No se obtuvieron datos para el S&P 500.")
                 return None
             ultimo_cierre = float(datos['Close'].iloc[0])
             self.last_close = ultimo_cierre
+            self._closes[clave] = ultimo_cierre
             return ultimo_cierre
         except Exception as e:
             print(f"Error al obtener el ultimo cierre: {e}")
@@ -72,12 +91,20 @@ class SPXIndicator(IndicatorModule):
 
     def fetch_data(self, date):
         try:
-            if self._is_cached(date):
+            with self.span("cache") as s:
+                if self._is_cached(date):
+                    s.cache_hit()
+                    return self.sma_value
+                s.cache_miss()
+            if self.sma_state is not None and self._advance_sma_state(date):
+                self._last_calculated_date = date
+                self.set_report(date)
                 return self.sma_value
             f_inicio, f_fin = self.get_backtesting_date_range_sma(date)
             ticker = self.yf_client.Ticker(SIMBOL)
             # Descargar 300 dias bursatiles para asegurar los dias por defecto
-            historical_data = ticker.history(start=f_inicio, end=f_fin)
+            with self.span("yfinance_history", symbol=SIMBOL):
+                historical_data = ticker.history(start=f_inicio, end=f_fin)
             if historical_data.empty:
                 print("No se obtuvieron datos historicos")
                 return None
@@ -98,6 +125,8 @@ class SPXIndicator(IndicatorModule):
             sma = cierres.tail(self.sma_period).mean()
             self.sma_value = sma
             self.last_close = self.get_last_close(SIMBOL, date)
+            if self.sma_state is not None:
+                self._resync_sma_state(date, cierres)
             self._last_calculated_date = date
             self.set_report(date)
             return sma
@@ -106,6 +135,63 @@ class SPXIndicator(IndicatorModule):
             print(f"Hubo un error al obtener datos de la API: {e}")
             raise
     
+    def _advance_sma_state(self, date) -> bool:
+        """
+        SMA desde el estado persistido: solo se descargan el cierre guardado y el de la fecha (O(1)).
+        - Retorna False si hay que usar la ruta completa: sin estado, fecha anterior al estado,
+          sesiones intermedias sin guardar (hueco) o cierre guardado revisado por el proveedor
+        """
+        estado = self.sma_state
+        with self.span("sma_state") as s:
+            if not estado.load(self.sma_period):
+                s.cache_miss()
+                return False
+            fecha = pd.Timestamp(date).date()
+            if fecha == estado.last_date:
+                s.cache_hit()
+                self.sma_value, self.last_close = estado.sma_last, estado.last_close
+                return True
+            if fecha < estado.last_date:
+                s.cache_miss()
+                return False
+
+            fin = min(fecha + timedelta(days=1), md.closed_sessions_end())
+            with self.span("yfinance_history", symbol=SIMBOL):
+                cierres = to_close_series(self.yf_client.Ticker(SIMBOL).history(start=estado.last_date, end=fin, auto_adjust=True))
+            if [t.date() for t in cierres.index] != [estado.last_date, fecha]:
+                logger.info(f"Estado SMA de {SIMBOL}: hueco entre {estado.last_date} y {fecha}, resincronizacion completa")
+                s.cache_miss()
+                return False
+            if estado.is_revised(float(cierres.iloc[0])):
+                logger.info(f"Estado SMA de {SIMBOL}: cierre del {estado.last_date} revisado, resincronizacion completa")
+                s.cache_miss()
+                return False
+
+            s.cache_hit()
+            cierre = float(cierres.iloc[1])
+            self.sma_value = estado.advance(fecha, cierre)
+            self.last_close = cierre
+            self._closes[(SIMBOL, fecha)] = cierre
+            estado.save()
+            return True
+
+    def _resync_sma_state(self, date, cierres):
+        """
+        Reconstruye el estado persistido con los cierres de la ruta completa.
+        - Solo avanza: una fecha anterior al estado guardado (backtesting) no lo reemplaza
+        - Solo sesiones con cierre completo, para que el estado no guarde un precio intradia
+        """
+        estado = self.sma_state
+        fecha = pd.Timestamp(date).date()
+        if self.last_close is None or fecha >= md.closed_sessions_end():
+            return
+        if estado.last_date is not None and fecha < estado.last_date:
+            return
+        if not get_trading_sessions(fecha, fecha):
+            return
+        estado.rebuild(fecha, cierres.to_numpy(dtype=float), self.last_close)
+        estado.save()
+
     def normalize(self, date):
         try:
             if not self._is_cached(date):
@@ -123,21 +209,78 @@ class SPXIndicator(IndicatorModule):
 
             # Obtenemos el ratio
             ratio = (ultimo_cierre - sma) / sma
-            # Evaluar y normalizar segun la formula
-            if ratio <= self.lower_ratio:
-                ratio = 1.0
-                return ratio
-            elif ratio >= self.upper_ratio:
-                ratio = 0.0
-                return ratio
-            if self.lower_ratio < ratio < self.upper_ratio:
-                ratio = (self.upper_ratio - ratio) / (self.upper_ratio - self.lower_ratio)
-                return ratio
-            self.ratio_normalize = ratio
+            return self._normalize_ratio(ratio)
         except Exception as e:
             print(f"Hubo un error al normalizar los valores: {e}")
             raise
 
+    def _normalize_ratio(self, ratio):
+        """ Evaluar y normalizar el ratio (cierre - SMA) / SMA segun la formula """
+        if ratio <= self.lower_ratio:
+            return 1.0
+        elif ratio >= self.upper_ratio:
+            return 0.0
+        return (self.upper_ratio - ratio) / (self.upper_ratio - self.lower_ratio)
+
+    def normalize_series(self, raw_values):
+        """ Version vectorizada de _normalize_ratio sobre ratios (cierre - SMA) / SMA: (upper - ratio) / (upper - lower) acotado a [0, 1] """
+        ratios = np.asarray(raw_values, dtype=float)
+        return np.clip((self.upper_ratio - ratios) / (self.upper_ratio - self.lower_ratio), 0.0, 1.0)
+
+    def sma_series(self, start, end) -> pd.DataFrame:
+        """
+        SMA, ultimo cierre, ratio y score normalizado de cada sesion en [start, end] en una sola pasada.
+        - Una sola descarga de ^SPX; la SMA sale de una media movil por suma acumulada (O(1) por sesion)
+        - La SMA de cada sesion usa los `sma_period` cierres anteriores (igual que fetch_data)
+        - Las sesiones sin suficientes cierres previos quedan como NaN
+        """
+        inicio, fin = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        cierres = self._history_closes(inicio.date(), fin.date())
+        posiciones = np.arange(cierres.index.searchsorted(inicio), cierres.index.searchsorted(fin, side="right"))
+        columnas = self._sma_arrays(cierres.to_numpy(dtype=float), posiciones)
+        return pd.DataFrame(columnas, index=cierres.index[posiciones])
+
+    def get_scores(self, dates):
+        """
+        Calcula el score de varias fechas con una sola descarga de ^SPX.
+        - La SMA de cada fecha usa los `sma_period` cierres anteriores a la fecha (igual que fetch_data)
+        - El cierre es el de la propia fecha o la siguiente sesion (igual que get_last_close)
+        - Las fechas sin datos suficientes se devuelven como None
+        """
+        if not dates:
+            return {}
+        cierres = self._history_closes(min(dates), max(dates))
+        posiciones = cierres.index.searchsorted(pd.DatetimeIndex([pd.Timestamp(d) for d in dates]))
+        normalizados = self._sma_arrays(cierres.to_numpy(dtype=float), posiciones)["normalized"]
+        return {d: (None if np.isnan(v) else float(v)) for d, v in zip(dates, normalizados)}
+
+    def _history_closes(self, desde, hasta) -> pd.Series:
+        """ Cierres de ^SPX desde la ventana del SMA de `desde` hasta `hasta` (inclusive), en una descarga """
+        f_inicio, _ = self.get_backtesting_date_range_sma(desde)
+        ticker = self.yf_client.Ticker(SIMBOL)
+        with self.span("yfinance_history", symbol=SIMBOL):
+            return to_close_series(ticker.history(start=f_inicio, end=hasta + timedelta(days=1), auto_adjust=True))
+
+    def _sma_arrays(self, valores: np.ndarray, posiciones: np.ndarray) -> dict:
+        """
+        SMA de los `sma_period` valores anteriores a cada posicion, cierre en la posicion, ratio y score.
+        - Media movil por suma acumulada: (acum[p] - acum[p - n]) / n
+        - Posiciones sin historia suficiente o fuera del arreglo quedan como NaN
+        """
+        n = self.sma_period
+        posiciones = np.asarray(posiciones, dtype=np.int64)
+        acumulado = np.concatenate(([0.0], np.cumsum(valores)))
+        en_rango = posiciones < len(valores)
+        validas = en_rango & (posiciones >= n)
+        p = posiciones[validas]
+
+        sma = np.full(len(posiciones), np.nan)
+        sma[validas] = (acumulado[p] - acumulado[p - n]) / n
+        cierre = np.full(len(posiciones), np.nan)
+        cierre[en_rango] = valores[posiciones[en_rango]]
+        ratio = (cierre - sma) / sma
+        return {"sma": sma, "last_close": cierre, "ratio": ratio, "normalized": self.normalize_series(ratio)}
+
     def set_report(self, date):
         report = MarketReport()
         report.set_indicator_data("SPXIndicator",
@@ -152,7 +295,9 @@ class SPXIndicator(IndicatorModule):
 if __name__ == "__main__":
     try:
         indicador = SPXIndicator()
-        
+        # Obtenemos el valor del periodo para SMA desde el modulo de configuracion
+        periodo_sma = indicador.sma_period
+
         print(f"Periodo de SMA: {periodo_sma}")
         print(f"Calculo SMA-{periodo_sma} de SPX: {indicador.fetch_data():.2f}")
         print(f"Ultimo cierre: {indicador.get_last_close(SIMBOL):.2f}")
@@ -66,4 +66,45 @@ def test_calculate_cape_30_computes_mean_and_std(indicator):
     target_date = date(2025, 12, 15)
     promedio, desv = indicator.calculate_cape_30(df, target_date, window_size=3)
     assert promedio == pytest.approx(20.0)
-    assert desv == pytest.approx(pd.Series([20, 30, 40]).std())
\ No newline at end of file
+    assert desv == pytest.approx(pd.Series([20, 30, 40]).std())
+# ---------- Fechas numericas del Excel ----------
+def test_parser_shiller_dates_searcher_octubre_como_float(indicator):
+    # El Excel guarda las fechas como float: 2025.1 es octubre, no enero
+    df = pd.DataFrame({0: [2025.09, 2025.1, 2025.11]})
+    df = indicator.parser_shiller_dates_searcher(df)
+    assert list(df["fecha"].dt.month) == [9, 10, 11]
+
+# ---------- Estadisticas precalculadas ----------
+def _archivo_shiller(meses=480):
+    """ Archivo mensual con fechas float (1985.01 ...) y los ultimos meses sin E10/CAPE, como el real """
+    fechas = [1985 + (m // 12) + ((m % 12) + 1) / 100 for m in range(meses)]
+    data = {i: [None] * meses for i in range(13)}
+    data[0] = fechas
+    data[10] = [100 + (m * 7) % 23 for m in range(meses - 3)] + [None] * 3
+    data[12] = [15 + (m * 11) % 17 for m in range(meses - 6)] + [None] * 6
+    return pd.DataFrame(data)
+
+def test_estadisticas_precalculadas_coinciden_con_el_filtrado(indicator):
+    df = _archivo_shiller()
+    for fecha in [date(1985, 3, 31), date(1999, 10, 15), date(2010, 1, 31), date(2024, 12, 31), date(2030, 6, 1)]:
+        filtrado = indicator.filter_until_date(indicator.parser_shiller_dates_searcher(df), fecha)
+        e10 = indicator.extract_numeric_column(filtrado, 10, 120)
+        cape = indicator.extract_numeric_column(filtrado, 12, 360)
+
+        assert indicator.calculate_cape_average(df, fecha, 120) == pytest.approx(e10.mean())
+        promedio, desv = indicator.calculate_cape_30(df, fecha, 360)
+        assert promedio == pytest.approx(cape.mean())
+        if len(cape) > 1:
+            assert desv == pytest.approx(cape.std())
+
+def test_estadisticas_fecha_anterior_al_archivo(indicator):
+    df = _archivo_shiller()
+    assert indicator.calculate_cape_average(df, date(1980, 1, 15)) is None
+    assert indicator.calculate_cape_30(df, date(1980, 1, 15)) == (None, None)
+
+def test_estadisticas_se_calculan_una_vez_por_archivo(indicator):
+    df = _archivo_shiller()
+    indicator.calculate_cape_average(df, date(2010, 1, 31))
+    estadisticas = indicator.cape_statistics(df)
+    indicator.calculate_cape_30(df, date(2012, 5, 31))
+    assert indicator.cape_statistics(df) is estadisticas
@@ -170,4 +170,34 @@ def test_fetch_data_cache_miss_different_date():
 
     resultado2 = indicador.fetch_data(fecha2)
     assert fetch_mock.call_count == 2 # Conteo incrementa
-    assert resultado2.value == 30
\ No newline at end of file
+    assert resultado2.value == 30
+
+def test_get_scores_varias_fechas():
+    """Test que verifica get_scores con fechas validas y fuera de rango."""
+    from utils.cnn_feargreed_loader import DateOutOfRangeError
+    fecha1 = date(2025, 12, 15)
+    fecha2 = date(2025, 12, 16)
+    fetch_mock = MagicMock(side_effect=[MockFGI(value=70), DateOutOfRangeError("fuera")])
+
+    indicador = FearGreedIndicator(fetch_fn=fetch_mock)
+    scores = indicador.get_scores([fecha1, fecha2])
+
+    assert scores[fecha1] == 0.3
+    assert scores[fecha2] is None
+
+# normalize_series: misma formula que normalize sobre un arreglo
+def test_normalize_series_coincide_con_normalize_value():
+    indicador = FearGreedIndicator(fetch_fn=lambda: None)
+    valores = [0, 20, 25.4, 50, 55.6, 75, 100]
+    resultado = indicador.normalize_series(valores)
+    assert resultado.tolist() == pytest.approx([FearGreedIndicator._normalize_value(v) for v in valores])
+
+def test_get_scores_fuente_por_defecto_usa_busqueda_por_lotes(monkeypatch):
+    fecha1, fecha2 = date(2025, 12, 15), date(2025, 12, 16)
+    lote = MagicMock(return_value={fecha1: MockFGI(value=70), fecha2: None})
+    monkeypatch.setattr("indicators.FearGreedIndicator.get_values_by_dates", lote)
+
+    scores = FearGreedIndicator().get_scores([fecha1, fecha2])
+
+    lote.assert_called_once_with([fecha1, fecha2])
+    assert scores == {fecha1: 0.3, fecha2: None}
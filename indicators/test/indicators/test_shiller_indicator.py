@@ -55,6 +55,15 @@ def test_get_last_close_devuelve_valor(mock_ticker):
     valor = indicator.get_last_close("^SPX", fecha)
     assert valor == 4500.55
 
+@patch("indicators.shillerPEIndicator.yf.Ticker")
+def test_get_last_close_sin_calendario_ni_price_store(mock_ticker, monkeypatch):
+    # La consulta de un cierre no resuelve la ultima sesion (calendario + PriceStore)
+    monkeypatch.setattr("data.market_calendar.get_last_valid_trading_day", MagicMock(side_effect=AssertionError("I/O oculto")))
+    mock_ticker.return_value.history.return_value = pd.DataFrame({"Close": [4500.55]})
+
+    assert ShillerPEIndicator().get_last_close("^SPX", date(2025, 12, 15), limit=date(2025, 12, 18)) == 4500.55
+    mock_ticker.return_value.history.assert_called_once_with(start=date(2025, 12, 15), end=date(2025, 12, 18), auto_adjust=True)
+
 @patch("indicators.shillerPEIndicator.yf.Ticker")
 def test_get_last_close_empty(mock_ticker, capsys):
     fecha = date(2025, 12, 15)
@@ -150,4 +159,19 @@ def test_normalize_handles_none_values(indicator_with_fixed_stats):
     indicator_with_fixed_stats.promedio_cape_30 = None
     indicator_with_fixed_stats.daily_cape = 25.0
     with pytest.raises(RuntimeError):
-        indicator_with_fixed_stats.normalize(fecha)
\ No newline at end of file
+        indicator_with_fixed_stats.normalize(fecha)
+# ---------- Test normalize_series ----------
+def test_normalize_series_coincide_con_normalize_cape(indicator_with_fixed_stats):
+    capes = [20.0, 25.0, 30.0, 35.0, 45.0, 60.0]
+    resultado = indicator_with_fixed_stats.normalize_series(capes)
+    esperado = [ShillerPEIndicator._normalize_cape(c, 25.0, 5.0) for c in capes]
+    assert resultado.tolist() == pytest.approx(esperado)
+
+def test_normalize_series_estadisticas_por_fecha():
+    indicator = ShillerPEIndicator()
+    resultado = indicator.normalize_series([30.0, 30.0, 30.0], [25.0, 20.0, 25.0], [5.0, 5.0, 0.1])
+    assert resultado.tolist() == pytest.approx([0.75, 0.5, 1.0])
+
+def test_normalize_series_sin_estadisticas():
+    with pytest.raises(RuntimeError):
+        ShillerPEIndicator().normalize_series([30.0])
@@ -3,6 +3,8 @@ import pandas as pd
 from unittest.mock import MagicMock
 from datetime import date
 from indicators.spxIndicator import SIMBOL, SPXIndicator
+from data.market_calendar import get_trading_sessions
+from data.sma_state import SMAState
 
 # Simulamos una respuesta de yfinance
 @pytest.fixture
@@ -187,4 +189,145 @@ def test_normalize_middle_value(mock_yf_client):
     )
 
     result = indicador.normalize(fecha)
-    assert 0.0 < result < 1.0
\ No newline at end of file
+    assert 0.0 < result < 1.0
+
+##### get_scores (rango de fechas) #####
+
+def test_get_scores_una_sola_descarga(mock_yf_client):
+    client, ticker_instance = mock_yf_client
+    fechas_idx = pd.bdate_range("2025-12-01", periods=10)
+    # 5 cierres planos en 100 y despues cierres en 105 (ratio 0.05) y 130 (ratio > upper)
+    cierres = [100.0] * 5 + [105.0, 100.0, 130.0, 100.0, 100.0]
+    ticker_instance.history.return_value = pd.DataFrame({'Close': cierres}, index=fechas_idx)
+
+    indicador = SPXIndicator(sma_period=5, upper_ratio=0.2, lower_ratio=-0.2, yf_client=client)
+    fechas = [fechas_idx[5].date(), fechas_idx[7].date(), fechas_idx[2].date()]
+    scores = indicador.get_scores(fechas)
+
+    assert ticker_instance.history.call_count == 1
+    assert scores[fechas[0]] == pytest.approx((0.2 - 0.05) / 0.4)
+    assert scores[fechas[1]] == 0.0
+    # Sin suficientes cierres previos para la SMA
+    assert scores[fechas[2]] is None
+
+##### get_last_close acotado #####
+
+def test_get_last_close_fecha_historica_pide_una_sesion_y_memoiza(mock_yf_client):
+    client, ticker_instance = mock_yf_client
+    ticker_instance.history.return_value = pd.DataFrame({'Close': [1400.0]}, index=pd.to_datetime(["2012-03-02"]))
+    indicador = SPXIndicator(sma_period=5, upper_ratio=0.2, lower_ratio=-0.2, yf_client=client)
+
+    assert indicador.get_last_close(SIMBOL, date(2012, 3, 2)) == 1400.0
+    assert indicador.get_last_close(SIMBOL, "2012-03-02") == 1400.0
+
+    ticker_instance.history.assert_called_once_with(start=date(2012, 3, 2), end=date(2012, 3, 9), auto_adjust=True)
+
+##### sma_series / normalize_series #####
+
+def test_sma_series_coincide_con_media_movil(mock_yf_client):
+    client, ticker_instance = mock_yf_client
+    fechas_idx = pd.bdate_range("2025-11-03", periods=30)
+    cierres = pd.Series([100.0 + (i % 7) * 3 for i in range(30)], index=fechas_idx)
+    ticker_instance.history.return_value = pd.DataFrame({'Close': cierres})
+
+    indicador = SPXIndicator(sma_period=5, upper_ratio=0.2, lower_ratio=-0.2, yf_client=client)
+    serie = indicador.sma_series(fechas_idx[3].date(), fechas_idx[-1].date())
+
+    assert ticker_instance.history.call_count == 1
+    assert list(serie.index) == list(fechas_idx[3:])
+    assert list(serie.columns) == ["sma", "last_close", "ratio", "normalized"]
+    # Sin 5 cierres previos la SMA queda como NaN
+    assert serie["sma"].iloc[:2].isna().all()
+    esperado = cierres.rolling(5).mean().shift(1).iloc[3:]
+    assert serie["sma"].iloc[2:].to_numpy() == pytest.approx(esperado.iloc[2:].to_numpy())
+    assert serie["last_close"].to_numpy() == pytest.approx(cierres.iloc[3:].to_numpy())
+    escalar = [indicador._normalize_ratio(r) for r in serie["ratio"].iloc[2:]]
+    assert serie["normalized"].iloc[2:].to_numpy() == pytest.approx(escalar)
+
+def test_normalize_series_acota_entre_0_y_1():
+    indicador = SPXIndicator(sma_period=5, upper_ratio=0.2, lower_ratio=-0.2, yf_client=MagicMock())
+    resultado = indicador.normalize_series(pd.Series([-0.5, -0.2, 0.0, 0.2, 0.5]))
+    assert resultado.tolist() == pytest.approx([1.0, 1.0, 0.5, 0.0, 0.0])
+
+##### Estado persistido de la SMA #####
+
+def _cliente_con_cierres(cierres):
+    """ Cliente yf falso que responde history(start, end) con los cierres de la serie en [start, end) """
+    client = MagicMock()
+    ticker_instance = MagicMock()
+    client.Ticker.return_value = ticker_instance
+
+    def fake_history(start=None, end=None, **kwargs):
+        tramo = cierres[(cierres.index >= pd.Timestamp(start)) & (cierres.index < pd.Timestamp(end))]
+        return pd.DataFrame({'Close': tramo})
+    ticker_instance.history.side_effect = fake_history
+    return client, ticker_instance
+
+@pytest.fixture
+def cierres_2024():
+    fechas_idx = pd.DatetimeIndex(get_trading_sessions(date(2023, 6, 1), date(2024, 3, 29)))
+    return pd.Series([4000.0 + (i % 11) * 7 for i in range(len(fechas_idx))], index=fechas_idx)
+
+def _spx(client, tmp_path):
+    return SPXIndicator(sma_period=5, upper_ratio=0.2, lower_ratio=-0.2, yf_client=client,
+                        sma_state=SMAState(path=str(tmp_path / "sma.json")))
+
+def test_sma_state_avanza_con_un_solo_cierre(cierres_2024, tmp_path):
+    client, ticker_instance = _cliente_con_cierres(cierres_2024)
+    _spx(client, tmp_path).fetch_data(date(2024, 3, 4))
+
+    ticker_instance.history.reset_mock()
+    indicador = _spx(client, tmp_path)
+    sma = indicador.fetch_data(date(2024, 3, 5))
+
+    # Solo se piden el cierre guardado y el nuevo
+    ticker_instance.history.assert_called_once_with(start=date(2024, 3, 4), end=date(2024, 3, 6), auto_adjust=True)
+    previos = cierres_2024[cierres_2024.index < pd.Timestamp("2024-03-05")]
+    assert sma == pytest.approx(previos.tail(5).mean())
+    assert indicador.last_close == cierres_2024[pd.Timestamp("2024-03-05")]
+    assert indicador.sma_state.last_date == date(2024, 3, 5)
+
+def test_sma_state_misma_fecha_sin_descargas(cierres_2024, tmp_path):
+    client, ticker_instance = _cliente_con_cierres(cierres_2024)
+    sma = _spx(client, tmp_path).fetch_data(date(2024, 3, 4))
+
+    ticker_instance.history.reset_mock()
+    assert _spx(client, tmp_path).fetch_data(date(2024, 3, 4)) == pytest.approx(sma)
+    ticker_instance.history.assert_not_called()
+
+def test_sma_state_hueco_resincroniza(cierres_2024, tmp_path):
+    client, ticker_instance = _cliente_con_cierres(cierres_2024)
+    _spx(client, tmp_path).fetch_data(date(2024, 3, 4))
+
+    indicador = _spx(client, tmp_path)
+    sma = indicador.fetch_data(date(2024, 3, 8))
+
+    previos = cierres_2024[cierres_2024.index < pd.Timestamp("2024-03-08")]
+    assert sma == pytest.approx(previos.tail(5).mean())
+    assert indicador.sma_state.last_date == date(2024, 3, 8)
+    assert indicador.sma_state.last_close == cierres_2024[pd.Timestamp("2024-03-08")]
+
+def test_sma_state_cierre_revisado_resincroniza(cierres_2024, tmp_path):
+    client, _ = _cliente_con_cierres(cierres_2024)
+    _spx(client, tmp_path).fetch_data(date(2024, 3, 4))
+
+    revisados = cierres_2024.copy()
+    revisados[pd.Timestamp("2024-03-04")] += 50.0
+    client, ticker_instance = _cliente_con_cierres(revisados)
+    indicador = _spx(client, tmp_path)
+    sma = indicador.fetch_data(date(2024, 3, 5))
+
+    # La ruta completa vuelve a descargar la ventana del SMA
+    assert ticker_instance.history.call_count > 1
+    previos = revisados[revisados.index < pd.Timestamp("2024-03-05")]
+    assert sma == pytest.approx(previos.tail(5).mean())
+    assert indicador.sma_state.closes[-2] == revisados[pd.Timestamp("2024-03-04")]
+
+def test_sma_state_fecha_anterior_no_reemplaza_el_estado(cierres_2024, tmp_path):
+    client, _ = _cliente_con_cierres(cierres_2024)
+    _spx(client, tmp_path).fetch_data(date(2024, 3, 4))
+    _spx(client, tmp_path).fetch_data(date(2024, 1, 10))
+
+    estado = SMAState(path=str(tmp_path / "sma.json"))
+    assert estado.load(5) is True
+    assert estado.last_date == date(2024, 3, 4)
@@ -90,4 +90,42 @@ def test_normalize_valor_intermedio(fecha = "2025-12-15"):
     indicador.fetch_data = lambda d: 44.5  # Valor justo en el medio
 
     resultado = indicador.normalize(fecha)
-    assert resultado == 0.5
\ No newline at end of file
+    assert resultado == 0.5
+
+######## get_scores ########
+
+def test_get_scores_una_sola_descarga(mock_yf_client):
+    cliente, ticker_instance = mock_yf_client
+    fechas_idx = pd.to_datetime(["2025-12-15", "2025-12-16", "2025-12-18"])
+    ticker_instance.history.return_value = pd.DataFrame({'Close': [44.5, 6.0, 150.0]}, index=fechas_idx)
+    indicador = VixIndicator(yf_client=cliente, vix_min=9, vix_max=80)
+
+    fechas = [date(2025, 12, 15), date(2025, 12, 16), date(2025, 12, 17), date(2025, 12, 19)]
+    scores = indicador.get_scores(fechas)
+
+    assert ticker_instance.history.call_count == 1
+    assert scores[fechas[0]] == 0.5
+    assert scores[fechas[1]] == 0
+    # Sin cierre en la fecha se usa la siguiente sesion (como get_last_close)
+    assert scores[fechas[2]] == 1
+    assert scores[fechas[3]] is None
+
+######## get_last_close acotado ########
+
+def test_get_last_close_fecha_historica_pide_una_sesion_y_memoiza(mock_yf_client):
+    cliente, ticker_instance = mock_yf_client
+    indicador = VixIndicator(yf_client=cliente, vix_min=9, vix_max=80)
+
+    primero = indicador.get_last_close(None, "2025-09-13", date(2012, 3, 2))
+    segundo = indicador.get_last_close(None, "2025-09-13", date(2012, 3, 2))
+
+    assert primero == segundo == 14.55
+    ticker_instance.history.assert_called_once_with(start=date(2012, 3, 2), end=date(2012, 3, 9), auto_adjust=True)
+
+######## normalize_series ########
+
+def test_normalize_series_coincide_con_normalize_value():
+    indicador = VixIndicator(vix_min=9, vix_max=80)
+    valores = [5.0, 9.0, 12.3, 44.5, 79.9, 80.0, 150.0]
+    resultado = indicador.normalize_series(valores)
+    assert resultado.tolist() == pytest.approx([indicador._normalize_value(v) for v in valores])
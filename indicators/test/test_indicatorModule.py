@@ -34,3 +34,19 @@ class TestIndicatorModuleInterface:
     
     def test_subclass_implements_all_required_methods(self, implementation):
         assert isinstance(implementation, IndicatorModule)
+
+def test_normalize_series_por_defecto_sin_normalize_value():
+    from indicators.dummy import Dummy
+    with pytest.raises(NotImplementedError, match="_normalize_value"):
+        Dummy().normalize_series([1.0, 2.0])
+
+def test_normalize_series_por_defecto_usa_normalize_value():
+    import numpy as np
+    from indicators.dummy import Dummy
+    class Escala(Dummy):
+        def _normalize_value(self, value):
+            return value / 100
+
+    resultado = Escala().normalize_series([25.0, float("nan"), 100.0])
+    assert resultado[0] == 0.25 and resultado[2] == 1.0
+    assert np.isnan(resultado[1])
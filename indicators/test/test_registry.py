@@ -0,0 +1,41 @@
+import pytest
+from indicators.registry import get_indicator, default_indicators, reset_registry
+from indicators.spxIndicator import SPXIndicator
+from indicators.FearGreedIndicator import FearGreedIndicator
+from indicators.vixIndicator import VixIndicator
+from indicators.shillerPEIndicator import ShillerPEIndicator
+
+@pytest.fixture(autouse=True)
+def registry_limpio():
+    reset_registry()
+    yield
+    reset_registry()
+
+def test_get_indicator_devuelve_la_misma_instancia():
+    assert get_indicator(VixIndicator) is get_indicator(VixIndicator)
+
+def test_default_indicators_orden_y_reutilizacion():
+    indicadores = default_indicators()
+    assert [type(i) for i in indicadores] == [SPXIndicator, FearGreedIndicator, VixIndicator, ShillerPEIndicator]
+    assert all(a is b for a, b in zip(indicadores, default_indicators()))
+
+def test_reset_registry_crea_nuevas_instancias():
+    anterior = get_indicator(FearGreedIndicator)
+    reset_registry()
+    assert get_indicator(FearGreedIndicator) is not anterior
+
+def test_from_global_config_comparte_instancias_con_scorer_backup(monkeypatch):
+    from core.scoreCalculator import ScoreCalculator
+    monkeypatch.setattr("core.scoreCalculator.ScoreMatrix.load", lambda path: None)
+    calculator = ScoreCalculator.from_global_config()
+    assert calculator.indicators[0] is get_indicator(SPXIndicator)
+    assert calculator.indicators[3] is get_indicator(ShillerPEIndicator)
+
+def test_indicadores_de_precios_comparten_market_data_sobre_price_store():
+    from data.price_store import get_price_store
+    from data.market_data import MarketDataContext
+    contexto = get_indicator(SPXIndicator).yf_client
+    assert isinstance(contexto, MarketDataContext)
+    assert contexto.yf_client is get_price_store()
+    assert get_indicator(VixIndicator).yf_client is contexto
+    assert get_indicator(ShillerPEIndicator).yf_client is contexto
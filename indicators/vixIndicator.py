@@ -1,14 +1,17 @@
 from indicators.IndicatorModule import IndicatorModule
 from config.config_loader import get_config
 import data.market_dates as md
+from data.price_history import to_close_series, close_lookup_window
+import pandas as pd
+import numpy as np
 from utils.MarketReport import MarketReport
-import yfinance as yf
+from datetime import timedelta
+from utils.lazy_import import lazy_module
+yf = lazy_module("yfinance")     # se importa en la primera descarga
 import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-config = get_config() # Instanciamos la configuración global para poder acceder a ella
-vix_weight = config.get('weights',{}).get('vix',{})
 SIMBOL = "^VIX"
 #SAMPLE_DATE = "2025-12-20"
 
@@ -26,28 +29,42 @@ class VixIndicator(IndicatorModule):
         self._last_calculated_date = None
         self._last_close = None
         self._normalized = None
+        self._closes = {}   # cierres ya consultados: {fecha: cierre}
 
     def _is_cached(self, date):
         # Verifica si los datos ya estan calculados para esta fecha.
         return self._last_calculated_date == date and self._last_close is not None
 
+    def get_params(self):
+        return {"vix_min": self.vix_min, "vix_max": self.vix_max}
+
     def get_last_close(self, start_date, end_date, date) -> float | None:
         try:
+            clave = pd.Timestamp(date).date()
+            if clave in self._closes:
+                return self._closes[clave]
             vix = self.yf_client.Ticker(SIMBOL)
-            datos = vix.history(start=date, end=end_date, auto_adjust=True)
+            # Solo la sesion pedida (o la siguiente), sin pasar de end_date
+            inicio, fin = close_lookup_window(date, end_date)
+            with self.span("yfinance_history", symbol=SIMBOL):
+                datos = vix.history(start=inicio, end=fin, auto_adjust=True)
             if datos.empty:
                 raise ValueError("Fallo al obtener datos de VIX.")
-            return float(datos['Close'].iloc[0])
+            self._closes[clave] = float(datos['Close'].iloc[0])
+            return self._closes[clave]
         except Exception as e:
             print(f"Error al obtener el ultimo cierre: {e}")
             return None
 
     def fetch_data(self, date) -> float | None:
         try:
-            if self._is_cached(date):
-                return self._last_close
-            start_date, end_date = md.yfinance_window_for_last_close()
-            last_close = self.get_last_close(start_date, end_date, date)
+            with self.span("cache") as s:
+                if self._is_cached(date):
+                    s.cache_hit()
+                    return self._last_close
+                s.cache_miss()
+            # Sin pasar de la ultima sesion cerrada (solo el reloj, sin consultar calendario ni yfinance)
+            last_close = self.get_last_close(None, md.closed_sessions_end(), date)
             if last_close is None:
                 raise ValueError("No se obtuvieron datos de cierre")
             
@@ -78,12 +95,44 @@ class VixIndicator(IndicatorModule):
                 return 1
 
             # Aplicamos la formula para obtener el score final
-            score = (vix_actual - self.vix_min) / (self.vix_max - self.vix_min)
-            self._normalized = round(score, 2)
-            return round(score, 2)
+            score = self._normalize_value(vix_actual)
+            self._normalized = score
+            return score
         except Exception as e:
             print(f"░ Normalize: {e}")
             return None
+
+    def _normalize_value(self, vix_actual):
+        """ Formula min/max del VIX, acotada entre 0 y 1 y redondeada a 2 decimales """
+        if vix_actual <= self.vix_min:
+            return 0
+        elif vix_actual >= self.vix_max:
+            return 1
+        return round((vix_actual - self.vix_min) / (self.vix_max - self.vix_min), 2)
+
+    def normalize_series(self, raw_values):
+        """ Version vectorizada de _normalize_value sobre cierres del VIX """
+        valores = np.asarray(raw_values, dtype=float)
+        escala = np.round((valores - self.vix_min) / (self.vix_max - self.vix_min), 2)
+        return np.where(valores <= self.vix_min, 0.0, np.where(valores >= self.vix_max, 1.0, escala))
+
+    def get_scores(self, dates):
+        """
+        Calcula el score de varias fechas con una sola descarga de ^VIX.
+        - Las fechas sin cierre disponible se devuelven como None
+        """
+        if not dates:
+            return {}
+        vix = self.yf_client.Ticker(SIMBOL)
+        with self.span("yfinance_history", symbol=SIMBOL):
+            datos = vix.history(start=min(dates), end=max(dates) + timedelta(days=1), auto_adjust=True)
+        cierres = to_close_series(datos)
+
+        # Cierre de cada fecha (o la siguiente sesion) y normalizacion en una sola operacion
+        posiciones = cierres.index.searchsorted(pd.DatetimeIndex([pd.Timestamp(d) for d in dates]))
+        valores = np.append(cierres.to_numpy(dtype=float), np.nan)[np.minimum(posiciones, len(cierres))]
+        normalizados = self.normalize_series(valores)
+        return {d: (None if np.isnan(v) else float(v)) for d, v in zip(dates, normalizados)}
         
     def set_report(self, date):
         report = MarketReport()
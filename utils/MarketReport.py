@@ -1,8 +1,13 @@
 import json
 import os
+import threading
 from datetime import date, datetime
 from typing import Dict, Any, Optional
 from data.market_dates import get_last_trading_close
+from utils.instrumentation import span
+
+# Serializa lectura-modificacion-escritura del archivo (indicadores evaluados en paralelo)
+_LOCK = threading.RLock()
 
 class MarketReport:
     """ Clase para generar y gestionar los resultados del sistema en cache persistente. """
@@ -17,13 +22,15 @@ class MarketReport:
             date_str = get_last_trading_close().date()
             if date_str is None:
                 date_str = datetime.now().date()
-        if key not in self.data:
-            self.data[key] = {}
+        with _LOCK:
+            self.load() # Recargar para no pisar lo escrito por otras instancias
+            if key not in self.data:
+                self.data[key] = {}
 
-        self.data[key]["value"] = vale
-        self.data[key]["date"] = date_str
+            self.data[key]["value"] = vale
+            self.data[key]["date"] = date_str
 
-        self.save()
+            self.save()
 
     def get_data(self, key: str) -> Optional[Dict[str, Any]]:
         """ Obtener un dato por clave """
@@ -31,12 +38,14 @@ class MarketReport:
     
     def set_indicator_data(self, indicator_name: str, data: Dict[str, Any], calc_date: str):
         """ Almacenar todos los datos de indicador especifico """
-        if indicator_name not in self.data:
-            self.data[indicator_name] = {}
-        self.data[indicator_name]["calc_date"] = calc_date
-        self.data[indicator_name]["timestamp"] = datetime.now().isoformat()
-        self.data[indicator_name].update(data) # Actualizar con los nuevos datos
-        self.save()
+        with _LOCK:
+            self.load() # Recargar para no pisar lo escrito por otras instancias
+            if indicator_name not in self.data:
+                self.data[indicator_name] = {}
+            self.data[indicator_name]["calc_date"] = calc_date
+            self.data[indicator_name]["timestamp"] = datetime.now().isoformat()
+            self.data[indicator_name].update(data) # Actualizar con los nuevos datos
+            self.save()
     
     def get_indicator_data(self, indicator_name: str) -> Optional[Dict[str, Any]]:
         """ Obtener todos los datos de un indicador por su nombre """
@@ -48,9 +57,10 @@ class MarketReport:
     
     def save(self):
         """ Guardar los datos en un archivo JSON """
-        os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
-        with open(self.filepath, 'w' , encoding='utf-8') as f:
-            json.dump(self.data, f, indent=2, ensure_ascii=False)
+        with span("MarketReport.save"):
+            os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+            with open(self.filepath, 'w' , encoding='utf-8') as f:
+                json.dump(self.data, f, indent=2, ensure_ascii=False)
 
     def load(self):
         """ Cargar todos los datos de un archivo """
@@ -1,8 +1,12 @@
 import json
+import os
 import requests
 import datetime
+import threading
 from pathlib import Path
-from typing import Optional, Union
+from typing import Dict, Iterable, Optional, Tuple, Union
+import numpy as np
+from utils.instrumentation import span, record_cache
 import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -10,6 +14,9 @@ logger = logging.getLogger(__name__)
 DATE_FORMAT = "%Y-%m-%d"
 CACHE_FILE = Path("data/feargreed.json")
 URL = "https://production.dataviz.cnn.io/index/fearandgreed/graphdata"
+INDEX_VERSION = 1
+# Bytes por registro en index_file(): ordinal int32 + valor float32 + código uint8
+INDEX_RECORD_BYTES = 9
 
 class FearGreedRecord:
     def __init__(self, value: int, description: str, date: datetime.date):
@@ -21,14 +28,290 @@ class DateOutOfRangeError(Exception):
     """Excepción lanzada cuando la fecha solicitada está fuera del rango de datos disponibles."""
     pass
 
+# Descripciones de CNN con código fijo en el índice binario; otras se agregan al final
+RATINGS = ("extreme fear", "fear", "neutral", "greed", "extreme greed")
+
+class FearGreedIndex:
+    """
+    Histórico de CNN indexado por fecha en arreglos de ancho fijo:
+    - ordinals: días desde 1970-01-01 (int32, ordenados), values: float32, codes: uint8 (posición en ratings)
+    - Se construye una sola vez por archivo; cada búsqueda es un searchsorted (O(log n))
+    """
+    def __init__(self, records: list):
+        fechas = np.array([rec["date"] for rec in records], dtype="datetime64[D]")
+        orden = np.argsort(fechas, kind="stable")   # ante fechas repetidas gana la primera del archivo
+        ratings = list(RATINGS)
+        codigos = {r: i for i, r in enumerate(ratings)}
+        for rec in records:
+            if rec["description"] not in codigos:
+                codigos[rec["description"]] = len(ratings)
+                ratings.append(rec["description"])
+        self.ordinals = fechas[orden].astype(np.int32)
+        self.values = np.array([rec["value"] for rec in records], dtype=np.float32)[orden]
+        self.codes = np.array([codigos[rec["description"]] for rec in records], dtype=np.uint8)[orden]
+        self.ratings = tuple(ratings)
+
+    @classmethod
+    def from_arrays(cls, ordinals: np.ndarray, values: np.ndarray, codes: np.ndarray, ratings) -> "FearGreedIndex":
+        """ Índice sobre arreglos ya ordenados (p.ej. mapeados en memoria desde index_file()) """
+        index = cls.__new__(cls)
+        index.ordinals, index.values, index.codes, index.ratings = ordinals, values, codes, tuple(ratings)
+        return index
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    @property
+    def first_date(self) -> datetime.date:
+        return _from_ordinal(self.ordinals[0])
+
+    @property
+    def last_date(self) -> datetime.date:
+        return _from_ordinal(self.ordinals[-1])
+
+    def positions(self, dates: Iterable[datetime.date]) -> np.ndarray:
+        """ Posición de cada fecha en el índice, -1 si no hay dato exacto """
+        buscadas = np.array(list(dates), dtype="datetime64[D]").astype(np.int64)
+        pos = np.searchsorted(self.ordinals, buscadas)
+        encontradas = pos < len(self.ordinals)
+        encontradas[encontradas] = self.ordinals[pos[encontradas]] == buscadas[encontradas]
+        return np.where(encontradas, pos, -1)
+
+    def record(self, pos: int) -> FearGreedRecord:
+        return FearGreedRecord(value=int(self.values[pos]), description=self.ratings[self.codes[pos]],
+                               date=_from_ordinal(self.ordinals[pos]))
+
+_EPOCH = datetime.date(1970, 1, 1)
+# Histórico del último archivo leído: ((ruta, mtime_ns, tamaño), datos)
+_DATA: Optional[Tuple[tuple, dict]] = None
+_DATA_LOCK = threading.Lock()
+# Índice del último histórico cargado: ((ruta, mtime_ns, tamaño) del histórico, FearGreedIndex)
+_INDEX: Optional[Tuple[tuple, FearGreedIndex]] = None
+_INDEX_LOCK = threading.Lock()
+
+def _from_ordinal(ordinal) -> datetime.date:
+    return _EPOCH + datetime.timedelta(days=int(ordinal))
+
+def _file_key(path: Optional[Path] = None) -> Optional[tuple]:
+    """ (ruta absoluta, mtime_ns, tamaño) del archivo (por defecto CACHE_FILE); None si no existe """
+    path = path or CACHE_FILE
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+def archive_file() -> Path:
+    """ Histórico acumulado (JSON Lines, solo se agregan registros) junto a CACHE_FILE """
+    return CACHE_FILE.with_name(f"{CACHE_FILE.stem}_archive.jsonl")
+
+def _transform_record(rec: dict) -> dict:
+    """ Registro del endpoint de CNN ({x, y, rating}) al formato guardado """
+    dt_obj = datetime.datetime.fromtimestamp(rec["x"] / 1000, datetime.UTC)
+    return {
+        "timestamp_ms": rec["x"],                   # Tiempo original en milisegundos
+        "value": float(rec["y"]),                   # Valor del Fear Greed
+        "description": rec.get("rating", ""),       # Descripción -> Fear, Neutral, Greed
+        "date": dt_obj.strftime("%Y-%m-%d"),        # Formato YYYY-MM-DD
+    }
+
+def _archive_last_timestamp(path: Path) -> Optional[int]:
+    """ timestamp_ms del último registro del histórico, leyendo solo el final del archivo """
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, 2)
+            fin = f.tell()
+            bloque = 4096
+            while True:
+                f.seek(max(0, fin - bloque))
+                lineas = f.read().splitlines()
+                if len(lineas) > 1 or bloque >= fin:
+                    break
+                bloque *= 2
+        for linea in reversed(lineas):
+            if linea.strip():
+                return int(json.loads(linea)["timestamp_ms"])
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+def append_to_archive(records: Iterable[dict], transform: bool = True) -> int:
+    """
+    Agrega al histórico los registros posteriores al último guardado; retorna cuántos se agregaron.
+    - Solo se transforman y escriben los registros nuevos (timestamp mayor al último guardado)
+    - Un registro del mismo día con timestamp posterior (valor intradía actualizado) también se
+      agrega: al leer gana el último de cada fecha
+    - transform: False si los registros ya vienen en el formato guardado
+    """
+    path = archive_file()
+    ultimo = _archive_last_timestamp(path)
+    clave = "x" if transform else "timestamp_ms"
+    nuevos = [rec for rec in records if ultimo is None or rec[clave] > ultimo]
+    if not nuevos:
+        return 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with span("feargreed.archive_append") as s, open(path, "a", encoding="utf-8") as f:
+        for rec in nuevos:
+            linea = json.dumps(_transform_record(rec) if transform else rec) + "\n"
+            f.write(linea)
+            s.add_bytes(len(linea))
+    return len(nuevos)
+
+def _load_archive() -> Optional[dict]:
+    """
+    Histórico completo desde el archivo acumulado, ordenado y sin fechas repetidas
+    (gana el último registro de cada fecha). Queda en memoria mientras el archivo no cambie.
+    """
+    global _DATA
+    clave = _file_key(archive_file())
+    if clave is None:
+        return None
+    with _DATA_LOCK:
+        if _DATA is not None and _DATA[0] == clave:
+            record_cache("feargreed.memory", hit=True)
+            return _DATA[1]
+    por_fecha = {}
+    with span("feargreed.load_archive") as s, open(archive_file(), "r", encoding="utf-8") as f:
+        s.cache_hit()
+        for linea in f:
+            if linea.strip():
+                rec = json.loads(linea)
+                por_fecha[rec["date"]] = rec
+    data = {"fear_and_greed_historical": {"data": [por_fecha[d] for d in sorted(por_fecha)]}}
+    with _DATA_LOCK:
+        _DATA = (clave, data)
+    return data
+
+def index_file() -> Path:
+    """ Índice binario del histórico (ordinales int32 | valores float32 | códigos uint8) junto a CACHE_FILE """
+    return CACHE_FILE.with_name(f"{CACHE_FILE.stem}_index.bin")
+
+def _index_meta_file() -> Path:
+    return CACHE_FILE.with_name(f"{CACHE_FILE.stem}_index.meta.json")
+
+def _read_index_file(clave: tuple) -> Optional[FearGreedIndex]:
+    """
+    Índice mapeado en memoria desde index_file(); None si no existe o no corresponde
+    al histórico actual (mtime_ns y tamaño guardados en el .meta.json)
+    """
+    try:
+        with open(_index_meta_file(), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        n = int(meta["length"])
+        if meta.get("version") != INDEX_VERSION or meta.get("source") != list(clave[1:]) or n == 0 \
+                or os.path.getsize(index_file()) != n * INDEX_RECORD_BYTES:
+            return None
+        with span("feargreed.index_file.load") as s:
+            s.cache_hit()
+            raw = np.memmap(index_file(), dtype=np.uint8, mode="r")
+            return FearGreedIndex.from_arrays(raw[:4 * n].view("<i4"), raw[4 * n:8 * n].view("<f4"),
+                                              raw[8 * n:], meta["ratings"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+def _write_index_file(index: FearGreedIndex, clave: tuple):
+    """ Guarda el índice en formato binario (primero los datos, después el .meta.json que los valida) """
+    if not len(index):
+        return
+    path, meta = index_file(), _index_meta_file()
+    try:
+        with open(f"{path}.tmp", "wb") as f:
+            for arreglo, dtype in ((index.ordinals, "<i4"), (index.values, "<f4"), (index.codes, "u1")):
+                f.write(np.ascontiguousarray(arreglo, dtype=dtype).tobytes())
+        os.replace(f"{path}.tmp", path)
+        with open(f"{meta}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "source": list(clave[1:]), "length": len(index),
+                       "ratings": list(index.ratings)}, f)
+        os.replace(f"{meta}.tmp", meta)
+    except OSError as e:
+        logger.warning(f"No se pudo guardar el índice binario {path}: {e}")
+
+def _archive_key(data: dict) -> Optional[tuple]:
+    """ Clave del histórico acumulado si `data` es el que está en memoria; None si vino de otra fuente """
+    with _DATA_LOCK:
+        return _DATA[0] if _DATA is not None and _DATA[1] is data else None
+
+def get_index(force_refresh=False) -> Optional[FearGreedIndex]:
+    """
+    Índice del histórico de CNN.
+    - Con la descarga de hoy ya hecha, se usa el índice binario de index_file() mapeado en memoria:
+      no se parsea el histórico JSON. Se reconstruye cuando cambia el histórico acumulado
+    - En memoria se reutiliza mientras el histórico no cambie (mtime ni tamaño)
+    """
+    global _INDEX
+    data = None
+    clave = None if force_refresh else _fresh_archive_key()
+    if clave is None:
+        data = load_data(force_refresh)
+        if data is None:
+            return None
+        clave = _archive_key(data)
+        if clave is None:
+            # JSON de respaldo sin histórico acumulado: índice solo para esta llamada
+            with span("feargreed.index"):
+                return FearGreedIndex(data["fear_and_greed_historical"]["data"])
+    with _INDEX_LOCK:
+        if _INDEX is not None and _INDEX[0] == clave:
+            return _INDEX[1]
+    index = _read_index_file(clave)
+    record_cache("feargreed.index_file", hit=index is not None)
+    if index is None:
+        if data is None:
+            data = load_data()
+            if data is None:
+                return None
+            clave = _archive_key(data) or clave
+        with span("feargreed.index"):
+            index = FearGreedIndex(data["fear_and_greed_historical"]["data"])
+        _write_index_file(index, clave)
+    with _INDEX_LOCK:
+        _INDEX = (clave, index)
+    return index
+
+def clear_cache():
+    """ Descarta el histórico y el índice en memoria (la próxima búsqueda vuelve a leer los archivos) """
+    global _DATA, _INDEX
+    with _DATA_LOCK:
+        _DATA = None
+    with _INDEX_LOCK:
+        _INDEX = None
+
+def _as_date(target_date: Union[datetime.date, str]) -> datetime.date:
+    if isinstance(target_date, str):
+        return datetime.datetime.strptime(target_date, DATE_FORMAT).date()
+    if isinstance(target_date, datetime.date):
+        return target_date
+    raise TypeError("La fecha debe ser un objeto date o una cadena en formato 'YYYY-MM-DD'")
+
+def _downloaded_today(clave: Optional[tuple]) -> bool:
+    """ True si CACHE_FILE (clave de _file_key) se escribió hoy: no hace falta descargar """
+    return clave is not None and datetime.date.fromtimestamp(clave[1] / 1e9) == datetime.date.today()
+
+def _fresh_archive_key() -> Optional[tuple]:
+    """ Clave del histórico acumulado si la descarga de hoy ya está hecha; None si load_data debe actuar """
+    if not _downloaded_today(_file_key()):
+        return None
+    return _file_key(archive_file())
+
 def load_data(force_refresh=False) -> dict:
-    """Descarga o carga desde cache el JSON completo del endpoint CNN."""
-    if CACHE_FILE.exists() and not force_refresh:
-        mtime = datetime.date.fromtimestamp(CACHE_FILE.stat().st_mtime)
-        if mtime == datetime.date.today():
-            with open(CACHE_FILE, "r") as f:
-                return json.load(f)
-        # Si el archivo existe pero no es de hoy, se descargará de nuevo
+    """
+    Histórico de CNN Fear & Greed: se descarga como máximo una vez al día y se lee del archivo acumulado.
+    - CNN solo devuelve una ventana reciente: cada descarga se agrega a archive_file() (sin duplicar
+      fechas), así las fechas antiguas siguen disponibles para el backtesting
+    - CACHE_FILE guarda la última ventana descargada y su mtime marca la descarga del día
+    - El histórico leído queda en memoria por (ruta, mtime, tamaño) del archivo acumulado.
+      El diccionario retornado es compartido y no debe modificarse.
+    - force_refresh: descarga de nuevo aunque el archivo sea de hoy
+    """
+    clave = _file_key()
+    if not force_refresh and _downloaded_today(clave):
+        if not archive_file().exists():
+            # Instalaciones previas al histórico acumulado: se inicia con la ventana guardada
+            with span("feargreed.load_cache") as s, open(CACHE_FILE, "r") as f:
+                s.cache_hit()
+                append_to_archive(json.load(f)["fear_and_greed_historical"]["data"], transform=False)
+        return _load_archive()
+    # Si el archivo existe pero no es de hoy, se descargará de nuevo
     
     # Headers para simular un navegador real
     headers = {
@@ -41,23 +324,17 @@ def load_data(force_refresh=False) -> dict:
     }
     
     try:
-        resp = requests.get(URL, headers=headers, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
+        with span("feargreed.download") as s:
+            s.cache_miss()
+            resp = requests.get(URL, headers=headers, timeout=30)
+            resp.raise_for_status()
+            s.add_bytes(len(getattr(resp, "content", b"") or b""))
+            data = resp.json()
         if "fear_and_greed_historical" in data and "data" in data["fear_and_greed_historical"]:
-            transformed_records = []
-            for rec in data["fear_and_greed_historical"]["data"]:
-                dt_obj = datetime.datetime.fromtimestamp(rec["x"] / 1000, datetime.UTC)
-                date_str = dt_obj.strftime("%Y-%m-%d")      # Formato YYYY-MM-DD
-
-                # Crear el nuevo registro con lo campos solicitados
-                transformed_rec = {
-                   "timestamp_ms": rec["x"],                # Tiempo original en milisegundos
-                   "value": float(rec["y"]),                # Valor del Fear Greed
-                   "description": rec.get("rating", ""),    # Descripción -> Fear, Neutral, Greed
-                   "date": date_str
-                }
-                transformed_records.append(transformed_rec)
+            registros = data["fear_and_greed_historical"]["data"]
+            # Solo la cola nueva se agrega al histórico acumulado
+            append_to_archive(registros)
+            transformed_records = [_transform_record(rec) for rec in registros]
             # Preparar los datos transformados para guardar
             transformed_data = {
                 "fear_and_greed_historical": {
@@ -72,10 +349,13 @@ def load_data(force_refresh=False) -> dict:
 
         CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
         with open(CACHE_FILE, "w") as f:
-            json.dump(transformed_data, f)          # Se guarda el JSON transformado
-        return transformed_data                     # Retorna los datos transformados
+            json.dump(transformed_data, f)          # Se guarda el JSON transformado (última ventana)
+        return _load_archive()                      # Retorna el histórico acumulado
     except Exception as e:
-        # Si falla la descarga pero existe el caché, usamos el caché
+        # Si falla la descarga se usa el histórico acumulado o, si no existe, el caché
+        if archive_file().exists():
+            logger.warning(f"No se pudo descargar CNN Fear & Greed ({e}); se usa el histórico acumulado")
+            return _load_archive()
         if CACHE_FILE.exists():
             with open(CACHE_FILE, "r") as f:
                 try:
@@ -99,45 +379,27 @@ def get_value_by_date(target_date: Union[datetime.date, str]) -> Optional[FearGr
     """Devuelve un objeto FearGreedRecord con valor, descripción y fecha."""
     try:
         # Convertir a objeto date si es una cadena
-        if isinstance(target_date, str):
-            target_date_obj = datetime.datetime.strptime(target_date, DATE_FORMAT).date()
-        elif isinstance(target_date, datetime.date):
-            target_date_obj = target_date
-        else:
-            raise TypeError("La fecha debe ser un objeto date o una cadena en formato 'YYYY-MM-DD'")
-        
-        data = load_data()
-        if data is None:
+        target_date_obj = _as_date(target_date)
+
+        index = get_index()
+        if index is None:
             return None
-            
-        records = data["fear_and_greed_historical"]["data"]
-        # - Validación de rango de fechas - #
 
-        if not records:
+        # - Validación de rango de fechas - #
+        if not len(index):
             # Si no hay registros se lanza un error
             raise DateOutOfRangeError("No hay datos disponibles en el archivo cache")
-        # Obtener la primera y ultima fila del conjunto de datos
-        first_date_str = records[0]["date"]
-        last_date_str = records[-1]["date"]
-        
-        first_date = datetime.datetime.strptime(first_date_str, DATE_FORMAT).date()
-        last_date = datetime.datetime.strptime(last_date_str, DATE_FORMAT).date()
+        first_date, last_date = index.first_date, index.last_date
 
         # Verificar si la fecha objetivo esta fuera del rango
         if target_date_obj < first_date or target_date_obj > last_date:
             raise DateOutOfRangeError(f"La fecha solicitada ({target_date_obj}) esta fuera del rango de datos disponibles ({first_date} a {last_date})")
-        
-        # Buscar la fila que coincide con la fecha
-        for rec in records:
-            rec_date_str = rec["date"]              # Obtener la fecha transformada del JSON
-            rec_date = datetime.datetime.strptime(rec_date_str, DATE_FORMAT).date()
-            if rec_date == target_date_obj:
-                return FearGreedRecord(
-                    value=int(rec["value"]),
-                    description=rec["description"],
-                    date=rec_date
-                )
-        
+
+        # Buscar la fila que coincide con la fecha (busqueda binaria)
+        pos = int(index.positions([target_date_obj])[0])
+        if pos >= 0:
+            return index.record(pos)
+
         raise DateOutOfRangeError(f"No se encontraron datos exactos para la fecha solicitada ({target_date_obj}) dentro del rango disponible ({first_date} a {last_date}).")
 
     except DateOutOfRangeError:
@@ -145,4 +407,17 @@ def get_value_by_date(target_date: Union[datetime.date, str]) -> Optional[FearGr
         raise
     except Exception as e:
         print(f"Error al obtener valor por fecha: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def get_values_by_dates(dates: Iterable[Union[datetime.date, str]]) -> Dict[Union[datetime.date, str], Optional[FearGreedRecord]]:
+    """
+    Versión por lotes de get_value_by_date: resuelve todas las fechas con una sola carga del índice.
+    - Retorna {fecha recibida: FearGreedRecord}
+    - Las fechas sin dato exacto o fuera de rango se devuelven como None (no se lanza DateOutOfRangeError)
+    """
+    dates = list(dates)
+    index = get_index() if dates else None
+    if index is None or not len(index):
+        return {d: None for d in dates}
+    posiciones = index.positions([_as_date(d) for d in dates])
+    return {d: (index.record(int(p)) if p >= 0 else None) for d, p in zip(dates, posiciones)}
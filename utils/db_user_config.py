@@ -1,6 +1,8 @@
 import os
-import psycopg2
-from psycopg2.extras import DictCursor
+from utils.lazy_import import lazy_module
+# psycopg2 se importa al abrir la primera conexion
+psycopg2 = lazy_module("psycopg2")
+extras = lazy_module("psycopg2.extras")
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -14,7 +16,7 @@ def get_user_config(identifier: str) -> dict | None:
     conn = None
     cur = None
     try:
-        conn = psycopg2.connect(DB_URL, cursor_factory=DictCursor)
+        conn = psycopg2.connect(DB_URL, cursor_factory=extras.DictCursor)
         cur = conn.cursor()
         query = (
             "SELECT bot_token, chat_id "
@@ -42,7 +44,7 @@ def set_user_config(identifier: str, chat_id: str):
     conn = None
     cur = None
     try:
-        conn = psycopg2.connect(DB_URL, cursor_factory=DictCursor)
+        conn = psycopg2.connect(DB_URL, cursor_factory=extras.DictCursor)
         cur = conn.cursor()
         cur.execute("SELECT 1 FROM user_configs WHERE identifier = %s", (identifier,))
         if cur.fetchone():
@@ -71,7 +73,7 @@ def update_user_config(current_identifier: str, new_identifier: str, chat_id: st
     conn = None
     cur = None
     try:
-        conn = psycopg2.connect(DB_URL, cursor_factory=DictCursor)
+        conn = psycopg2.connect(DB_URL, cursor_factory=extras.DictCursor)
         cur = conn.cursor()
         cur.execute("SELECT 1 FROM user_configs WHERE identifier = %s", (current_identifier,))
         if not cur.fetchone():
@@ -1,49 +1,73 @@
 import os
+import json
+import time
+import hashlib
 from pathlib import Path
 from urllib.parse import urljoin
 import tempfile
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
+from utils.instrumentation import span
+from utils.lazy_import import lazy_module
+from data.shiller_dataset import excel_engine, file_sha256, store_shiller_frame
+# Solo se carga si hay que buscar los enlaces en la pagina
+bs4 = lazy_module("bs4")
 
 TARGET_LABEL = os.getenv("SHILLER_PE_FILE_NAME", "ie_data")  # patrón de nombre esperado
+METADATA_NAME = "latest.meta.json"  # enlace, ETag, Last-Modified y SHA-256 del último archivo válido
+# Segundos durante los que un archivo ya revisado en este proceso no se vuelve a consultar
+CHECK_TTL = int(os.getenv("SHILLER_CHECK_TTL", "3600"))
+_LAST_CHECK: dict[str, float] = {}  # {ruta final: time.time() de la última revisión}
 
 def download_latest_file(base_url: str, file_name: str, save_dir: str) -> str | None:
+    """
+    Descarga el archivo ie_data más reciente a <save_dir>/latest.xls.
+    - Si hay metadatos de una descarga anterior válida se hace un GET condicional sobre el mismo
+      enlace (If-None-Match / If-Modified-Since): con 304 o el mismo SHA-256 no se descarga
+      ni se valida de nuevo
+    - Sin metadatos, o si el GET condicional falla, se buscan los enlaces en la página
+    """
     try:
+        os.makedirs(save_dir, exist_ok=True)
+        final_path = Path(save_dir) / "latest.xls"
+
+        metadata = _load_metadata(save_dir, final_path)
+        if metadata:
+            if time.time() - _LAST_CHECK.get(str(final_path), float("-inf")) < CHECK_TTL:
+                return str(final_path)
+            if _conditional_download(metadata, final_path, save_dir):
+                _LAST_CHECK[str(final_path)] = time.time()
+                return str(final_path)
+
         candidates = _get_download_links(base_url)
         if not candidates:
             print("❌ No se encontraron enlaces de descarga.")
             return None
 
-        os.makedirs(save_dir, exist_ok=True)
-        final_path = Path(save_dir) / "latest.xls"
-
         # Probar cada enlace y validar contenido
         for url, near_text in candidates:
             # Log de para depuración 
             #print(f"⏳ Probando candidato: {url} (contexto: '{near_text}')")
             try:
-                resp = requests.get(url, timeout=45, stream=True)
-                if resp.status_code != 200:
-                    print(f"⚠️ HTTP {resp.status_code} en {url}")
-                    continue
+                with span("shiller.download") as s:
+                    resp = requests.get(url, timeout=45, stream=True)
+                    if resp.status_code != 200:
+                        print(f"⚠️ HTTP {resp.status_code} en {url}")
+                        continue
 
-                # Nombre por Content-Disposition si existe
-                content_disp = resp.headers.get("Content-Disposition", "")
-                filename = _extract_filename(content_disp) or ""
-                name_hint = filename or near_text
+                    # Nombre por Content-Disposition si existe
+                    content_disp = resp.headers.get("Content-Disposition", "")
+                    filename = _extract_filename(content_disp) or ""
+                    name_hint = filename or near_text
 
-                # Guardar temporalmente y validar abriendo el Excel
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".xls") as tmp:
-                    for chunk in resp.iter_content(chunk_size=1024 * 64):
-                        if chunk:
-                            tmp.write(chunk)
-                    tmp_path = tmp.name
+                    # Guardar temporalmente y validar abriendo el Excel
+                    tmp_path, sha256 = _stream_to_tmp(resp, s)
 
-                if _is_valid_ie_data(tmp_path, name_hint):
+                if _is_valid_ie_data(tmp_path, name_hint, cache_dir=save_dir):
                     # Guardar definitivo
-                    with open(final_path, "wb") as out_f, open(tmp_path, "rb") as in_f:
-                        out_f.write(in_f.read())
+                    _install(tmp_path, final_path)
+                    _save_metadata(save_dir, url, resp.headers, sha256)
+                    _LAST_CHECK[str(final_path)] = time.time()
                     print(f"✅ Archivo correcto guardado en: {final_path}")
                     return str(final_path)
                 else:
@@ -62,16 +86,100 @@ def download_latest_file(base_url: str, file_name: str, save_dir: str) -> str |
         return None
 
 
+def _conditional_download(metadata: dict, final_path: Path, save_dir: str) -> bool:
+    """
+    GET condicional sobre el último enlace válido.
+    - True si latest.xls quedó vigente: 304, mismo SHA-256 o archivo nuevo validado
+    - False si hay que volver a buscar los enlaces en la página
+    """
+    headers = {}
+    if metadata.get("etag"):
+        headers["If-None-Match"] = metadata["etag"]
+    if metadata.get("last_modified"):
+        headers["If-Modified-Since"] = metadata["last_modified"]
+    try:
+        with span("shiller.download", conditional=True) as s:
+            resp = requests.get(metadata["url"], headers=headers, timeout=45, stream=True)
+            if resp.status_code == 304:
+                s.cache_hit()
+                return True
+            if resp.status_code != 200:
+                print(f"⚠️ HTTP {resp.status_code} en {metadata['url']}")
+                return False
+            tmp_path, sha256 = _stream_to_tmp(resp, s)
+
+        if sha256 == metadata.get("sha256"):
+            # El servidor no soporta GET condicional pero el contenido no cambió: no se valida de nuevo
+            os.remove(tmp_path)
+        elif _is_valid_ie_data(tmp_path, "", cache_dir=save_dir):
+            _install(tmp_path, final_path)
+            print(f"✅ Archivo actualizado en: {final_path}")
+        else:
+            os.remove(tmp_path)
+            return False
+        _save_metadata(save_dir, metadata["url"], resp.headers, sha256)
+        return True
+    except Exception as e:
+        print(f"⚠️ Error en la descarga condicional de {metadata.get('url')}: {e}")
+        return False
+
+
+def _stream_to_tmp(resp, s) -> tuple[str, str]:
+    """ Guarda la respuesta en un archivo temporal y retorna (ruta, SHA-256 del contenido) """
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".xls") as tmp:
+        for chunk in resp.iter_content(chunk_size=1024 * 64):
+            if chunk:
+                tmp.write(chunk)
+                digest.update(chunk)
+                s.add_bytes(len(chunk))
+    return tmp.name, digest.hexdigest()
+
+
+def _install(tmp_path: str, final_path: Path):
+    with open(final_path, "wb") as out_f, open(tmp_path, "rb") as in_f:
+        out_f.write(in_f.read())
+    os.remove(tmp_path)
+
+
+def _load_metadata(save_dir: str, final_path: Path) -> dict | None:
+    """ Metadatos de la última descarga; None si faltan o latest.xls ya no coincide con su SHA-256 """
+    path = Path(save_dir) / METADATA_NAME
+    if not path.exists() or not final_path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+        if not metadata.get("url") or metadata.get("sha256") != file_sha256(final_path):
+            return None
+        return metadata
+    except Exception:
+        return None
+
+
+def _save_metadata(save_dir: str, url: str, headers, sha256: str):
+    metadata = {
+        "url": url,
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "sha256": sha256,
+    }
+    with open(Path(save_dir) / METADATA_NAME, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+
+
 def _get_download_links(base_url: str) -> list[tuple[str, str]]:
     """
     Retorna lista de (absolute_url, near_text) para todos los anchors de descarga.
     """
     try:
-        resp = requests.get(base_url, timeout=30)
+        with span("shiller.scrape") as s:
+            resp = requests.get(base_url, timeout=30)
+            s.add_bytes(len(resp.content or b""))
         if resp.status_code != 200:
             raise Exception(f"Error al cargar la página: {resp.status_code}")
 
-        soup = BeautifulSoup(resp.content, "html.parser")
+        soup = bs4.BeautifulSoup(resp.content, "html.parser")
         anchors = soup.find_all("a", {"data-aid": "DOWNLOAD_DOCUMENT_LINK_RENDERED"})
         results: list[tuple[str, str]] = []
 
@@ -108,35 +216,35 @@ def _extract_filename(content_disposition: str) -> str | None:
     return None
 
 
-def _is_valid_ie_data(tmp_path: str, name_hint: str) -> bool:
+def _is_valid_ie_data(tmp_path: str, name_hint: str, cache_dir: str | None = None) -> bool:
     """
     Validación del Excel:
     - Hoja 'Data' presente.
     - Al menos 13 columnas.
     - Columnas 10 y 12 con datos numéricos y no vacíos.
     - Si el nombre sugiere 'ie_data', suma confianza pero no es obligatorio.
+    - cache_dir: si el archivo es válido, la hoja leída se guarda en la cache de data.shiller_dataset
+      para que el indicador no vuelva a leer el Excel
     """
+    with span("shiller.validate"):
+        return _validate_ie_data(tmp_path, name_hint, cache_dir)
+
+
+def _validate_ie_data(tmp_path: str, name_hint: str, cache_dir: str | None = None) -> bool:
     try:
         ext = Path(tmp_path).suffix.lower()  # '.xls' o '.xlsx'
-        engine = None
-        if ext == ".xls":
-            engine = "xlrd"
-        elif ext == ".xlsx":
-            engine = "openpyxl"
+        engine = excel_engine(tmp_path) if ext in (".xls", ".xlsx") else None
 
-        # Abrir archivo con engine elegido; si falla, intentar sin engine
+        # El libro se abre una sola vez: la hoja se lee desde el mismo ExcelFile
         try:
             xls = pd.ExcelFile(tmp_path, engine=engine) if engine else pd.ExcelFile(tmp_path)
         except Exception:
             xls = pd.ExcelFile(tmp_path)  # fallback
 
-        if "Data" not in xls.sheet_names:
-            return False
-
-        try:
-            df = pd.read_excel(tmp_path, sheet_name="Data", engine=engine) if engine else pd.read_excel(tmp_path, sheet_name="Data")
-        except Exception:
-            df = pd.read_excel(tmp_path, sheet_name="Data")  # fallback
+        with xls:
+            if "Data" not in xls.sheet_names:
+                return False
+            df = xls.parse("Data")
 
         if df.shape[1] < 13:
             return False
@@ -146,6 +254,9 @@ def _is_valid_ie_data(tmp_path: str, name_hint: str) -> bool:
         if col10.empty or col12.empty:
             return False
 
+        if cache_dir is not None:
+            store_shiller_frame(df, tmp_path, cache_dir)
+
         # Nombre sugerido suma, pero no bloquea si el contenido es válido
         return True
 
@@ -0,0 +1,233 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+# Si se define, el tracing se activa al importar y se exporta al terminar el proceso.
+# La extension del archivo decide el formato: .prom -> Prometheus, cualquier otra -> JSON
+TRACE_ENV = "MARKETSCORER_TRACE"
+METRIC_PREFIX = "marketscorer"
+# Spans individuales que conserva la traza JSON; los totales por etapa no dependen de este limite
+MAX_SPANS = 10_000
+
+class Span:
+    """ Medicion de una etapa: tiempo de pared, bytes descargados y aciertos/fallos de cache. """
+    __slots__ = ("stage", "attrs", "start", "duration", "bytes", "cache_hits", "cache_misses")
+
+    def __init__(self, stage: str, attrs: Dict[str, Any]):
+        self.stage = stage
+        self.attrs = attrs
+        self.start = 0.0
+        self.duration = 0.0
+        self.bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def add_bytes(self, n: int):
+        self.bytes += int(n or 0)
+
+    def cache_hit(self):
+        self.cache_hits += 1
+
+    def cache_miss(self):
+        self.cache_misses += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stage": self.stage,
+            "start": self.start,
+            "duration_s": self.duration,
+            "bytes": self.bytes,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "attrs": self.attrs,
+        }
+
+class _SpanContext:
+    def __init__(self, tracer: "Tracer", span: Span):
+        self._tracer = tracer
+        self._span = span
+        self._t0 = 0.0
+
+    def __enter__(self) -> Span:
+        self._span.start = time.time()
+        self._t0 = time.perf_counter()
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        self._span.duration = time.perf_counter() - self._t0
+        if exc_type is not None:
+            self._span.attrs["error"] = exc_type.__name__
+        self._tracer._finish(self._span)
+        return False
+
+class _NullSpan:
+    """ Span vacio: todas las operaciones son no-op (tracing desactivado). """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def add_bytes(self, n):
+        pass
+
+    def cache_hit(self):
+        pass
+
+    def cache_miss(self):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class Tracer:
+    """
+    Registro de spans por etapa del pipeline de scoring.
+    - span(stage) es un context manager que mide el tiempo de pared de la etapa
+    - Exporta las mediciones como traza JSON o como archivo de texto Prometheus
+    - Los totales por etapa se acumulan al cerrar cada span; solo se conservan los ultimos
+      max_spans spans individuales, asi el tracer no crece en un proceso de larga duracion
+    """
+    enabled = True
+
+    def __init__(self, max_spans: int = MAX_SPANS):
+        self._spans: deque = deque(maxlen=max_spans)
+        self._totales: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def span(self, stage: str, **attrs):
+        return _SpanContext(self, Span(stage, attrs))
+
+    def record_cache(self, stage: str, hit: bool):
+        """ Registra un acierto/fallo de cache sin medir tiempo """
+        span = Span(stage, {})
+        span.start = time.time()
+        if hit:
+            span.cache_hit()
+        else:
+            span.cache_miss()
+        self._finish(span)
+
+    def _finish(self, span: Span):
+        with self._lock:
+            self._spans.append(span)
+            t = self._totales.get(span.stage)
+            if t is None:
+                t = self._totales[span.stage] = {"calls": 0, "seconds_total": 0.0, "seconds_max": 0.0,
+                                                 "bytes": 0, "cache_hits": 0, "cache_misses": 0}
+            t["calls"] += 1
+            t["seconds_total"] += span.duration
+            t["seconds_max"] = max(t["seconds_max"], span.duration)
+            t["bytes"] += span.bytes
+            t["cache_hits"] += span.cache_hits
+            t["cache_misses"] += span.cache_misses
+
+    @property
+    def spans(self) -> List[Span]:
+        """ Ultimos spans registrados (como maximo max_spans) """
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+            self._totales.clear()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """ Totales por etapa desde el inicio: llamadas, segundos (total y maximo), bytes y cache """
+        with self._lock:
+            return {stage: dict(t) for stage, t in self._totales.items()}
+
+    def to_json(self, path: Optional[str] = None) -> str:
+        """ Traza JSON con los ultimos spans y el resumen por etapa """
+        texto = json.dumps({"spans": [s.to_dict() for s in self.spans], "summary": self.summary()},
+                           indent=2, ensure_ascii=False, default=str)
+        if path:
+            _write(path, texto)
+        return texto
+
+    def to_prometheus(self, path: Optional[str] = None) -> str:
+        """ Metricas en formato de texto Prometheus (textfile collector) """
+        metricas = [
+            ("stage_calls_total", "calls", "Numero de ejecuciones de la etapa"),
+            ("stage_seconds_total", "seconds_total", "Tiempo de pared acumulado por etapa"),
+            ("stage_seconds_max", "seconds_max", "Tiempo de pared maximo de una ejecucion de la etapa"),
+            ("stage_bytes_total", "bytes", "Bytes descargados por etapa"),
+            ("cache_hits_total", "cache_hits", "Aciertos de cache por etapa"),
+            ("cache_misses_total", "cache_misses", "Fallos de cache por etapa"),
+        ]
+        resumen = self.summary()
+        lineas = []
+        for nombre, campo, ayuda in metricas:
+            tipo = "gauge" if nombre.endswith("_max") else "counter"
+            lineas.append(f"# HELP {METRIC_PREFIX}_{nombre} {ayuda}")
+            lineas.append(f"# TYPE {METRIC_PREFIX}_{nombre} {tipo}")
+            for stage, valores in sorted(resumen.items()):
+                etiqueta = stage.replace("\\", "\\\\").replace('"', '\\"')
+                lineas.append(f'{METRIC_PREFIX}_{nombre}{{stage="{etiqueta}"}} {valores[campo]}')
+        texto = "\n".join(lineas) + "\n"
+        if path:
+            _write(path, texto)
+        return texto
+
+    def export(self, path: str) -> str:
+        """ Exporta segun la extension: .prom -> Prometheus, otra -> JSON """
+        return self.to_prometheus(path) if str(path).endswith(".prom") else self.to_json(path)
+
+class NullTracer:
+    """ Tracer desactivado: sin costo mas alla de una llamada a funcion. """
+    enabled = False
+
+    def span(self, stage: str, **attrs):
+        return _NULL_SPAN
+
+    def record_cache(self, stage: str, hit: bool):
+        pass
+
+NULL_TRACER = NullTracer()
+_tracer = NULL_TRACER
+
+def _write(path: str, texto: str):
+    directorio = os.path.dirname(str(path))
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(texto)
+
+def get_tracer():
+    """ Tracer global del proceso (NULL_TRACER si el tracing esta desactivado) """
+    return _tracer
+
+def set_tracer(tracer):
+    """ Reemplaza el tracer global; devuelve el anterior """
+    global _tracer
+    anterior = _tracer
+    _tracer = tracer if tracer is not None else NULL_TRACER
+    return anterior
+
+def enable_tracing() -> Tracer:
+    """ Activa el tracing global (si ya estaba activo conserva el tracer actual) """
+    if not _tracer.enabled:
+        set_tracer(Tracer())
+    return _tracer
+
+def disable_tracing():
+    set_tracer(NULL_TRACER)
+
+def span(stage: str, **attrs):
+    """ Atajo: span del tracer global """
+    return _tracer.span(stage, **attrs)
+
+def record_cache(stage: str, hit: bool):
+    """ Atajo: registra un acierto/fallo de cache en el tracer global """
+    _tracer.record_cache(stage, hit)
+
+if os.getenv(TRACE_ENV):
+    _trace_path = os.getenv(TRACE_ENV)
+    atexit.register(lambda: _tracer.export(_trace_path) if _tracer.enabled else None)
+    enable_tracing()
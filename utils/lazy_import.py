@@ -0,0 +1,46 @@
+import importlib
+import threading
+from typing import Any, Callable, Dict
+
+class LazyObject:
+    """
+    Proxy que crea el objeto real (un modulo pesado, un calendario, ...) en el primer acceso a un atributo.
+    - `yf = lazy_module("yfinance")` se usa igual que `import yfinance as yf`, sin el costo al importar
+    - Los atributos asignados sobre el proxy (p.ej. patch("modulo.yf.Ticker")) tienen prioridad
+      sobre los del objeto real, asi los tests pueden seguir parcheando por nombre
+    """
+    def __init__(self, factory: Callable[[], Any], name: str = ""):
+        object.__setattr__(self, "_LazyObject__factory", factory)
+        object.__setattr__(self, "_LazyObject__name", name)
+        object.__setattr__(self, "_LazyObject__target", None)
+        object.__setattr__(self, "_LazyObject__lock", threading.Lock())
+
+    def _resolve(self) -> Any:
+        if self.__target is None:
+            with self.__lock:
+                if self.__target is None:
+                    object.__setattr__(self, "_LazyObject__target", self.__factory())
+        return self.__target
+
+    @property
+    def loaded(self) -> bool:
+        return self.__target is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        # Solo se llama para atributos que no estan en el proxy
+        return getattr(self._resolve(), attr)
+
+    def __repr__(self):
+        estado = "cargado" if self.loaded else "sin cargar"
+        return f"<LazyObject {self.__name or self.__factory!r} ({estado})>"
+
+# Un proxy por modulo (como sys.modules): parchear `modulo_a.yf.Ticker` afecta a todos los que usan yf
+_MODULES: Dict[str, LazyObject] = {}
+_MODULES_LOCK = threading.Lock()
+
+def lazy_module(name: str) -> LazyObject:
+    """ Modulo que se importa en el primer acceso a uno de sus atributos """
+    with _MODULES_LOCK:
+        if name not in _MODULES:
+            _MODULES[name] = LazyObject(lambda: importlib.import_module(name), name)
+        return _MODULES[name]
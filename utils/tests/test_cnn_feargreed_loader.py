@@ -81,4 +81,153 @@ def test_get_value_invalid_type():
 def test_get_value_error(monkeypatch):
     monkeypatch.setattr("cnn_feargreed_loader.load_data", lambda *a, **k: None)
     rec = get_value_by_date("2023-01-01")
-    assert rec is None
\ No newline at end of file
+    assert rec is None
+# --- Tests índice en memoria ---
+@pytest.fixture
+def cache_de_hoy(monkeypatch, tmp_path, sample_data_transformed):
+    """ Archivo cache de hoy con el JSON transformado; el índice arranca vacío """
+    import cnn_feargreed_loader
+    cache_file = tmp_path / "feargreed.json"
+    cache_file.write_text(json.dumps(sample_data_transformed))
+    monkeypatch.setattr("cnn_feargreed_loader.CACHE_FILE", cache_file)
+    cnn_feargreed_loader.clear_cache()
+    yield cache_file
+    cnn_feargreed_loader.clear_cache()
+
+def test_indice_se_reutiliza_mientras_el_archivo_no_cambie(cache_de_hoy):
+    import cnn_feargreed_loader
+    indice = cnn_feargreed_loader.get_index()
+    assert get_value_by_date("2023-01-01").value == 45
+    assert cnn_feargreed_loader.get_index() is indice
+
+    # Registros nuevos en el histórico invalidan el índice
+    cnn_feargreed_loader.append_to_archive(
+        [{"date": "2023-01-03", "description": "Fear", "timestamp_ms": 1672704000000, "value": 30}], transform=False)
+    assert get_value_by_date("2023-01-03").value == 30
+    assert cnn_feargreed_loader.get_index() is not indice
+
+def test_get_values_by_dates(cache_de_hoy):
+    from cnn_feargreed_loader import get_values_by_dates
+    fechas = [datetime.date(2023, 1, 2), "2023-01-01", datetime.date(2023, 1, 5), datetime.date(2022, 12, 31)]
+    resultado = get_values_by_dates(fechas)
+
+    assert list(resultado) == fechas
+    assert resultado[datetime.date(2023, 1, 2)].value == 55
+    assert resultado["2023-01-01"].description == "Neutral"
+    assert resultado[datetime.date(2023, 1, 5)] is None
+    assert resultado[datetime.date(2022, 12, 31)] is None
+
+def test_get_values_by_dates_sin_datos(monkeypatch):
+    from cnn_feargreed_loader import get_values_by_dates
+    monkeypatch.setattr("cnn_feargreed_loader.load_data", lambda *a, **k: None)
+    assert get_values_by_dates(["2023-01-01"]) == {"2023-01-01": None}
+
+# --- Tests memoización de load_data ---
+def test_load_data_no_vuelve_a_parsear_el_mismo_archivo(monkeypatch, cache_de_hoy):
+    import cnn_feargreed_loader
+    primero = load_data()
+    monkeypatch.setattr("cnn_feargreed_loader.json.load", lambda f: pytest.fail("no deberia releer el archivo"))
+    assert load_data() is primero
+
+def test_load_data_archivo_modificado_se_relee(cache_de_hoy):
+    import cnn_feargreed_loader
+    primero = load_data()
+    cnn_feargreed_loader.append_to_archive(
+        [{"date": "2023-01-03", "description": "Fear", "timestamp_ms": 1672704000000, "value": 30}], transform=False)
+    segundo = load_data()
+    assert segundo is not primero
+    assert len(segundo["fear_and_greed_historical"]["data"]) == 3
+
+def _fake_get(payload):
+    class FakeResp:
+        content = b"{}"
+        def raise_for_status(self): pass
+        def json(self): return payload
+    return lambda *a, **k: FakeResp()
+
+def test_load_data_force_refresh_descarga(monkeypatch, cache_de_hoy):
+    import cnn_feargreed_loader
+    load_data()
+    llamadas = []
+    descarga = _fake_get({"fear_and_greed_historical": {"data": [{"x": 1672704000000, "y": 30, "rating": "Fear"}]}})
+    monkeypatch.setattr("cnn_feargreed_loader.requests.get", lambda *a, **k: llamadas.append(1) or descarga())
+
+    nuevo = load_data(force_refresh=True)
+    assert llamadas == [1]
+    assert [r["date"] for r in nuevo["fear_and_greed_historical"]["data"]] == ["2023-01-01", "2023-01-02", "2023-01-03"]
+    # Lo descargado queda en memoria para las siguientes lecturas
+    assert load_data() is nuevo
+
+# --- Tests histórico acumulado ---
+def test_descarga_se_suma_al_historico(monkeypatch, cache_de_hoy):
+    import cnn_feargreed_loader
+    # CNN ya no devuelve 2023-01-01: la ventana nueva empieza el 2023-01-02
+    ventana = {"fear_and_greed_historical": {"data": [
+        {"x": 1672617600000, "y": 55, "rating": "Greed"},
+        {"x": 1672704000000, "y": 30, "rating": "Fear"},
+    ]}}
+    monkeypatch.setattr("cnn_feargreed_loader.requests.get", _fake_get(ventana))
+    load_data()     # inicia el histórico con la ventana guardada
+    load_data(force_refresh=True)
+
+    assert get_value_by_date("2023-01-01").value == 45
+    assert get_value_by_date("2023-01-03").value == 30
+    # Solo se escribio la cola nueva
+    lineas = cnn_feargreed_loader.archive_file().read_text().splitlines()
+    assert [json.loads(l)["date"] for l in lineas] == ["2023-01-01", "2023-01-02", "2023-01-03"]
+
+def test_historico_mismo_dia_gana_el_ultimo(cache_de_hoy):
+    import cnn_feargreed_loader
+    load_data()
+    # Valor intradía actualizado del 2023-01-02 (timestamp posterior, misma fecha)
+    agregados = cnn_feargreed_loader.append_to_archive([{"x": 1672660800000, "y": 60, "rating": "Greed"}])
+    assert agregados == 1
+    registros = load_data()["fear_and_greed_historical"]["data"]
+    assert [r["date"] for r in registros] == ["2023-01-01", "2023-01-02"]
+    assert get_value_by_date("2023-01-02").value == 60
+
+def test_falla_de_descarga_usa_el_historico(monkeypatch, cache_de_hoy):
+    load_data()
+    def fake_get(*args, **kwargs): raise Exception("Network error")
+    monkeypatch.setattr("cnn_feargreed_loader.requests.get", fake_get)
+    data = load_data(force_refresh=True)
+    assert len(data["fear_and_greed_historical"]["data"]) == 2
+
+# --- Tests índice binario ---
+def test_indice_binario_evita_parsear_el_historico(monkeypatch, cache_de_hoy):
+    import numpy as np
+    import cnn_feargreed_loader
+    cnn_feargreed_loader.get_index()
+    assert cnn_feargreed_loader.index_file().stat().st_size == 2 * cnn_feargreed_loader.INDEX_RECORD_BYTES
+
+    # Nuevo proceso: el índice se mapea desde el archivo binario sin leer el histórico JSON
+    cnn_feargreed_loader.clear_cache()
+    monkeypatch.setattr("cnn_feargreed_loader._load_archive", lambda: pytest.fail("no deberia parsear el historico"))
+    indice = cnn_feargreed_loader.get_index()
+    assert isinstance(indice.ordinals, np.memmap) or isinstance(indice.ordinals.base, np.memmap)
+    assert indice.values.dtype == np.float32 and indice.codes.dtype == np.uint8
+    rec = get_value_by_date("2023-01-02")
+    assert (rec.value, rec.description, rec.date) == (55, "Greed", datetime.date(2023, 1, 2))
+
+def test_indice_binario_se_reconstruye_si_cambia_el_historico(cache_de_hoy):
+    import cnn_feargreed_loader
+    cnn_feargreed_loader.get_index()
+    cnn_feargreed_loader.append_to_archive(
+        [{"date": "2023-01-03", "description": "extreme fear", "timestamp_ms": 1672704000000, "value": 10.6}], transform=False)
+    cnn_feargreed_loader.clear_cache()
+
+    indice = cnn_feargreed_loader.get_index()
+    assert len(indice) == 3
+    assert get_value_by_date("2023-01-03").description == "extreme fear"
+    meta = json.loads(cnn_feargreed_loader._index_meta_file().read_text())
+    assert meta["length"] == 3
+    assert meta["ratings"][:5] == list(cnn_feargreed_loader.RATINGS)
+
+def test_indice_binario_invalido_se_ignora(cache_de_hoy):
+    import cnn_feargreed_loader
+    cnn_feargreed_loader.get_index()
+    cnn_feargreed_loader.index_file().write_bytes(b"\x00" * 5)    # archivo truncado
+    cnn_feargreed_loader.clear_cache()
+
+    assert get_value_by_date("2023-01-01").value == 45
+    assert cnn_feargreed_loader.index_file().stat().st_size == 2 * cnn_feargreed_loader.INDEX_RECORD_BYTES
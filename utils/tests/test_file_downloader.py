@@ -1,5 +1,6 @@
 import pytest
 import io
+import json
 import pandas as pd
 from pathlib import Path
 from unittest.mock import patch, MagicMock
@@ -88,4 +89,85 @@ def test_download_latest_file_invalid_content(mock_req, mock_links, tmp_path):
     mock_resp.iter_content = lambda chunk_size: [b"not an excel"]
     mock_req.return_value = mock_resp
     result = file_downloader.download_latest_file("http://base/", "data.xls", str(tmp_path))
-    assert result is None
\ No newline at end of file
+    assert result is None
+
+def test_is_valid_ie_data_guarda_la_hoja_en_cache(tmp_path):
+    df = pd.DataFrame({str(i): range(10) for i in range(13)})
+    file_path = tmp_path / "test.xlsx"
+    df.to_excel(file_path, sheet_name="Data", index=False)
+    cache_dir = tmp_path / "inputs"
+    assert file_downloader._is_valid_ie_data(str(file_path), "ie_data", cache_dir=str(cache_dir))
+    assert len(list(cache_dir.glob("shiller_*.npz"))) == 1
+
+# ---------- Descarga condicional ----------
+def _excel_bytes():
+    df = pd.DataFrame({str(i): range(10) for i in range(13)})
+    buf = io.BytesIO()
+    df.to_excel(buf, sheet_name="Data", index=False)
+    return buf.getvalue()
+
+# Un solo contenido para todas las respuestas (el xlsx incluye la hora de creacion)
+EXCEL_BYTES = _excel_bytes()
+
+def _respuesta_excel(status=200, headers=None):
+    resp = MagicMock()
+    resp.status_code = status
+    resp.headers = headers or {}
+    resp.iter_content = lambda chunk_size: [EXCEL_BYTES]
+    return resp
+
+@pytest.fixture
+def descarga_previa(tmp_path, monkeypatch):
+    """ Primera descarga por scraping con ETag y Last-Modified; sin TTL entre llamadas """
+    monkeypatch.setattr(file_downloader, "CHECK_TTL", 0)
+    headers = {"ETag": '"v1"', "Last-Modified": "Mon, 01 Sep 2025 00:00:00 GMT"}
+    with patch("utils.file_downloader._get_download_links", return_value=[("http://fake/ie_data.xls", "ie_data")]), \
+         patch("utils.file_downloader.requests.get", return_value=_respuesta_excel(headers=headers)):
+        assert file_downloader.download_latest_file("http://base/", "data.xls", str(tmp_path))
+    return tmp_path
+
+def test_download_guarda_metadatos(descarga_previa):
+    with open(descarga_previa / file_downloader.METADATA_NAME) as f:
+        metadata = json.load(f)
+    assert metadata["url"] == "http://fake/ie_data.xls"
+    assert metadata["etag"] == '"v1"'
+    assert metadata["sha256"] == file_downloader.file_sha256(descarga_previa / "latest.xls")
+
+@patch("utils.file_downloader._get_download_links")
+@patch("utils.file_downloader.requests.get")
+def test_download_304_no_descarga_ni_valida(mock_req, mock_links, descarga_previa):
+    mock_req.return_value = MagicMock(status_code=304)
+    with patch("utils.file_downloader._is_valid_ie_data") as mock_valid:
+        result = file_downloader.download_latest_file("http://base/", "data.xls", str(descarga_previa))
+
+    assert result == str(descarga_previa / "latest.xls")
+    mock_links.assert_not_called()
+    mock_valid.assert_not_called()
+    headers = mock_req.call_args.kwargs["headers"]
+    assert headers == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Sep 2025 00:00:00 GMT"}
+
+@patch("utils.file_downloader._get_download_links")
+@patch("utils.file_downloader.requests.get")
+def test_download_mismo_contenido_no_revalida(mock_req, mock_links, descarga_previa):
+    mock_req.return_value = _respuesta_excel()
+    with patch("utils.file_downloader._is_valid_ie_data") as mock_valid:
+        result = file_downloader.download_latest_file("http://base/", "data.xls", str(descarga_previa))
+
+    assert result == str(descarga_previa / "latest.xls")
+    mock_links.assert_not_called()
+    mock_valid.assert_not_called()
+
+@patch("utils.file_downloader._get_download_links", return_value=[])
+@patch("utils.file_downloader.requests.get")
+def test_download_archivo_local_modificado_ignora_metadatos(mock_req, mock_links, descarga_previa):
+    (descarga_previa / "latest.xls").write_bytes(b"otro contenido")
+    assert file_downloader.download_latest_file("http://base/", "data.xls", str(descarga_previa)) is None
+    mock_links.assert_called_once()
+    mock_req.assert_not_called()
+
+@patch("utils.file_downloader.requests.get")
+def test_download_dentro_del_ttl_no_consulta(mock_req, descarga_previa, monkeypatch):
+    monkeypatch.setattr(file_downloader, "CHECK_TTL", 3600)
+    file_downloader._LAST_CHECK[str(descarga_previa / "latest.xls")] = file_downloader.time.time()
+    assert file_downloader.download_latest_file("http://base/", "data.xls", str(descarga_previa))
+    mock_req.assert_not_called()
@@ -0,0 +1,130 @@
+import json
+import pytest
+from unittest.mock import MagicMock
+from utils.instrumentation import Tracer, NULL_TRACER, set_tracer, get_tracer, span, record_cache
+
+@pytest.fixture
+def tracer():
+    """Activa un tracer limpio y restaura el anterior al terminar."""
+    nuevo = Tracer()
+    anterior = set_tracer(nuevo)
+    yield nuevo
+    set_tracer(anterior)
+
+########## Spans ##########
+
+def test_span_registra_duracion_bytes_y_cache(tracer):
+    with span("descarga", symbol="^SPX") as s:
+        s.add_bytes(100)
+        s.add_bytes(50)
+        s.cache_miss()
+
+    [registrado] = tracer.spans
+    assert registrado.stage == "descarga"
+    assert registrado.attrs == {"symbol": "^SPX"}
+    assert registrado.bytes == 150
+    assert registrado.cache_misses == 1
+    assert registrado.duration >= 0
+
+def test_span_marca_error_y_propaga_excepcion(tracer):
+    with pytest.raises(ValueError):
+        with span("falla"):
+            raise ValueError("boom")
+    assert tracer.spans[0].attrs["error"] == "ValueError"
+
+def test_summary_agrupa_por_etapa(tracer):
+    for _ in range(3):
+        with span("etapa"):
+            pass
+    record_cache("cache", True)
+    record_cache("cache", False)
+
+    resumen = tracer.summary()
+    assert resumen["etapa"]["calls"] == 3
+    assert resumen["cache"]["cache_hits"] == 1
+    assert resumen["cache"]["cache_misses"] == 1
+
+def test_spans_acotados_y_resumen_completo():
+    # Un proceso de larga duracion no acumula spans sin limite; el resumen sigue contando todos
+    tracer = Tracer(max_spans=5)
+    for i in range(20):
+        with tracer.span("etapa") as s:
+            s.add_bytes(1)
+
+    assert len(tracer.spans) == 5
+    resumen = tracer.summary()
+    assert resumen["etapa"]["calls"] == 20
+    assert resumen["etapa"]["bytes"] == 20
+
+    tracer.clear()
+    assert tracer.spans == []
+    assert tracer.summary() == {}
+
+def test_null_tracer_no_registra():
+    anterior = set_tracer(None)
+    try:
+        assert get_tracer() is NULL_TRACER
+        with span("etapa") as s:
+            s.add_bytes(10)
+            s.cache_hit()
+        record_cache("cache", True)
+    finally:
+        set_tracer(anterior)
+
+########## Exportacion ##########
+
+def test_export_json(tracer, tmp_path):
+    with span("etapa") as s:
+        s.add_bytes(7)
+    destino = tmp_path / "trace.json"
+    tracer.export(str(destino))
+
+    contenido = json.loads(destino.read_text(encoding="utf-8"))
+    assert contenido["spans"][0]["stage"] == "etapa"
+    assert contenido["summary"]["etapa"]["bytes"] == 7
+
+def test_export_prometheus(tracer, tmp_path):
+    with span("indicator.VixIndicator"):
+        pass
+    destino = tmp_path / "metrics.prom"
+    tracer.export(str(destino))
+
+    texto = destino.read_text(encoding="utf-8")
+    assert "# TYPE marketscorer_stage_calls_total counter" in texto
+    assert 'marketscorer_stage_calls_total{stage="indicator.VixIndicator"} 1' in texto
+
+########## Integracion con ScoreCalculator ##########
+
+def test_score_calculator_registra_etapas(tracer, monkeypatch):
+    from core.scoreCalculator import ScoreCalculator
+    monkeypatch.setattr("core.scoreCalculator.get_a_validated_date", lambda d: True)
+    monkeypatch.setattr("core.scoreCalculator.MarketReport", MagicMock())
+    indicador = MagicMock()
+    indicador.get_score.return_value = 0.5
+
+    calc = ScoreCalculator([indicador], {"MagicMock": 1.0})
+    calc.calculate_score("2025-12-15")
+    calc.calculate_score("2025-12-15")
+
+    resumen = tracer.summary()
+    assert resumen["ScoreCalculator.calculate_score"]["calls"] == 2
+    assert resumen["ScoreCalculator.cache"]["cache_hits"] == 1
+    assert resumen["ScoreCalculator.cache"]["cache_misses"] == 1
+    assert resumen["indicator.MagicMock"]["calls"] == 1
+
+def test_async_score_calculator_registra_etapas(tracer, monkeypatch):
+    import asyncio
+    from core.asyncScoreCalculator import AsyncScoreCalculator
+    monkeypatch.setattr("core.asyncScoreCalculator.get_a_validated_date", lambda d: True)
+    monkeypatch.setattr("core.scoreCalculator.MarketReport", MagicMock())
+    indicador = MagicMock()
+    indicador.get_score.return_value = 0.5
+
+    calc = AsyncScoreCalculator([indicador], {"MagicMock": 1.0})
+    asyncio.run(calc.calculate_score("2025-12-15"))
+    asyncio.run(calc.calculate_score("2025-12-15"))
+
+    resumen = tracer.summary()
+    assert resumen["ScoreCalculator.calculate_score"]["calls"] == 2
+    assert resumen["ScoreCalculator.cache"]["cache_hits"] == 1
+    assert resumen["indicator.MagicMock"]["calls"] == 1
@@ -0,0 +1,19 @@
+import sys
+from unittest.mock import patch
+from utils.lazy_import import LazyObject, lazy_module
+
+def test_lazy_object_se_crea_en_el_primer_acceso():
+    creados = []
+    proxy = LazyObject(lambda: creados.append(1) or {"a": 1}, "dic")
+    assert not proxy.loaded and creados == []
+    assert proxy.get("a") == 1
+    assert proxy.get("b") is None
+    assert proxy.loaded and creados == [1]
+
+def test_lazy_module_es_compartido_y_parcheable():
+    json_lazy = lazy_module("json")
+    assert lazy_module("json") is json_lazy
+    with patch.object(json_lazy, "dumps", lambda obj: "parcheado"):
+        assert lazy_module("json").dumps({}) == "parcheado"
+    assert json_lazy.dumps({}) == "{}"
+    assert json_lazy.loads is sys.modules["json"].loads
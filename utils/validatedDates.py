@@ -1,6 +1,7 @@
 from datetime import datetime
-import pandas_market_calendars as mcal
 import data.market_dates as md
+from data import market_calendar as mc
+from utils.instrumentation import span
 import logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -46,12 +47,11 @@ def validate_date_in_range(_date: str) -> bool:
         return False
 
 def validate_date_was_valid(_date: str) -> bool:
-    nyse = mcal.get_calendar("NYSE")
     # fecha tiene un valor definido en 2025-12-17
     fecha = datetime.strptime(_date, format).date()
-    # Consultar calendario oficial para esa fecha
-    schedule = nyse.schedule(start_date=fecha.isoformat(), end_date=fecha.isoformat())
-    return not schedule.empty
+    # Consultar el indice de sesiones NYSE (calendario oficial precalculado)
+    with span("calendar.is_trading_day"):
+        return mc.is_trading_day(fecha)
 
 def get_a_validated_date(_date: str) -> bool:
     try: